@@ -1,24 +1,78 @@
-from utils.vector_extraction import vector_extraction
-from utils.vector_checking import vector_checking
 from utils.camera_gui import run_CameraApp
-from utils.camera_gui import get_img_name
+from utils.camera_gui import save_image_async
 from utils.preprocessing_of_captured import preprocess_image_and_extract_vector
-from models.faces_training import measure_similarity
-import cv2 as cv
+from models.numpy_inference import verify_user
+from models.gallery import Gallery, TOLERANCE
+import sys
+import threading
+import importlib
+from utils import metrics
+from config import SAVE_CAPTURES, METRICS_PROM_PATH, METRICS_JSONL_PATH, VERIFIER_BACKEND
 
-def main():
-    user_name = "wooseong"
+# 카메라 GUI가 바로 뜨도록 무거운 라이브러리(face_recognition, TensorFlow 등)는
+# 해당 기능이 실행될 때 import (python -m utils.import_timing 으로 시작 시간 확인)
 
+
+def preload_modules(module_names=("face_recognition", )):
     """
-    저장된 얼굴 이미지에서 특징 벡터를 추출하고 .npy 파일로 저장
+    GUI가 실행되는 동안 백그라운드 스레드에서 무거운 모듈을 미리 로드
+
+    :param module_names: 미리 로드할 모듈 이름 튜플
+    :return: 시작된 스레드
+    """
+    def _load():
+        for module_name in module_names:
+            try:
+                importlib.import_module(module_name)
+            except ImportError as e:
+                print(f'모듈을 미리 로드하지 못했습니다: {module_name} ({e})')
+
+    thread = threading.Thread(target=_load, daemon=True)
+    thread.start()
+    return thread
+
+
+def enroll(user_name):
+    """
+    등록 단계: 저장된 얼굴 이미지에서 벡터를 추출하고 사용자 모델을 학습(또는 판별 통계를 계산)해 저장
+    인식 단계(main)에서는 저장된 모델을 로드해 사용
+
+    :param user_name: 사용자 이름
     """
+    from utils.vector_extraction import vector_extraction
+    from utils.vector_checking import vector_checking
+    from models.faces_training import train_model
+    from models.prototype import save_prototype
+
     # 얼굴 벡터 추출 및 저장
-    # 학습이 잘 된 벡터 저장 파일에 대해서만 수행하도록 주석 처리
-    # vector_extraction(user_name)
+    vector_extraction(user_name)
 
     # 저장된 얼굴 벡터 확인
-    # vector_extraction()과 마찬가지 이유로 주석 처리
-    # vector_checking(user_name)
+    vector_checking(user_name)
+
+    # 학습 없는 검증기(config.VERIFIER_BACKEND)용 판별 통계 계산 및 저장
+    save_prototype(user_name)
+
+    # 모델 학습 및 저장 (학습 손실 그래프 표시)
+    if VERIFIER_BACKEND == "keras":
+        train_model(user_name, show_plot=True)
+    elif VERIFIER_BACKEND == "shared":
+        # 공유 모델은 모든 사용자를 함께 학습하므로 새 벡터를 포함해 저장소 전체로 다시 학습
+        from models.shared_model import load_shared_model
+        load_shared_model()
+
+
+def main(user_name=None):
+    """
+    도어락 인식 단계
+
+    :param user_name: 확인할 사용자 이름 (None이면 등록된 모든 사용자 중에서 식별)
+    """
+
+    """
+    저장된 얼굴 이미지에서 특징 벡터를 추출하고 .npy 파일로 저장
+    """
+    # 얼굴 벡터 추출 및 모델 학습은 등록 단계(python app.py enroll)에서 수행
 
 
 
@@ -28,32 +82,47 @@ def main():
     # 디버깅용 메세지
     # print('카메라 GUI를 실행합니다.')
 
+    # 촬영을 기다리는 동안 얼굴 검출 라이브러리 로드
+    preload_modules()
+
     # GUI 실행 및 캡처 이미지 반환
     captured_image = run_CameraApp()
 
-    # 캡처된 이미지가 있다면
-    if captured_image is not None:
-        # 고유한 파일 이름 생성
-        unique_img_name = get_img_name(base_name="captured_img", \
-                    extension=".jpg", path="data/captured_images/")
+    # 캡처된 이미지가 없다면 종료
+    if captured_image is None:
+        print('이미지가 정상적으로 촬영되지 않았습니다.')
+        return
 
-        # 캡처 이미지를 고유 이름으로 저장
-        cv.imwrite(unique_img_name, captured_image)
-    else:
-        print('이미지가 정상적으로 저장되지 않았습니다.')
+    """
+    캡처된 프레임으로 사용자 판별 후 결과와 함께 캡처 아카이브에 기록
+    """
+    result, identity = recognize(captured_image, user_name)
+    print(result)
+
+    # 기록용 캡처 이미지는 백그라운드에서 캡처 아카이브에 저장
+    if SAVE_CAPTURES:
+        save_image_async(captured_image, decision=result, identity=identity)
 
 
+def recognize(captured_image, user_name=None):
+    """
+    캡처된 프레임 한 장으로 도어락 열림 여부 판별
+
+    :param captured_image: OpenCV BGR 프레임
+    :param user_name: 확인할 사용자 이름 (None이면 등록된 모든 사용자 중에서 식별)
+    :return: (도어락 열림(1) 또는 닫힘(0), 판별한 사용자 이름 또는 None) 튜플
+    """
 
     """
-    원할한 벡터 추출을 위해 저장된 이미지 전처리
+    원할한 벡터 추출을 위해 캡처된 프레임 전처리
     """
-    # 전처리 및 얼굴 벡터 추출
-    face_vectors = preprocess_image_and_extract_vector(unique_img_name)
+    # 전처리 및 얼굴 벡터 추출 (JPEG 저장/로드 없이 프레임을 바로 사용)
+    face_vectors = preprocess_image_and_extract_vector(captured_image)
 
     # 벡터 확인
     if not face_vectors:
         print('벡터 추출에 실패했습니다.')
-        return
+        return 0, None
 
 
     # 디버깅용 메세지
@@ -62,10 +131,68 @@ def main():
     # print(face_vectors[0])
 
     """
-    딥러닝 과정 수행
+    등록된 사용자 중 가장 가까운 사용자를 식별
     """
-    result = measure_similarity(user_name, face_vectors[0])
-    print(result)
+    if user_name is None:
+        gallery = Gallery.load()
+        with metrics.stage("classification"):
+            candidates = gallery.identify(face_vectors[0], k=3)
+        print(f'식별 후보: {candidates}')
+
+        # 가장 가까운 사용자도 허용 거리를 벗어나면 등록되지 않은 사용자
+        if not candidates or candidates[0][1] > TOLERANCE:
+            print("등록되지 않은 사용자입니다.")
+            return 0, None
+        user_name = candidates[0][0]
+
+    """
+    저장된 모델로 사용자 판별 (TensorFlow 없이 NumPy 추론)
+    """
+    return verify_user(user_name, face_vectors[0]), user_name
+
+
+def export_metrics():
+    """
+    계측이 켜져 있으면 단계별 시간을 설정한 경로로 내보내기 (config.METRICS_ENABLED)
+    """
+    metrics.export(METRICS_PROM_PATH, METRICS_JSONL_PATH)
+
+def live(user_name=None):
+    """
+    실시간 인식 모드: 촬영 버튼 없이 스트리밍 중 일부 프레임을 인식하고,
+    최근 여러 프레임의 결과를 투표로 합쳐 도어락 열림 여부를 결정
+
+    :param user_name: 확인할 사용자 이름 (None이면 등록된 모든 사용자 중에서 식별)
+    """
+    from utils.live_recognition import LiveRecognizer
+
+    preload_modules()
+    recognizer = LiveRecognizer(user_name)
+    decided_frame = run_CameraApp(recognizer)
+
+    if recognizer.decision is None:
+        print("등록되지 않은 사용자입니다.")
+        print(0)
+        return
+
+    # 열림이 결정된 프레임은 기록용으로 저장
+    if SAVE_CAPTURES and decided_frame is not None:
+        save_image_async(decided_frame, decision=1, identity=recognizer.decision)
+    print(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python app.py enroll [user_name] : 사용자 등록 및 모델 학습
+    # python app.py verify user_name   : 지정한 사용자인지 확인
+    # python app.py live [user_name]   : 촬영 버튼 없이 실시간 인식
+    # python app.py                    : 등록된 모든 사용자 중에서 식별
+    try:
+        if len(sys.argv) > 1 and sys.argv[1] == "enroll":
+            enroll(sys.argv[2] if len(sys.argv) > 2 else "wooseong")
+        elif len(sys.argv) > 1 and sys.argv[1] == "live":
+            live(sys.argv[2] if len(sys.argv) > 2 else None)
+        elif len(sys.argv) > 2 and sys.argv[1] == "verify":
+            main(sys.argv[2])
+        else:
+            main()
+    finally:
+        export_metrics()
@@ -0,0 +1,141 @@
+import sys
+import time
+import argparse
+import numpy as np
+from models.ann_index import IVFIndex
+from models.gallery import Gallery
+from benchmarks.quantization_report import make_synthetic_gallery
+
+"""
+    : 근사 최근접 이웃 색인(IVF)의 묶음 수(nlist), 검색 묶음 수(nprobe)별 정확도와 속도를 전체 비교(exact)와 비교
+        - recall@k : 전체 비교로 찾은 가장 가까운 k개 벡터 중 색인으로 찾은 비율
+        - 식별 일치 : 가장 가까운 사용자가 전체 비교 결과와 같은 비율
+        - 검색/초 : 입력 벡터를 배치로 검색할 때의 초당 처리 수
+    : 색인의 90%로 묶음을 학습한 후 나머지 10%를 추가(add)해 재학습 없이 추가한 벡터도 검색되는지 함께 확인
+
+    실행 방법 (프로젝트 루트에서)
+        python -m benchmarks.ann_report --synthetic-users 10000 --per-user 20 --nprobe 1 4 8 16 32
+"""
+
+
+def exact_search(vectors, queries, k, batch=256):
+    """
+    전체 비교로 가장 가까운 k개 벡터
+
+    :return: ((Q, k) id 배열, 검색 시간(초)) 튜플
+    """
+    gallery = Gallery(vectors, np.zeros(len(vectors), dtype=str), "float32")
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    start = time.perf_counter()
+    for begin in range(0, len(queries), batch):
+        distances = gallery.distances(queries[begin:begin + batch])
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(distances, top, axis=1), axis=1)
+        ids[begin:begin + batch] = np.take_along_axis(top, order, axis=1)
+    return ids, time.perf_counter() - start
+
+
+def recall_at_k(found, expected):
+    """
+    입력 벡터 별 recall@k 평균
+
+    :param found: (Q, k) 색인 검색 결과 id
+    :param expected: (Q, k) 전체 비교 결과 id
+    :return: 0 ~ 1 사이의 값 (float)
+    """
+    return float(np.mean([len(np.intersect1d(a, b)) / len(b) for a, b in zip(found, expected)]))
+
+
+def run_report(vectors, labels, queries, nlists, nprobes, k=10, batch=256, seed=0):
+    """
+    nlist, nprobe 조합별 측정
+
+    :param vectors: (N, 128) 등록 벡터
+    :param labels: (N, ) 사용자 이름 배열
+    :param queries: (Q, 128) 입력 벡터
+    :param nlists: 비교할 묶음 수 리스트 (None은 4 * sqrt(N))
+    :param nprobes: 비교할 검색 묶음 수 리스트
+    :param k: recall 계산에 사용하는 벡터 수
+    :return: (전체 비교 결과 dict, 조합별 결과 dict 리스트) 튜플
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    labels = np.asarray(labels)
+    exact_ids, exact_time = exact_search(vectors, queries, k, batch)
+    exact = {'qps': len(queries) / exact_time, 'users': labels[exact_ids[:, 0]]}
+
+    # 묶음 학습에는 90%만 사용하고 나머지는 학습 후 추가
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(vectors))
+    trained, inserted = order[:int(len(order) * 0.9)], order[int(len(order) * 0.9):]
+
+    results = []
+    for nlist in nlists:
+        start = time.perf_counter()
+        index = IVFIndex.train(vectors[trained], nlist, seed=seed)
+        index.add(vectors[trained], trained, labels[trained])
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index.add(vectors[inserted], inserted, labels[inserted])
+        insert_time = time.perf_counter() - start
+
+        for nprobe in nprobes:
+            ids = np.empty((len(queries), k), dtype=np.int64)
+            start = time.perf_counter()
+            for begin in range(0, len(queries), batch):
+                ids[begin:begin + batch] = index.search(queries[begin:begin + batch], k, nprobe)[1]
+            elapsed = time.perf_counter() - start
+
+            inserted_mask = np.isin(exact_ids[:, 0], inserted)
+            results.append({
+                'nlist': index.nlist, 'nprobe': min(nprobe, index.nlist),
+                'build_seconds': build_time, 'insert_ms_per_vector': insert_time / max(len(inserted), 1) * 1000,
+                'recall': recall_at_k(ids, exact_ids),
+                'inserted_recall': float(np.mean(ids[inserted_mask, 0] == exact_ids[inserted_mask, 0]))
+                if inserted_mask.any() else float('nan'),
+                'agreement': float(np.mean(labels[ids[:, 0]] == exact['users'])),
+                'qps': len(queries) / elapsed,
+            })
+
+    return exact, results
+
+
+def print_report(exact, results, count, k):
+    """
+    조합별 결과를 표로 출력
+    """
+    print(f'등록 벡터 {count}개, 전체 비교 {exact["qps"]:.0f} 검색/초')
+    print(f'{"nlist":>7}{"nprobe":>8}{"학습(초)":>10}{"추가(ms/개)":>13}{f"recall@{k}":>11}'
+          f'{"추가분 top1":>12}{"식별 일치":>11}{"검색/초":>10}{"배율":>7}')
+    for row in results:
+        print(f'{row["nlist"]:>7}{row["nprobe"]:>8}{row["build_seconds"]:>10.2f}{row["insert_ms_per_vector"]:>13.4f}'
+              f'{row["recall"]:>11.2%}{row["inserted_recall"]:>12.2%}{row["agreement"]:>11.2%}'
+              f'{row["qps"]:>10.0f}{row["qps"] / exact["qps"]:>6.1f}x')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="근사 최근접 이웃 색인 정확도/속도 비교")
+    parser.add_argument("--synthetic-users", type=int, default=0, help="합성 사용자 수 (지정 시 등록 데이터 대신 사용)")
+    parser.add_argument("--per-user", type=int, default=20, help="합성 사용자당 벡터 수")
+    parser.add_argument("--queries", type=int, default=1000, help="입력 벡터 수")
+    parser.add_argument("--nlist", type=int, nargs="+", default=[0], help="비교할 묶음 수 (0은 4 * sqrt(N))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32], help="비교할 검색 묶음 수")
+    parser.add_argument("-k", type=int, default=10, help="recall@k의 k")
+    args = parser.parse_args()
+
+    if args.synthetic_users:
+        vectors, labels = make_synthetic_gallery(args.synthetic_users, args.per_user)
+    else:
+        gallery = Gallery.load(vector_format="float32")
+        vectors, labels = gallery.vectors, gallery.labels
+    if len(vectors) <= args.k:
+        print('비교할 등록 벡터가 부족합니다. (--synthetic-users N 으로 합성 데이터 사용 가능)')
+        sys.exit(1)
+
+    # 입력 벡터 : 등록 벡터에 추출 오차 정도의 잡음을 더한 새 벡터
+    rng = np.random.default_rng(1)
+    rows = rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)
+    queries = (vectors[rows] + rng.normal(scale=0.03, size=(len(rows), vectors.shape[1]))).astype(np.float32)
+
+    exact, results = run_report(vectors, labels, queries, [n or None for n in args.nlist], args.nprobe, args.k)
+    print_report(exact, results, len(vectors), args.k)
@@ -0,0 +1,128 @@
+import sys
+import time
+import argparse
+import numpy as np
+from models.gallery import Gallery, TOLERANCE
+from utils.gallery_compaction import compact_vectors
+
+"""
+    : 사용자 벡터 압축(utils/gallery_compaction.py) 전후의 크기, 식별 시간, 일치율 비교 (저장소는 수정하지 않음)
+        - 사용자마다 벡터의 20%를 입력으로 따로 두고, 나머지 80%로 압축 전/후 Gallery를 만들어 비교
+        - 일치율 : 입력 벡터의 가장 가까운 사용자가 실제 사용자이고 허용 거리(TOLERANCE) 이내인 비율
+        - 식별 시간 : 입력 벡터 전체를 identify_batch로 식별하는 데 걸린 시간 (ms/검색)
+
+    실행 방법 (프로젝트 루트에서)
+        python -m benchmarks.compaction_report -k 4 8 16
+        python -m benchmarks.compaction_report --synthetic-users 200 --per-user 300 -k 4 8 16
+"""
+
+
+def split_users(user_vectors, holdout=0.2, seed=0):
+    """
+    사용자 별 벡터를 등록용과 입력용으로 분할
+
+    :param user_vectors: {사용자 이름: (N, 128) 벡터} dict
+    :param holdout: 입력용 비율
+    :return: (등록용 dict, 입력 벡터, 입력 레이블) 튜플
+    """
+    rng = np.random.default_rng(seed)
+    enrolled, queries, labels = {}, [], []
+    for name, vectors in user_vectors.items():
+        order = rng.permutation(len(vectors))
+        count = int(len(vectors) * holdout) if len(vectors) > 1 else 0
+        enrolled[name] = vectors[order[count:]]
+        queries.append(vectors[order[:count]])
+        labels += [name] * count
+    return enrolled, np.concatenate(queries), np.array(labels)
+
+
+def evaluate(gallery, queries, labels, repeat=3):
+    """
+    Gallery의 식별 일치율과 시간
+
+    :return: (일치율, ms/검색) 튜플
+    """
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = gallery.identify_batch(queries, k=1)
+        elapsed.append(time.perf_counter() - start)
+    matched = [bool(candidates) and candidates[0][0] == label and candidates[0][1] <= TOLERANCE
+               for candidates, label in zip(results, labels)]
+    return float(np.mean(matched)), min(elapsed) / len(queries) * 1000
+
+
+def build_gallery(user_vectors):
+    """
+    {사용자 이름: 벡터} dict로 Gallery 생성
+    """
+    names = sorted(user_vectors)
+    return Gallery(np.concatenate([user_vectors[name] for name in names]),
+                   np.concatenate([np.full(len(user_vectors[name]), name) for name in names]))
+
+
+def run_report(user_vectors, ks):
+    """
+    k 값별 압축 전후 비교
+
+    :param user_vectors: {사용자 이름: (N, 128) 벡터} dict
+    :param ks: 비교할 최대 대표 벡터 수 리스트
+    :return: [{k, vectors, bytes, match_rate, ms_per_query, compact_seconds}, ...] 리스트 (첫 항목은 압축 전)
+    """
+    enrolled, queries, labels = split_users(user_vectors)
+    baseline = build_gallery(enrolled)
+    match_rate, ms = evaluate(baseline, queries, labels)
+    results = [{'k': None, 'vectors': len(baseline), 'bytes': baseline.matrix.nbytes,
+                'match_rate': match_rate, 'ms_per_query': ms, 'compact_seconds': 0.0}]
+
+    for k in ks:
+        start = time.perf_counter()
+        compacted = {}
+        for name, vectors in enrolled.items():
+            compacted[name] = vectors[compact_vectors(vectors, k)[0]] if len(vectors) > k else vectors
+        compact_seconds = time.perf_counter() - start
+
+        gallery = build_gallery(compacted)
+        match_rate, ms = evaluate(gallery, queries, labels)
+        results.append({'k': k, 'vectors': len(gallery), 'bytes': gallery.matrix.nbytes,
+                        'match_rate': match_rate, 'ms_per_query': ms, 'compact_seconds': compact_seconds})
+    return results
+
+
+def print_report(results, queries):
+    """
+    k 값별 결과를 표로 출력
+    """
+    base = results[0]
+    print(f'입력 벡터 {queries}개')
+    print(f'{"k":>6}{"벡터 수":>10}{"메모리(MB)":>12}{"크기 비율":>10}{"일치율":>9}{"일치율 변화":>12}'
+          f'{"ms/검색":>10}{"압축(초)":>10}')
+    for row in results:
+        print(f'{row["k"] if row["k"] else "압축 전":>6}{row["vectors"]:>10}{row["bytes"] / 1e6:>12.2f}'
+              f'{row["bytes"] / base["bytes"]:>10.1%}{row["match_rate"]:>9.2%}'
+              f'{(row["match_rate"] - base["match_rate"]) * 100:>+11.2f}p{row["ms_per_query"]:>10.3f}'
+              f'{row["compact_seconds"]:>10.2f}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="사용자 벡터 압축 전후 비교")
+    parser.add_argument("--synthetic-users", type=int, default=0, help="합성 사용자 수 (지정 시 등록 데이터 대신 사용)")
+    parser.add_argument("--per-user", type=int, default=300, help="합성 사용자당 벡터 수")
+    parser.add_argument("-k", type=int, nargs="+", default=[4, 8, 16], help="비교할 최대 대표 벡터 수")
+    args = parser.parse_args()
+
+    if args.synthetic_users:
+        from benchmarks.quantization_report import make_synthetic_gallery
+
+        vectors, labels = make_synthetic_gallery(args.synthetic_users, args.per_user, spread=0.03)
+        user_vectors = {str(name): vectors[labels == name].astype(np.float32) for name in np.unique(labels)}
+    else:
+        from utils.embedding_store import EmbeddingStore, load_user_vectors
+
+        user_vectors = {name: load_user_vectors(name) for name in EmbeddingStore().users()}
+    if not user_vectors:
+        print('등록된 사용자가 없습니다. (--synthetic-users N 으로 합성 데이터 사용 가능)')
+        sys.exit(1)
+
+    results = run_report(user_vectors, args.k)
+    print_report(results, sum(int(len(v) * 0.2) for v in user_vectors.values() if len(v) > 1))
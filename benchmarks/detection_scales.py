@@ -0,0 +1,106 @@
+import sys
+import time
+import argparse
+import numpy as np
+import cv2 as cv
+from config import IMAGE_DIR
+from utils.face_boxes import box_iou
+from utils.image_files import list_images
+from utils.preprocessing_of_captured import apply_histogram_equalization, detect_faces
+
+"""
+    : 얼굴 검출용 이미지 축소 너비별 검출 시간과 정확도 비교
+    : 원본 해상도 검출 결과를 기준으로 각 너비에서의
+        - 평균 검출 시간 (ms)
+        - 검출률 (기준 얼굴과 IoU 0.5 이상으로 겹치는 비율)
+        - 평균 IoU
+        - 원본 해상도에서 추출한 벡터와 기준 벡터 간 평균 거리
+      를 표로 출력
+
+    실행 방법 (프로젝트 루트에서)
+        python -m benchmarks.detection_scales --images data/user_faces --widths 320 480 640 960
+"""
+
+
+def run_benchmark(image_paths, widths, repeat=1):
+    """
+    너비별 검출 시간과 정확도 측정
+
+    :param image_paths: 이미지 경로 리스트
+    :param widths: 비교할 검출 너비 리스트 (원본 해상도 기준은 자동 포함)
+    :param repeat: 이미지 당 반복 측정 횟수 (int)
+    :return: [{width, ms, recall, iou, distance}, ...] 리스트
+    """
+    import face_recognition
+
+    # 원본 해상도 기준 결과
+    images = []
+    for path in image_paths:
+        image = cv.imread(path)
+        if image is None:
+            print(f'이미지를 로드할 수 없습니다: {path}')
+            continue
+        equalized = apply_histogram_equalization(image)
+        reference = detect_faces(equalized)
+        encodings = face_recognition.face_encodings(equalized, reference)
+        images.append((equalized, reference, encodings))
+
+    rows = []
+    for width in [None] + list(widths):
+        times, ious, distances = [], [], []
+        matched = total = 0
+        for equalized, reference, reference_encodings in images:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                locations = detect_faces(equalized, target_width=width)
+            times.append((time.perf_counter() - start) / repeat * 1000)
+
+            total += len(reference)
+            for ref_box, ref_encoding in zip(reference, reference_encodings):
+                best = max(locations, key=lambda box: box_iou(box, ref_box), default=None)
+                if best is None or box_iou(best, ref_box) < 0.5:
+                    continue
+                matched += 1
+                ious.append(box_iou(best, ref_box))
+                # 검출 좌표만 축소 이미지에서 구하고 벡터는 원본 해상도에서 추출
+                encoding = face_recognition.face_encodings(equalized, [best])[0]
+                distances.append(float(np.linalg.norm(encoding - ref_encoding)))
+
+        rows.append({
+            'width': width or '원본',
+            'ms': float(np.mean(times)) if times else 0.0,
+            'recall': matched / total if total else 0.0,
+            'iou': float(np.mean(ious)) if ious else 0.0,
+            'distance': float(np.mean(distances)) if distances else 0.0,
+        })
+
+    return rows
+
+
+def print_table(rows):
+    """
+    측정 결과를 표로 출력
+
+    :param rows: run_benchmark()의 반환 값
+    """
+    print(f'{"너비":>8}{"검출(ms)":>12}{"속도 향상":>10}{"검출률":>10}{"평균 IoU":>10}{"벡터 거리":>12}')
+    base_ms = rows[0]['ms'] or 1.0
+    for row in rows:
+        print(f'{str(row["width"]):>8}{row["ms"]:>12.1f}{base_ms / (row["ms"] or 1.0):>9.1f}x'
+              f'{row["recall"]:>10.2%}{row["iou"]:>10.3f}{row["distance"]:>12.4f}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="얼굴 검출 축소 너비별 시간/정확도 비교")
+    parser.add_argument("--images", default=IMAGE_DIR, help="이미지 폴더")
+    parser.add_argument("--widths", type=int, nargs="+", default=[320, 480, 640, 960], help="비교할 검출 너비")
+    parser.add_argument("--repeat", type=int, default=3, help="이미지 당 반복 측정 횟수")
+    args = parser.parse_args()
+
+    paths = list_images(args.images)
+    if not paths:
+        print(f'이미지를 찾을 수 없습니다: {args.images}')
+        sys.exit(1)
+
+    print(f'{len(paths)}장의 이미지로 측정합니다.')
+    print_table(run_benchmark(paths, args.widths, args.repeat))
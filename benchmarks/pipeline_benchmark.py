@@ -0,0 +1,262 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import numpy as np
+import cv2 as cv
+from config import IMAGE_DIR, get_weights_path
+from utils.image_files import list_images
+from utils.preprocessing_of_captured import apply_histogram_equalization
+
+"""
+    : 웹캠 없이 CPU에서 인식 파이프라인의 단계별 시간을 측정하는 벤치마크
+    : 단계
+        - imread : 이미지 파일 로드 (cv.imread)
+        - equalize : 히스토그램 균등화 (apply_histogram_equalization)
+        - detect_hog / detect_cnn : 얼굴 위치 검출 (face_recognition.face_locations)
+        - encode : 128차원 벡터 추출 (face_recognition.face_encodings)
+        - classify : 사용자 모델 예측 (NumPy 추론)
+        - end_to_end : 위 단계 전체 (detect_cnn 제외)
+    : 단계별 p50/p95/p99 지연 시간, 초당 처리 이미지 수, 최대 메모리(RSS)를 JSON으로 저장하고,
+      두 결과 파일을 비교해 성능 저하를 확인
+
+    실행 방법 (프로젝트 루트에서)
+        python -m benchmarks.pipeline_benchmark --images data/user_faces --output bench_before.json
+        python -m benchmarks.pipeline_benchmark --synthetic 50 --output bench_after.json
+        python -m benchmarks.pipeline_benchmark --compare bench_before.json bench_after.json
+"""
+
+STAGES = ("imread", "equalize", "detect_hog", "detect_cnn", "encode", "classify", "end_to_end")
+
+
+def peak_rss_mb():
+    """
+    현재 프로세스의 최대 메모리 사용량 (MB)
+
+    :return: float (측정할 수 없는 환경이면 None)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def make_synthetic_images(count, folder, size=(480, 640), seed=0):
+    """
+    측정용 합성 이미지를 JPEG로 저장 (얼굴이 없는 이미지이므로 검출 이후 단계는 측정되지 않을 수 있음)
+
+    :param count: 이미지 수 (int)
+    :param folder: 저장 폴더
+    :param size: (높이, 너비)
+    :param seed: 난수 시드 (int)
+    :return: 이미지 경로 리스트
+    """
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        # 부드러운 밝기 변화에 잡음을 더한 이미지
+        base = cv.resize(rng.integers(0, 256, (12, 16, 3), dtype=np.uint8), (size[1], size[0]),
+                         interpolation=cv.INTER_CUBIC)
+        noise = rng.integers(0, 16, base.shape, dtype=np.uint8)
+        path = os.path.join(folder, f'synthetic_{i:04d}.jpg')
+        cv.imwrite(path, cv.add(base, noise))
+        paths.append(path)
+    return paths
+
+
+def load_classifier(user_name):
+    """
+    classify 단계에서 사용할 모델 가중치
+    사용자 가중치가 없으면 같은 구조(128 -> 6 -> 5 -> 4 -> 1)의 임의 가중치 사용
+
+    :param user_name: 사용자 이름
+    :return: numpy_inference.load_weights() 형식의 층 목록
+    """
+    from models.numpy_inference import load_weights
+    from utils.vector_checking import get_vector_digest
+
+    # 벤치마크 중 학습이 일어나지 않도록 저장된 가중치 파일만 사용
+    try:
+        weights_path = get_weights_path(user_name, get_vector_digest(user_name))
+    except FileNotFoundError:
+        weights_path = None
+    if weights_path is not None and os.path.exists(weights_path):
+        return load_weights(weights_path)
+    print(f'{user_name}님의 학습된 가중치가 없어 임의 가중치로 측정합니다.')
+
+    rng = np.random.default_rng(0)
+    sizes = [128, 6, 5, 4, 1]
+    return [(rng.normal(size=(a, b)).astype(np.float32), np.zeros(b, dtype=np.float32),
+             'sigmoid' if b == 1 else 'relu') for a, b in zip(sizes[:-1], sizes[1:])]
+
+
+def run_benchmark(image_paths, user_name="wooseong", use_cnn=False, warmup=2, repeat=1):
+    """
+    이미지마다 단계별 시간을 측정
+
+    :param image_paths: 이미지 경로 리스트
+    :param user_name: classify 단계에서 사용할 사용자 이름
+    :param use_cnn: CNN 검출 단계 측정 여부 (bool)
+    :param warmup: 측정 전 준비 실행 횟수 (int)
+    :param repeat: 전체 이미지 반복 횟수 (int)
+    :return: 결과 dict
+    """
+    import face_recognition
+    from models.numpy_inference import forward
+
+    layers = load_classifier(user_name)
+    timings = {stage: [] for stage in STAGES}
+    faces_found = 0
+
+    def timed(stage, function, *args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        timings[stage].append((time.perf_counter() - start) * 1000)
+        return result
+
+    # 라이브러리 초기화 비용이 측정에 포함되지 않도록 준비 실행
+    for path in image_paths[:warmup]:
+        image = apply_histogram_equalization(cv.imread(path))
+        face_recognition.face_encodings(image, face_recognition.face_locations(image))
+
+    total_start = time.perf_counter()
+    processed = 0
+    for _ in range(repeat):
+        for path in image_paths:
+            start = time.perf_counter()
+            image = timed("imread", cv.imread, path)
+            if image is None:
+                print(f'이미지를 로드할 수 없습니다: {path}')
+                continue
+            equalized = timed("equalize", apply_histogram_equalization, image)
+            locations = timed("detect_hog", face_recognition.face_locations, equalized)
+            if locations:
+                faces_found += 1
+                encodings = timed("encode", face_recognition.face_encodings, equalized, locations)
+                timed("classify", forward, layers, encodings[0])
+            timings["end_to_end"].append((time.perf_counter() - start) * 1000)
+            processed += 1
+
+            # CNN 검출은 전체 시간과 별도로 측정
+            if use_cnn:
+                timed("detect_cnn", face_recognition.face_locations, equalized, model="cnn")
+    total_seconds = time.perf_counter() - total_start
+
+    stages = {}
+    for stage, values in timings.items():
+        if not values:
+            continue
+        values = np.asarray(values)
+        stages[stage] = {
+            'count': int(len(values)),
+            'mean_ms': float(values.mean()),
+            'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)),
+            'p99_ms': float(np.percentile(values, 99)),
+        }
+
+    end_to_end_seconds = sum(timings["end_to_end"]) / 1000
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'images': len(image_paths),
+        'processed': processed,
+        'faces_found': faces_found,
+        'throughput_ips': processed / end_to_end_seconds if end_to_end_seconds else 0.0,
+        'wall_seconds': total_seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'stages': stages,
+    }
+
+
+def print_report(result):
+    """
+    측정 결과를 표로 출력
+
+    :param result: run_benchmark()의 반환 값
+    """
+    print(f'이미지 {result["processed"]}장 (얼굴 검출 {result["faces_found"]}장), '
+          f'처리량 {result["throughput_ips"]:.2f}장/초, 최대 메모리 {result["peak_rss_mb"] or 0:.1f} MB')
+    print(f'{"단계":<12}{"횟수":>8}{"p50(ms)":>10}{"p95(ms)":>10}{"p99(ms)":>10}')
+    for stage in STAGES:
+        if stage in result['stages']:
+            row = result['stages'][stage]
+            print(f'{stage:<12}{row["count"]:>8}{row["p50_ms"]:>10.2f}{row["p95_ms"]:>10.2f}{row["p99_ms"]:>10.2f}')
+
+
+def compare_results(base_path, new_path, tolerance=0.10):
+    """
+    두 결과 파일의 단계별 p50/p95 시간과 처리량을 비교
+
+    :param base_path: 기준 결과 JSON 경로
+    :param new_path: 비교할 결과 JSON 경로
+    :param tolerance: 성능 저하로 판단하는 변화율 (0.10 = 10%)
+    :return: 성능 저하가 없으면 True
+    """
+    with open(base_path, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+
+    passed = True
+    print(f'{"단계":<12}{"기준 p50":>10}{"비교 p50":>10}{"변화":>9}{"기준 p95":>10}{"비교 p95":>10}{"변화":>9}')
+    for stage in STAGES:
+        if stage not in base['stages'] or stage not in new['stages']:
+            continue
+        b, n = base['stages'][stage], new['stages'][stage]
+        line = f'{stage:<12}'
+        for key in ('p50_ms', 'p95_ms'):
+            change = (n[key] - b[key]) / b[key] if b[key] else 0.0
+            mark = ' !' if change > tolerance else ''
+            passed &= change <= tolerance
+            line += f'{b[key]:>10.2f}{n[key]:>10.2f}{change:>+8.1%}{mark}'
+        print(line)
+
+    throughput_change = ((new['throughput_ips'] - base['throughput_ips']) / base['throughput_ips']
+                         if base['throughput_ips'] else 0.0)
+    print(f'처리량: {base["throughput_ips"]:.2f} -> {new["throughput_ips"]:.2f}장/초 ({throughput_change:+.1%})')
+    passed &= throughput_change >= -tolerance
+    if not passed:
+        print(f'성능 저하가 감지되었습니다 (허용 변화율 {tolerance:.0%}).')
+
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="인식 파이프라인 단계별 벤치마크")
+    parser.add_argument("--images", default=IMAGE_DIR, help="이미지 폴더")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 이미지 수 (지정 시 --images 대신 사용)")
+    parser.add_argument("--user", default="wooseong", help="classify 단계에서 사용할 사용자 이름")
+    parser.add_argument("--cnn", action="store_true", help="CNN 검출 단계도 측정")
+    parser.add_argument("--repeat", type=int, default=1, help="전체 이미지 반복 횟수")
+    parser.add_argument("--output", help="결과를 저장할 JSON 경로")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="두 결과 파일 비교")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="성능 저하로 판단하는 변화율")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(0 if compare_results(*args.compare, tolerance=args.tolerance) else 1)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if args.synthetic:
+            paths = make_synthetic_images(args.synthetic, temp_dir)
+        else:
+            paths = list_images(args.images)
+        if not paths:
+            print(f'이미지를 찾을 수 없습니다: {args.images} (--synthetic N 으로 합성 이미지 사용 가능)')
+            sys.exit(1)
+
+        result = run_benchmark(paths, args.user, args.cnn, repeat=args.repeat)
+
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f'결과를 저장했습니다: {args.output}')
@@ -0,0 +1,154 @@
+import time
+import argparse
+import tracemalloc
+import numpy as np
+import cv2 as cv
+import utils.preprocessing_of_captured as preprocessing
+from utils.preprocessing_of_captured import (FramePreprocessor, adjust_brightness_and_contrast,
+                                             apply_histogram_equalization, _detection_shape)
+from config import DETECTION_TARGET_WIDTH
+from utils.image_files import list_images
+
+"""
+    : 인식 단계 전처리의 프레임당 배열 할당 수, 할당 크기, 시간을 이전 방식과 비교 (얼굴 검출 전까지)
+        - 이전 방식 : 사용하지 않는 밝기/대비 조정 + 흑백 변환, 균등화, 3채널 변환 (매번 새 배열) + 검출용 축소
+        - 현재 방식 : FramePreprocessor (설정한 전처리만 재사용 버퍼에 dst= 로 기록) + 재사용 버퍼에 검출용 축소
+    : 할당 수는 OpenCV 함수가 입력으로 받은 배열이 아닌 새 배열을 반환한 횟수,
+      최대 메모리는 tracemalloc으로 측정한 프레임 처리 중 최대 추가 메모리
+
+    실행 방법 (프로젝트 루트에서)
+        python -m benchmarks.preprocessing_allocations
+        python -m benchmarks.preprocessing_allocations --images data/user_faces --frames 200
+"""
+
+
+class CountingCV:
+    """
+    OpenCV 함수 호출을 감싸 새로 할당된 출력 배열 수와 크기를 기록하는 모듈 대역 (측정용)
+    """
+    def __init__(self, module):
+        self.module = module
+        self.allocations = 0
+        self.bytes = 0
+
+    def __getattr__(self, name):
+        attribute = getattr(self.module, name)
+        if not callable(attribute) or isinstance(attribute, type):
+            return attribute
+
+        def counted(*args, **kwargs):
+            inputs = {value.__array_interface__['data'][0] for value in list(args) + list(kwargs.values())
+                      if isinstance(value, np.ndarray)}
+            result = attribute(*args, **kwargs)
+            for value in (result if isinstance(result, tuple) else (result, )):
+                if isinstance(value, np.ndarray) and value.__array_interface__['data'][0] not in inputs:
+                    self.allocations += 1
+                    self.bytes += value.nbytes
+            return result
+        return counted
+
+
+def legacy_path(image, target_width=DETECTION_TARGET_WIDTH):
+    """
+    이전 전처리 방식 (사용하지 않는 밝기 조정 결과까지 포함)
+    """
+    adjust_brightness_and_contrast(image, alpha=1.5, beta=50)
+    equalized = apply_histogram_equalization(image)
+    shape = _detection_shape(equalized, None, target_width)
+    if shape[0]:
+        preprocessing.cv.resize(equalized, (shape[1], shape[0]), interpolation=cv.INTER_AREA)
+    return equalized
+
+
+def buffered_path(preprocessor, target_width=DETECTION_TARGET_WIDTH):
+    """
+    재사용 버퍼를 사용하는 현재 전처리 방식
+    """
+    def run(image):
+        output = preprocessor(image)
+        shape = _detection_shape(output, None, target_width)
+        if shape[0]:
+            preprocessing.cv.resize(output, (shape[1], shape[0]), dst=preprocessor.buffer("detection", shape),
+                                    interpolation=cv.INTER_AREA)
+        return output
+    return run
+
+
+def measure(path, frames, warmup=3):
+    """
+    프레임당 할당 수, 할당 크기, 최대 추가 메모리, 시간
+
+    :param path: (프레임) -> 전처리 결과 함수
+    :param frames: BGR 프레임 리스트
+    :return: {'allocations', 'mb', 'peak_mb', 'ms'} dict
+    """
+    for frame in frames[:warmup]:
+        path(frame)
+
+    counter = CountingCV(cv)
+    original = preprocessing.cv
+    preprocessing.cv = counter
+    peaks = []
+    try:
+        tracemalloc.start()
+        for frame in frames:
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            path(frame)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        tracemalloc.stop()
+    finally:
+        preprocessing.cv = original
+
+    # 시간은 계측 없이 따로 측정
+    start = time.perf_counter()
+    for frame in frames:
+        path(frame)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'allocations': counter.allocations / len(frames),
+        'mb': counter.bytes / len(frames) / 1e6,
+        'peak_mb': float(np.median(peaks)) / 1e6,
+        'ms': elapsed / len(frames) * 1000,
+    }
+
+
+def load_frames(folder, count):
+    """
+    이미지 폴더의 프레임 (없으면 None)
+    """
+    frames = [cv.imread(path) for path in list_images(folder)[:count]]
+    return [frame for frame in frames if frame is not None] or None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="전처리 프레임당 할당 수와 시간 비교")
+    parser.add_argument("--images", help="이미지 폴더 (생략하면 합성 프레임)")
+    parser.add_argument("--frames", type=int, default=100, help="프레임 수")
+    parser.add_argument("--sizes", nargs="+", default=["640x480", "1280x720", "1920x1080"],
+                        help="합성 프레임 크기 (너비x높이)")
+    args = parser.parse_args()
+
+    if args.images:
+        frames = load_frames(args.images, args.frames)
+        if frames is None:
+            print(f'이미지를 찾을 수 없습니다: {args.images}')
+            raise SystemExit(1)
+        groups = [(f'{args.images} ({len(frames)}장)', frames)]
+    else:
+        rng = np.random.default_rng(0)
+        groups = []
+        for size in args.sizes:
+            width, height = (int(v) for v in size.split('x'))
+            base = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+            groups.append((size, [np.roll(base, i, axis=1) for i in range(min(args.frames, 20))] *
+                           max(args.frames // 20, 1)))
+
+    print(f'{"입력":<22}{"방식":<8}{"할당 수":>9}{"할당(MB)":>10}{"최대(MB)":>10}{"ms/프레임":>11}')
+    for name, frames in groups:
+        # 크기가 다른 이미지가 섞여 있으면 버퍼를 다시 할당하므로 할당 수에 포함됨
+        for label, path in (("이전", legacy_path), ("현재", buffered_path(FramePreprocessor()))):
+            result = measure(path, frames)
+            print(f'{name:<22}{label:<8}{result["allocations"]:>9.2f}{result["mb"]:>10.2f}'
+                  f'{result["peak_mb"]:>10.2f}{result["ms"]:>11.3f}')
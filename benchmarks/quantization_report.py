@@ -0,0 +1,142 @@
+import sys
+import time
+import argparse
+import numpy as np
+from models.gallery import Gallery, TOLERANCE
+from utils.quantization import FORMATS, QuantizedMatrix
+
+"""
+    : Gallery 벡터 저장 형식(float32 / float16 / int8)별 식별 정확도, 메모리, 검색 시간을 float64 기준과 비교
+    : 등록된 벡터를 하나씩 입력 벡터로 사용하고 나머지 벡터에서 가장 가까운 사용자를 찾음 (leave-one-out)
+        - 정확도 : 가장 가까운 사용자가 실제 사용자와 같은 비율
+        - 기준 일치 : float64 결과와 가장 가까운 사용자 및 허용 거리(TOLERANCE) 판정이 같은 비율
+        - 최대 거리 오차 : float64 거리와의 최대 차이
+
+    실행 방법 (프로젝트 루트에서)
+        python -m benchmarks.quantization_report
+        python -m benchmarks.quantization_report --synthetic-users 1000 --per-user 20
+"""
+
+
+def make_synthetic_gallery(users, per_user, spread=0.05, seed=0):
+    """
+    사용자마다 중심 벡터 주변에 모인 합성 얼굴 벡터 (dlib 벡터와 비슷한 크기)
+
+    :param users: 사용자 수 (int)
+    :param per_user: 사용자당 벡터 수 (int)
+    :param spread: 같은 사용자 벡터의 흩어짐 정도 (float)
+    :param seed: 난수 시드 (int)
+    :return: (벡터, 레이블) 튜플
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=0.1, size=(users, 128))
+    vectors = np.repeat(centers, per_user, axis=0) + rng.normal(scale=spread, size=(users * per_user, 128))
+    labels = np.repeat([f'user{i:05d}' for i in range(users)], per_user)
+    return vectors, labels
+
+
+def leave_one_out(distances_of, labels, queries, query_rows, batch=256):
+    """
+    입력 벡터 별로 자기 자신을 제외한 가장 가까운 벡터의 사용자와 거리
+
+    :param distances_of: (입력 벡터 배치) -> (배치, N) 거리 행렬 함수
+    :param labels: (N, ) 사용자 이름 배열
+    :param queries: (Q, 128) 입력 벡터
+    :param query_rows: 입력 벡터 별 등록 위치 (자기 자신 제외용)
+    :return: (가장 가까운 사용자 배열, 거리 배열, 전체 거리 행렬, 검색 시간(초)) 튜플
+    """
+    nearest = np.empty(len(queries), dtype=np.intp)
+    nearest_distance = np.empty(len(queries))
+    all_distances = []
+    elapsed = 0.0
+    for start in range(0, len(queries), batch):
+        begin = time.perf_counter()
+        distances = np.array(distances_of(queries[start:start + batch]), dtype=np.float64)
+        elapsed += time.perf_counter() - begin
+
+        distances[np.arange(len(distances)), query_rows[start:start + batch]] = np.inf
+        nearest[start:start + batch] = distances.argmin(axis=1)
+        nearest_distance[start:start + batch] = distances.min(axis=1)
+        all_distances.append(distances)
+    return labels[nearest], nearest_distance, np.concatenate(all_distances), elapsed
+
+
+def run_report(vectors, labels, max_queries=2000, seed=0):
+    """
+    형식별 비교
+
+    :param vectors: (N, 128) 등록 벡터
+    :param labels: (N, ) 사용자 이름 배열
+    :param max_queries: 입력으로 사용할 최대 벡터 수 (int)
+    :param seed: 입력 벡터 선택 시드
+    :return: 형식별 결과 dict 리스트 (첫 항목은 float64 기준)
+    """
+    vectors64 = np.asarray(vectors, dtype=np.float64)
+    labels = np.asarray(labels)
+    rng = np.random.default_rng(seed)
+    query_rows = np.sort(rng.choice(len(vectors64), min(max_queries, len(vectors64)), replace=False))
+    queries = vectors64[query_rows].astype(np.float32)
+
+    norms64 = np.einsum('ij,ij->i', vectors64, vectors64)
+
+    def distances64(q):
+        q = q.astype(np.float64)
+        squared = norms64 - 2 * q @ vectors64.T + np.einsum('ij,ij->i', q, q)[:, None]
+        return np.sqrt(np.maximum(squared, 0))
+
+    base_users, base_distance, base_all, base_time = leave_one_out(distances64, labels, queries, query_rows)
+    base_accept = base_distance <= TOLERANCE
+    results = [{
+        'format': 'float64', 'bytes': vectors64.nbytes + norms64.nbytes,
+        'accuracy': float(np.mean(base_users == labels[query_rows])),
+        'agreement': 1.0, 'decision_agreement': 1.0, 'max_error': 0.0,
+        'ms_per_query': base_time / len(queries) * 1000,
+    }]
+
+    for vector_format in FORMATS:
+        matrix = QuantizedMatrix.from_float(vectors64, vector_format)
+        users, distance, all_distances, elapsed = leave_one_out(matrix.distances, labels, queries, query_rows)
+        finite = np.isfinite(base_all)
+        results.append({
+            'format': vector_format,
+            'bytes': matrix.nbytes,
+            'accuracy': float(np.mean(users == labels[query_rows])),
+            'agreement': float(np.mean(users == base_users)),
+            'decision_agreement': float(np.mean((distance <= TOLERANCE) == base_accept)),
+            'max_error': float(np.abs(all_distances[finite] - base_all[finite]).max()),
+            'ms_per_query': elapsed / len(queries) * 1000,
+        })
+
+    return results
+
+
+def print_report(results, count):
+    """
+    형식별 결과를 표로 출력
+    """
+    print(f'등록 벡터 {count}개')
+    print(f'{"형식":<10}{"메모리(MB)":>12}{"벡터당(B)":>11}{"정확도":>9}{"기준 일치":>11}{"판정 일치":>11}'
+          f'{"최대 오차":>11}{"ms/검색":>10}')
+    for row in results:
+        print(f'{row["format"]:<10}{row["bytes"] / 1e6:>12.2f}{row["bytes"] / count:>11.1f}{row["accuracy"]:>9.2%}'
+              f'{row["agreement"]:>11.2%}{row["decision_agreement"]:>11.2%}{row["max_error"]:>11.5f}'
+              f'{row["ms_per_query"]:>10.3f}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gallery 벡터 저장 형식 비교")
+    parser.add_argument("--synthetic-users", type=int, default=0, help="합성 사용자 수 (지정 시 등록 데이터 대신 사용)")
+    parser.add_argument("--per-user", type=int, default=20, help="합성 사용자당 벡터 수")
+    parser.add_argument("--queries", type=int, default=2000, help="입력으로 사용할 최대 벡터 수")
+    args = parser.parse_args()
+
+    if args.synthetic_users:
+        vectors, labels = make_synthetic_gallery(args.synthetic_users, args.per_user)
+    else:
+        gallery = Gallery.load(vector_format="float32")
+        vectors, labels = gallery.vectors, gallery.labels
+    if len(vectors) < 2:
+        print('비교할 등록 벡터가 부족합니다. (--synthetic-users N 으로 합성 데이터 사용 가능)')
+        sys.exit(1)
+
+    print_report(run_report(vectors, labels, args.queries), len(vectors))
@@ -0,0 +1,145 @@
+import time
+import argparse
+import numpy as np
+from models.numpy_inference import THRESHOLD, forward
+from models.shared_model import SharedModel
+from benchmarks.quantization_report import make_synthetic_gallery
+
+"""
+    : 사용자 수(N)에 따른 공유 모델(models/shared_model.py)과 사용자별 모델의 학습 시간, 추론 시간 비교 (합성 벡터)
+        - 공유 모델 학습 : 모든 사용자 벡터로 한 번 학습하는 시간
+        - 사용자별 학습 : Keras 모델(128 -> 6 -> 5 -> 4 -> 1) 하나의 학습 시간 x N (TensorFlow가 있을 때만, 추정값)
+        - 추론 시간 : 입력 벡터 1개로 모든 사용자 점수를 계산하는 시간 (μs, 중앙값)
+            - 공유 모델 : 순전파 1회
+            - 사용자별 모델 : 같은 구조의 NumPy 순전파 N회 (가중치는 로드된 상태)
+        - 본인 수락률 : 학습에 사용하지 않은 사용자 벡터(20%)의 본인 점수가 THRESHOLD를 넘은 비율
+        - 1순위 정확도 : 가장 높은 점수의 사용자가 실제 사용자인 비율
+        - 미등록 수락률 : 학습하지 않은 사용자(N의 10%, 최소 5명) 벡터의 최고 점수가 THRESHOLD를 넘은 비율 (낮을수록 좋음)
+
+    실행 방법 (프로젝트 루트에서)
+        python -m benchmarks.shared_model_scaling
+        python -m benchmarks.shared_model_scaling --users 10 100 1000 5000 --per-user 20
+"""
+
+
+def time_scoring(score, queries, repeat=50):
+    """
+    입력 벡터 1개의 전체 사용자 점수 계산 시간 중앙값
+
+    :param score: (1, 128) 입력 -> 점수 함수
+    :param queries: 입력으로 사용할 벡터
+    :return: 초 단위 시간 (float)
+    """
+    samples = []
+    for i in range(repeat):
+        query = queries[i % len(queries)].reshape(1, -1)
+        start = time.perf_counter()
+        score(query)
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples))
+
+
+def per_user_layers(users, seed=0):
+    """
+    사용자별 모델과 같은 구조(128 -> 6 -> 5 -> 4 -> 1)의 임의 가중치 층 목록 (추론 시간 측정용)
+    """
+    rng = np.random.default_rng(seed)
+    sizes = [128, 6, 5, 4, 1]
+    activations = ['relu', 'relu', 'relu', 'sigmoid']
+    return [[(rng.normal(size=(a, b)).astype(np.float32), np.zeros(b, dtype=np.float32), activation)
+             for a, b, activation in zip(sizes[:-1], sizes[1:], activations)] for _ in range(users)]
+
+
+def keras_training_seconds(vectors):
+    """
+    사용자별 Keras 모델 하나의 학습 시간 (faces_training.train_model과 같은 설정, TensorFlow가 없으면 None)
+    """
+    try:
+        from tensorflow.keras.layers import Input, Dense
+        from tensorflow.keras.models import Sequential
+    except ImportError:
+        return None
+
+    model = Sequential([Input(shape=(128, )), Dense(units=6, activation='relu'), Dense(units=5, activation='relu'),
+                        Dense(units=4, activation='relu'), Dense(units=1, activation='sigmoid')])
+    model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+    start = time.perf_counter()
+    model.fit(vectors, np.ones((len(vectors), 1)), epochs=50, batch_size=4, verbose=0)
+    return time.perf_counter() - start
+
+
+def run_scaling(user_counts, per_user=20, spread=0.03, holdout=0.2, seed=0):
+    """
+    사용자 수별 학습 시간, 추론 시간, 판별 결과
+
+    :param user_counts: 비교할 사용자 수 리스트
+    :param per_user: 사용자당 벡터 수
+    :param spread: 같은 사용자 벡터의 흩어짐 정도
+    :param holdout: 평가용으로 따로 두는 벡터 비율
+    :return: [{users, vectors, train_seconds, keras_seconds, shared_us, per_user_us,
+               genuine, top1, impostor}, ...] 리스트
+    """
+    results = []
+    keras_seconds = None
+    for users in user_counts:
+        unknown = max(users // 10, 5)
+        vectors, labels = make_synthetic_gallery(users + unknown, per_user, spread, seed)
+        vectors = vectors.astype(np.float32)
+        names = np.unique(labels)
+        known = np.isin(labels, names[:users])
+
+        rng = np.random.default_rng(seed)
+        rows = np.flatnonzero(known)
+        test = rng.random(len(rows)) < holdout
+        train_rows, test_rows = rows[~test], rows[test]
+
+        start = time.perf_counter()
+        model = SharedModel.train(vectors[train_rows], labels[train_rows], seed=seed, verbose=False)
+        train_seconds = time.perf_counter() - start
+
+        scores = model.scores(vectors[test_rows])
+        columns = np.array([model.columns[name] for name in labels[test_rows]])
+        genuine = float(np.mean(scores[np.arange(len(columns)), columns] > THRESHOLD))
+        top1 = float(np.mean(scores.argmax(axis=1) == columns))
+        impostor = float(np.mean(model.scores(vectors[~known]).max(axis=1) > THRESHOLD))
+
+        layers = per_user_layers(users, seed)
+        queries = vectors[test_rows]
+        shared_seconds = time_scoring(model.scores, queries)
+        per_user_seconds = time_scoring(lambda x: [forward(user_layers, x) for user_layers in layers], queries,
+                                        repeat=max(5, min(50, 20000 // users)))
+
+        # Keras 모델 하나의 학습 시간은 사용자 수와 무관하므로 한 번만 측정 (TensorFlow가 없으면 0)
+        if keras_seconds is None:
+            keras_seconds = keras_training_seconds(vectors[train_rows][:int(per_user * (1 - holdout))]) or 0.0
+
+        results.append({
+            'users': users, 'vectors': len(train_rows), 'train_seconds': train_seconds,
+            'keras_seconds': keras_seconds * users if keras_seconds else None,
+            'shared_us': shared_seconds * 1e6, 'per_user_us': per_user_seconds * 1e6,
+            'genuine': genuine, 'top1': top1, 'impostor': impostor,
+        })
+    return results
+
+
+def print_scaling(results):
+    """
+    사용자 수별 결과를 표로 출력
+    """
+    print(f'{"사용자":>7}{"벡터":>8}{"공유 학습(초)":>14}{"사용자별 학습(초)":>18}{"공유 추론(μs)":>15}'
+          f'{"사용자별 추론(μs)":>18}{"본인 수락":>10}{"1순위":>9}{"미등록 수락":>12}')
+    for row in results:
+        keras = f'{row["keras_seconds"]:.1f}' if row['keras_seconds'] else '-'
+        print(f'{row["users"]:>7}{row["vectors"]:>8}{row["train_seconds"]:>14.2f}{keras:>18}'
+              f'{row["shared_us"]:>15.1f}{row["per_user_us"]:>18.1f}{row["genuine"]:>10.2%}'
+              f'{row["top1"]:>9.2%}{row["impostor"]:>12.2%}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="사용자 수에 따른 공유 모델과 사용자별 모델 비교")
+    parser.add_argument("--users", type=int, nargs="+", default=[10, 100, 1000], help="비교할 사용자 수")
+    parser.add_argument("--per-user", type=int, default=20, help="합성 사용자당 벡터 수")
+    parser.add_argument("--spread", type=float, default=0.03, help="같은 사용자 벡터의 흩어짐 정도")
+    args = parser.parse_args()
+
+    print_scaling(run_scaling(args.users, args.per_user, args.spread))
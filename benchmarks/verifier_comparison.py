@@ -0,0 +1,127 @@
+import sys
+import time
+import argparse
+import numpy as np
+from models.prototype import BACKENDS, compute_prototype, predict
+from models.numpy_inference import THRESHOLD, load_user_weights, forward
+from models.shared_model import SharedModel
+
+"""
+    : 사용자 판별 방식(keras / prototype / knn / shared)별 판별 시간과 결과 비교
+        - 본인 수락률 : 사용자 자신의 등록 벡터를 수락한 비율
+        - 타인 수락률 : 다른 사용자의 등록 벡터를 수락한 비율 (낮을수록 좋음)
+        - keras 일치 : 같은 입력에 대해 기존 Keras 모델(NumPy 추론)과 판별 결과가 같은 비율
+        - 판별 시간 : 통계/가중치가 로드된 상태에서 벡터 1개 판별 시간 (μs, 중앙값)
+    : keras 가중치가 없는 사용자(학습하지 않은 경우)는 keras 열을 건너뜀
+
+    실행 방법 (프로젝트 루트에서)
+        python -m benchmarks.verifier_comparison
+        python -m benchmarks.verifier_comparison --synthetic-users 50 --per-user 20
+"""
+
+
+def time_single(score, vectors, repeat=200):
+    """
+    벡터 1개 판별 시간 중앙값
+
+    :param score: (1, 128) 입력 -> 점수 함수
+    :param vectors: 입력으로 사용할 벡터
+    :return: 초 단위 시간 (float)
+    """
+    samples = []
+    for i in range(repeat):
+        vector = vectors[i % len(vectors)].reshape(1, -1)
+        start = time.perf_counter()
+        score(vector)
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples))
+
+
+def run_comparison(user_vectors, use_keras=True):
+    """
+    사용자 별로 본인/타인 벡터를 판별해 방식별 결과 집계
+
+    :param user_vectors: {사용자 이름: (N, 128) 벡터} dict
+    :param use_keras: 저장된 keras 가중치 사용 여부
+    :return: 방식별 {'genuine', 'impostor', 'agreement', 'single_us', 'users'} dict
+    """
+    names = list(user_vectors)
+    results = {backend: {'genuine': [], 'impostor': [], 'agreement': [], 'single': []} for backend in BACKENDS}
+    keras_users = 0
+
+    # 공유 모델은 모든 사용자 벡터로 한 번만 학습
+    shared = SharedModel.train(np.concatenate([user_vectors[name] for name in names]),
+                               np.concatenate([np.full(len(user_vectors[name]), name) for name in names]),
+                               verbose=False)
+
+    for name in names:
+        genuine = user_vectors[name]
+        others = [user_vectors[other] for other in names if other != name]
+        impostor = np.concatenate(others) if others else np.zeros((0, 128), dtype=np.float32)
+        queries = np.concatenate([genuine, impostor])
+
+        scorers = {}
+        prototype = compute_prototype(genuine)
+        scorers['prototype'] = lambda x, p=prototype: predict(p, x, "prototype")
+        scorers['knn'] = lambda x, p=prototype: predict(p, x, "knn")
+        scorers['shared'] = lambda x, l=shared.user_layers(name): forward(l, x)
+        if use_keras:
+            try:
+                layers = load_user_weights(name)
+                scorers['keras'] = lambda x, l=layers: forward(l, x)
+                keras_users += 1
+            except (ImportError, FileNotFoundError) as e:
+                print(f'{name}님의 keras 가중치를 사용할 수 없습니다: {e}')
+
+        decisions = {backend: score(queries)[:, 0] > THRESHOLD for backend, score in scorers.items()}
+        for backend, accepted in decisions.items():
+            results[backend]['genuine'].append(accepted[:len(genuine)])
+            results[backend]['impostor'].append(accepted[len(genuine):])
+            results[backend]['single'].append(time_single(scorers[backend], queries))
+            if 'keras' in decisions:
+                results[backend]['agreement'].append(accepted == decisions['keras'])
+
+    summary = {}
+    for backend, result in results.items():
+        if not result['genuine']:
+            continue
+        summary[backend] = {
+            'genuine': float(np.mean(np.concatenate(result['genuine']))),
+            'impostor': float(np.mean(np.concatenate(result['impostor']))) if len(names) > 1 else float('nan'),
+            'agreement': float(np.mean(np.concatenate(result['agreement']))) if result['agreement'] else float('nan'),
+            'single_us': float(np.median(result['single'])) * 1e6,
+            'users': keras_users if backend == 'keras' else len(names),
+        }
+    return summary
+
+
+def print_comparison(summary):
+    """
+    방식별 결과를 표로 출력
+    """
+    print(f'{"방식":<11}{"사용자":>7}{"본인 수락":>11}{"타인 수락":>11}{"keras 일치":>12}{"판별(μs)":>11}')
+    for backend, row in summary.items():
+        print(f'{backend:<11}{row["users"]:>7}{row["genuine"]:>11.2%}{row["impostor"]:>11.2%}'
+              f'{row["agreement"]:>12.2%}{row["single_us"]:>11.1f}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="사용자 판별 방식 비교")
+    parser.add_argument("--synthetic-users", type=int, default=0, help="합성 사용자 수 (keras 비교 없이 실행)")
+    parser.add_argument("--per-user", type=int, default=20, help="합성 사용자당 벡터 수")
+    args = parser.parse_args()
+
+    if args.synthetic_users:
+        from benchmarks.quantization_report import make_synthetic_gallery
+
+        vectors, labels = make_synthetic_gallery(args.synthetic_users, args.per_user)
+        user_vectors = {str(name): vectors[labels == name].astype(np.float32) for name in np.unique(labels)}
+    else:
+        from utils.embedding_store import EmbeddingStore, load_user_vectors
+
+        user_vectors = {name: load_user_vectors(name) for name in EmbeddingStore().users()}
+    if not user_vectors:
+        print('등록된 사용자가 없습니다. (--synthetic-users N 으로 합성 데이터 사용 가능)')
+        sys.exit(1)
+
+    print_comparison(run_comparison(user_vectors, use_keras=not args.synthetic_users))
@@ -9,6 +9,171 @@ VECTOR_DIR = "data/vector_data/"
 # 얼굴 캡처 이미지 저장 폴더
 CAPTURED_DIR = "data/captured_images/"
 
+# 캡처 이미지 아카이브 설정 (utils/capture_archive.py)
+## CAPTURE_ARCHIVE_DIR : 세그먼트 파일 저장 폴더
+## CAPTURE_SEGMENT_BYTES : 새 세그먼트를 시작하는 크기 (bytes)
+## CAPTURE_RETENTION_BYTES : 전체 보관 크기 (bytes, None이면 제한 없음)
+## CAPTURE_RETENTION_DAYS : 보관 기간 (일, None이면 제한 없음)
+## CAPTURE_ARCHIVE_FSYNC : 캡처마다 디스크 기록 확정 여부 (전원이 꺼져도 기록 유지)
+CAPTURE_ARCHIVE_DIR = "data/capture_archive/"
+CAPTURE_SEGMENT_BYTES = 64 * 1024 * 1024
+CAPTURE_RETENTION_BYTES = 2 * 1024 * 1024 * 1024
+CAPTURE_RETENTION_DAYS = 30
+CAPTURE_ARCHIVE_FSYNC = True
+
+# 카메라 화면 갱신 주기 (ms)
+DISPLAY_INTERVAL_MS = 30
+
+# 캡처 이미지 기록용 저장 여부 (백그라운드에서 저장되며 인식 과정에는 영향 없음)
+SAVE_CAPTURES = True
+
+# 학습된 사용자 모델 저장 폴더
+MODEL_DIR = "data/models/"
+
+# 사용자 판별 방식 (models/prototype.py)
+## VERIFIER_BACKEND : "keras" (학습한 모델의 NumPy 추론), "prototype" (중심과 반경), "knn" (가까운 k개 벡터와 반경),
+##                    "shared" (모든 사용자를 함께 학습한 공유 모델, models/shared_model.py)
+## PROTOTYPE_RADIUS_QUANTILE : 반경 보정에 사용하는 등록 벡터 거리 분위수
+## PROTOTYPE_RADIUS_MARGIN : 분위수 거리에 곱하는 여유 배율 (반경은 gallery.TOLERANCE를 넘지 않음)
+## PROTOTYPE_KNN : knn 방식에서 평균을 내는 이웃 수
+VERIFIER_BACKEND = "keras"
+PROTOTYPE_RADIUS_QUANTILE = 0.95
+PROTOTYPE_RADIUS_MARGIN = 1.5
+PROTOTYPE_KNN = 3
+
+# 공유 모델 설정 (models/shared_model.py)
+## SHARED_MODEL_PATH : 학습된 공유 모델 파일 (저장소 버전과 함께 저장, 저장소가 바뀌면 다시 학습)
+## SHARED_MODEL_HIDDEN : 은닉층 크기
+## SHARED_MODEL_EPOCHS, SHARED_MODEL_BATCH_SIZE, SHARED_MODEL_LEARNING_RATE : 학습 반복 수, 배치 크기, 학습률 (Adam)
+## SHARED_MODEL_MIN_STEPS : 최소 가중치 갱신 횟수 (등록 벡터가 적을 때 학습 반복 수를 늘림)
+## SHARED_MODEL_BACKGROUND : 배치마다 추가하는 배경 음성 벡터 비율 (등록 사용자가 아닌 얼굴을 거부하도록 학습)
+SHARED_MODEL_PATH = os.path.join(MODEL_DIR, "shared_model.npz")
+SHARED_MODEL_HIDDEN = 128
+SHARED_MODEL_EPOCHS = 30
+SHARED_MODEL_BATCH_SIZE = 256
+SHARED_MODEL_LEARNING_RATE = 1e-3
+SHARED_MODEL_MIN_STEPS = 300
+SHARED_MODEL_BACKGROUND = 0.25
+
+# 전체 사용자 얼굴 벡터 저장소 파일 (추가 전용 고정 길이 레코드)
+STORE_PATH = os.path.join(VECTOR_DIR, "embeddings.store")
+
+# Gallery(1:N 식별)의 벡터 저장 형식 ("float32", "float16", "int8")
+## float16/int8은 메모리를 1/2, 1/4로 줄이며, python -m utils.embedding_store quantize 로 미리 변환해 두면 바로 로드
+GALLERY_VECTOR_FORMAT = "float32"
+
+# 근사 최근접 이웃 색인 설정 (models/ann_index.py, 등록 벡터가 많을 때 1:N 식별에 사용)
+## ANN_ENABLED : 색인 사용 여부 (python -m models.ann_index build 로 먼저 생성)
+## ANN_MIN_VECTORS : 색인을 사용하는 최소 등록 벡터 수 (적으면 전체 비교가 더 빠름)
+## ANN_INDEX_DIR : 색인 파일 저장 폴더
+## ANN_NLIST : 묶음(centroid) 수 (None이면 4 * sqrt(벡터 수))
+## ANN_NPROBE : 검색 시 비교하는 묶음 수 (늘리면 정확도 증가, 속도 감소)
+## ANN_TRAIN_ITERATIONS, ANN_TRAIN_SAMPLE : 묶음 학습(k-means) 반복 횟수와 사용 벡터 수
+## ANN_SEARCH_VECTORS : 사용자 후보를 찾기 위해 검색하는 가까운 벡터 수
+ANN_ENABLED = False
+ANN_MIN_VECTORS = 50000
+ANN_INDEX_DIR = os.path.join(VECTOR_DIR, "ann_index")
+ANN_NLIST = None
+ANN_NPROBE = 8
+ANN_TRAIN_ITERATIONS = 10
+ANN_TRAIN_SAMPLE = 65536
+ANN_SEARCH_VECTORS = 32
+
+# 사용자 벡터 압축 설정 (utils/gallery_compaction.py, 거의 같은 벡터가 많이 쌓인 사용자를 대표 벡터로 줄임)
+## COMPACTION_MAX_VECTORS : 사용자당 남기는 최대 대표 벡터 수 (k)
+## COMPACTION_ITERATIONS : k-means 반복 횟수
+COMPACTION_MAX_VECTORS = 16
+COMPACTION_ITERATIONS = 20
+
+# 이전 과제(assignment3.py)의 벡터 저장 폴더
+LEGACY_VECTOR_DIR = "database/"
+
+# 인식 단계 프레임 전처리 설정 (utils/preprocessing_of_captured.py)
+## PREPROCESS_STEPS : 순서대로 적용할 전처리 ("brightness" : 밝기/대비 조정, "equalize" : 흑백 히스토그램 균등화)
+##                    빈 튜플이면 색 순서(BGR -> RGB)만 변환
+## BRIGHTNESS_ALPHA, BRIGHTNESS_BETA : 밝기/대비 조정의 대비 계수와 밝기 추가 값
+PREPROCESS_STEPS = ("equalize", )
+BRIGHTNESS_ALPHA = 1.5
+BRIGHTNESS_BETA = 50
+
+# 얼굴 검출용 이미지 축소 설정
+## DETECTION_SCALE : 축소 비율 (None이면 DETECTION_TARGET_WIDTH 사용)
+## DETECTION_TARGET_WIDTH : 축소 후 이미지 너비 (None이면 원본 해상도에서 검출)
+## 벡터 추출은 항상 원본 해상도에서 수행
+DETECTION_SCALE = None
+DETECTION_TARGET_WIDTH = 640
+
+# 스트리밍 얼굴 추적 설정
+## TRACKING_REDETECT_EVERY : 전체 프레임을 다시 검출하는 프레임 간격 (0이면 ROI에서 얼굴을 놓친 경우에만 전체 검출)
+## TRACKING_MARGIN : 이전 얼굴 사각형 주변 검색 영역 확장 비율
+TRACKING_REDETECT_EVERY = 10
+TRACKING_MARGIN = 0.5
+
+# 얼굴 벡터 캐시 설정 (거의 같은 얼굴 영역이 연속될 때 벡터 추출 생략)
+## ENCODING_CACHE_ENABLED : 캐시 사용 여부 (정확도 검증 시 False)
+## ENCODING_CACHE_SIZE : 보관할 최대 벡터 수
+## ENCODING_CACHE_TTL : 벡터 유효 시간 (초)
+## ENCODING_CACHE_MAX_DISTANCE : 같은 얼굴 영역으로 판단하는 최대 해밍 거리 (64bit 해시 기준)
+## ENCODING_CACHE_MIN_IOU : 같은 얼굴로 판단하는 저장된 얼굴 사각형과의 최소 IoU
+## ENCODING_CACHE_ALIGN_SIZE : 해시 계산 전 눈 위치로 정렬한 얼굴 이미지 크기 (픽셀)
+## ENCODING_CACHE_VOTE_AGE : 캐시 적중 결과를 투표에 포함하는 최대 벡터 나이 (초, 벡터를 추출한 시각 기준)
+##                           실시간 인식 투표 구간(LIVE_VOTE_WINDOW * LIVE_PROCESS_INTERVAL)과 같게 설정
+ENCODING_CACHE_ENABLED = True
+ENCODING_CACHE_SIZE = 32
+ENCODING_CACHE_TTL = 2.0
+ENCODING_CACHE_MAX_DISTANCE = 4
+ENCODING_CACHE_MIN_IOU = 0.5
+ENCODING_CACHE_ALIGN_SIZE = 48
+ENCODING_CACHE_VOTE_AGE = 1.0
+
+# 실시간 인식 모드 설정
+## LIVE_PROCESS_INTERVAL : 인식을 수행하는 최소 간격 (초)
+## LIVE_VOTE_WINDOW : 투표에 사용하는 최근 인식 결과 수
+## LIVE_MIN_VOTES : 같은 사용자로 인식되어야 하는 최소 횟수
+LIVE_PROCESS_INTERVAL = 0.2
+LIVE_VOTE_WINDOW = 5
+LIVE_MIN_VOTES = 3
+
+# asyncio 파이프라인 설정 (utils/async_pipeline.py)
+## PIPELINE_QUEUE_SIZE : 단계 사이 큐의 최대 크기
+## PIPELINE_WORKERS : 검출/벡터 추출/저장에 사용하는 스레드 수
+PIPELINE_QUEUE_SIZE = 4
+PIPELINE_WORKERS = 2
+
+# 단계별 시간 계측 설정 (utils/metrics.py)
+## METRICS_ENABLED : 계측 사용 여부 (False면 계측 코드가 거의 비용 없이 통과)
+## METRICS_PROM_PATH : Prometheus 텍스트 파일 경로 (node exporter textfile collector, None이면 저장 안 함)
+## METRICS_JSONL_PATH : JSON lines 기록 파일 경로 (None이면 저장 안 함)
+METRICS_ENABLED = False
+METRICS_PROM_PATH = "data/metrics/facerec.prom"
+METRICS_JSONL_PATH = "data/metrics/facerec.jsonl"
+
+# 인식 서비스(service/verification_server.py) 설정
+## SERVICE_HOST, SERVICE_PORT : localhost HTTP 주소
+## SERVICE_SOCKET : Unix 도메인 소켓 경로 (지정하면 HTTP 포트 대신 사용)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_SOCKET = None
+
+# 인식 서비스 요청 배치 처리 설정 (동시에 들어온 요청의 벡터 추출과 판별을 한 번에 수행)
+## SERVICE_BATCHING : 배치 처리 사용 여부
+## BATCH_MAX_SIZE : 한 번에 처리할 최대 얼굴 수
+## BATCH_MAX_WAIT_MS : 첫 요청 후 다른 요청을 기다리는 최대 시간 (ms)
+SERVICE_BATCHING = True
+BATCH_MAX_SIZE = 8
+BATCH_MAX_WAIT_MS = 5
+
+# 얼굴 벡터 추출기 버전 (저장소 레코드에 함께 기록)
+ENCODER_VERSION = "dlib-resnet-v1"
+
+# 얼굴 벡터 추출 설정 (바뀌면 등록 매니페스트의 모든 이미지를 다시 추출)
+ENCODER_SETTINGS = {
+    "version": ENCODER_VERSION,
+    "detector": "hog",          # 1차 얼굴 검출 모델
+    "fallback": "cnn",          # 1차 검출 실패 시 사용하는 모델
+    "num_jitters": 1,           # 벡터 추출 시 재샘플링 횟수
+}
+
 
 # 얼굴 벡터 데이터 저장 파일 경로 반환
 def get_vector_data_path(user_name):
@@ -16,4 +181,61 @@ def get_vector_data_path(user_name):
         :param user_name: 사용자 이름
         :return: 얼굴 벡터 데이터 파일 경로 (str)
     """
-    return os.path.join(VECTOR_DIR, f"vector_data_{user_name}.npy")
\ No newline at end of file
+    return os.path.join(VECTOR_DIR, f"vector_data_{user_name}.npy")
+
+
+# 학습된 사용자 모델 파일 경로 반환
+def get_model_path(user_name, digest):
+    """
+        :param user_name: 사용자 이름
+        :param digest: 학습에 사용한 사용자 벡터의 내용 해시 (str)
+        :return: 모델 파일 경로 (str)
+    """
+    return os.path.join(MODEL_DIR, f"model_{user_name}_{digest}.keras")
+
+
+# NumPy 추론용 모델 가중치 파일 경로 반환
+def get_weights_path(user_name, digest):
+    """
+        :param user_name: 사용자 이름
+        :param digest: 학습에 사용한 사용자 벡터의 내용 해시 (str)
+        :return: 가중치 파일 경로 (str)
+    """
+    return os.path.join(MODEL_DIR, f"weights_{user_name}_{digest}.npz")
+
+
+# 학습 없는 판별 통계(중심, 반경 등) 파일 경로 반환
+def get_prototype_path(user_name, digest):
+    """
+        :param user_name: 사용자 이름
+        :param digest: 통계 계산에 사용한 사용자 벡터의 내용 해시 (str)
+        :return: 판별 통계 파일 경로 (str)
+    """
+    return os.path.join(MODEL_DIR, f"prototype_{user_name}_{digest}.npz")
+
+
+# 사용자 이미지 별 벡터 추출 기록(매니페스트) 파일 경로 반환
+def get_manifest_path(user_name):
+    """
+        :param user_name: 사용자 이름
+        :return: 매니페스트 파일 경로 (str)
+    """
+    return os.path.join(VECTOR_DIR, f"manifest_{user_name}.json")
+
+
+# 사용자 벡터 압축 기록(대표 벡터 별 통계, 합쳐진 원본 이미지) 파일 경로 반환
+def get_compaction_path(user_name):
+    """
+        :param user_name: 사용자 이름
+        :return: 압축 기록 파일 경로 (str)
+    """
+    return os.path.join(VECTOR_DIR, f"compaction_{user_name}.json")
+
+
+# 저장 형식으로 변환한 Gallery 벡터 폴더 경로 반환
+def get_quantized_dir(vector_format):
+    """
+        :param vector_format: 벡터 저장 형식 ("float16", "int8" 등)
+        :return: 변환된 벡터 파일 폴더 경로 (str)
+    """
+    return os.path.join(VECTOR_DIR, f"quantized_{vector_format}")
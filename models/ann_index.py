@@ -0,0 +1,424 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+from config import (ANN_INDEX_DIR, ANN_NLIST, ANN_NPROBE, ANN_TRAIN_ITERATIONS, ANN_TRAIN_SAMPLE,
+                    ANN_SEARCH_VECTORS)
+
+"""
+    : 등록 벡터가 수십만 개 이상일 때 전체 벡터와 비교하지 않고 가까운 후보만 비교하는 근사 최근접 이웃 색인 (IVF)
+        - 학습 : 등록 벡터를 k-means로 nlist개의 묶음으로 나누고 묶음 중심(centroid)을 저장
+        - 추가 : 벡터를 가장 가까운 중심의 목록(inverted list)에 덧붙임 (다시 학습하지 않고 계속 추가 가능)
+        - 검색 : 입력 벡터와 가까운 nprobe개 중심의 목록만 비교
+                 nprobe를 늘리면 정확도(recall)가 오르고 속도가 내려감
+    : 색인의 id는 얼굴 벡터 저장소의 레코드 위치이며, 저장소에 새로 추가된 레코드만 이어서 추가 (update_from_store)
+
+    실행 방법 (프로젝트 루트에서)
+        python -m models.ann_index build     # 저장소 전체로 색인 생성
+        python -m models.ann_index update    # 새로 추가/삭제된 레코드만 반영
+        python -m models.ann_index info
+"""
+
+
+def squared_distances(queries, vectors, vector_norms=None):
+    """
+    두 벡터 집합 간 제곱 유클리드 거리
+
+    :param queries: (Q, D) float32 배열
+    :param vectors: (N, D) float32 배열
+    :param vector_norms: vectors의 제곱 노름 (None이면 계산)
+    :return: (Q, N) float32 배열
+    """
+    if vector_norms is None:
+        vector_norms = np.einsum('ij,ij->i', vectors, vectors)
+    squared = queries @ vectors.T
+    squared *= -2
+    squared += vector_norms
+    squared += np.einsum('ij,ij->i', queries, queries)[:, None]
+    return np.maximum(squared, 0, out=squared)
+
+
+def kmeans(vectors, k, iterations=ANN_TRAIN_ITERATIONS, seed=0, block=65536, weights=None):
+    """
+    NumPy k-means (Lloyd 반복)
+
+    :param vectors: (N, D) 형태의 벡터
+    :param k: 묶음 수 (int)
+    :param iterations: 반복 횟수 (int)
+    :param seed: 초기 중심 선택 시드
+    :param block: 한 번에 거리를 계산할 벡터 수 (메모리 사용량 제한)
+    :param weights: (N, ) 벡터 별 가중치 (None이면 모두 1, 이미 여러 벡터를 대표하는 벡터에 사용)
+    :return: ((k, D) float32 중심, (N, ) 묶음 번호) 튜플
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    weights = np.ones(len(vectors), dtype=np.float32) if weights is None else np.asarray(weights, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    k = min(k, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), k, replace=False, p=weights / weights.sum())].copy()
+    weighted = vectors * weights[:, None]
+
+    assign = np.zeros(len(vectors), dtype=np.intp)
+    for _ in range(max(iterations, 1)):
+        for start in range(0, len(vectors), block):
+            assign[start:start + block] = squared_distances(
+                vectors[start:start + block], centroids).argmin(axis=1)
+
+        # 묶음 별 가중 평균 (정렬 후 구간 합)
+        order = np.argsort(assign, kind='stable')
+        sorted_assign = assign[order]
+        starts = np.flatnonzero(np.r_[True, sorted_assign[1:] != sorted_assign[:-1]])
+        filled = sorted_assign[starts]
+        totals = np.add.reduceat(weights[order], starts)
+        centroids[filled] = np.add.reduceat(weighted[order], starts, axis=0) / totals[:, None]
+
+        # 빈 묶음은 자기 중심에서 가장 먼 벡터들로 다시 시작
+        empty = np.setdiff1d(np.arange(k), filled)
+        if len(empty):
+            residual = vectors - centroids[assign]
+            farthest = np.argsort(np.einsum('ij,ij->i', residual, residual))[-len(empty):]
+            centroids[empty] = vectors[farthest]
+            assign[farthest] = empty
+
+    return centroids, assign
+
+
+class IVFIndex:
+    def __init__(self, centroids, nprobe=ANN_NPROBE):
+        """
+        IVFIndex 클래스 생성자 (보통 train() 또는 load()로 생성)
+
+        :param centroids: (nlist, 128) 형태의 묶음 중심
+        :param nprobe: 검색 시 비교하는 묶음 수 (int)
+        """
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.centroid_norms = np.einsum('ij,ij->i', self.centroids, self.centroids)
+        self.nprobe = nprobe
+        self.dim = self.centroids.shape[1]
+
+        # 묶음 별 목록 (용량을 두 배씩 늘려가며 추가)
+        nlist = len(self.centroids)
+        self.list_vectors = [np.zeros((0, self.dim), dtype=np.float32) for _ in range(nlist)]
+        self.list_norms = [np.zeros(0, dtype=np.float32) for _ in range(nlist)]
+        self.list_ids = [np.zeros(0, dtype=np.int64) for _ in range(nlist)]
+        self.list_sizes = np.zeros(nlist, dtype=np.intp)
+
+        # id 별 사용자 이름 (id는 저장소 레코드 위치, 삭제된 id는 빈 값)
+        self.id_labels = np.zeros(0, dtype='S32')
+
+        # 색인에 반영한 저장소 버전 [세대, 레코드 수, 삭제 표시 누적 수] (EmbeddingStore.version())
+        self.source_version = None
+
+    @classmethod
+    def train(cls, vectors, nlist=ANN_NLIST, nprobe=ANN_NPROBE, iterations=ANN_TRAIN_ITERATIONS,
+              sample=ANN_TRAIN_SAMPLE, seed=0):
+        """
+        벡터 일부로 묶음 중심을 학습해 빈 색인 생성
+
+        :param vectors: (N, 128) 형태의 학습용 벡터
+        :param nlist: 묶음 수 (None이면 4 * sqrt(N))
+        :param nprobe: 검색 시 비교하는 묶음 수
+        :param iterations: k-means 반복 횟수
+        :param sample: 학습에 사용하는 최대 벡터 수 (None이면 전체)
+        :param seed: 시드
+        :return: IVFIndex 객체 (벡터는 add()로 추가)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) == 0:
+            raise ValueError('색인을 학습할 벡터가 없습니다.')
+        if nlist is None:
+            nlist = max(int(4 * np.sqrt(len(vectors))), 1)
+        if sample is not None and len(vectors) > sample:
+            vectors = vectors[np.random.default_rng(seed).choice(len(vectors), sample, replace=False)]
+
+        centroids, _ = kmeans(vectors, nlist, iterations, seed)
+        return cls(centroids, nprobe)
+
+    def __len__(self):
+        return int(self.list_sizes.sum())
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    @property
+    def generation(self):
+        """
+        색인한 저장소의 세대 (저장소를 다시 쓰면 레코드 위치가 바뀌어 색인을 다시 생성해야 함)
+        """
+        return self.source_version[0] if self.source_version else None
+
+    @property
+    def source_count(self):
+        """
+        색인에 반영한 저장소 레코드 수
+        """
+        return self.source_version[1] if self.source_version else 0
+
+    def assign(self, vectors):
+        """
+        벡터 별로 가장 가까운 묶음 번호
+
+        :return: (N, ) 묶음 번호 배열
+        """
+        return squared_distances(vectors, self.centroids, self.centroid_norms).argmin(axis=1)
+
+    def add(self, vectors, ids, labels=None):
+        """
+        벡터를 가장 가까운 묶음의 목록에 추가 (묶음 중심은 다시 학습하지 않음)
+
+        :param vectors: (N, 128) 형태의 벡터
+        :param ids: (N, ) 0 이상의 정수 id (저장소 레코드 위치)
+        :param labels: (N, ) 사용자 이름 배열 (None이면 이름 없이 추가)
+        :return: 추가한 벡터 수 (int)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(vectors) == 0:
+            return 0
+
+        if labels is not None:
+            if ids.max() >= len(self.id_labels):
+                grown = np.zeros(max(int(ids.max()) + 1, 2 * len(self.id_labels)), dtype='S32')
+                grown[:len(self.id_labels)] = self.id_labels
+                self.id_labels = grown
+            self.id_labels[ids] = np.char.encode(np.asarray(labels, dtype=str), 'utf-8')
+
+        norms = np.einsum('ij,ij->i', vectors, vectors)
+        assign = self.assign(vectors)
+        order = np.argsort(assign, kind='stable')
+        sorted_assign = assign[order]
+        starts = np.flatnonzero(np.r_[True, sorted_assign[1:] != sorted_assign[:-1]])
+        for start, end in zip(starts, np.r_[starts[1:], len(order)]):
+            number = sorted_assign[start]
+            rows = order[start:end]
+            self._append(number, vectors[rows], norms[rows], ids[rows])
+
+        return len(vectors)
+
+    def _append(self, number, vectors, norms, ids):
+        """
+        한 묶음의 목록 끝에 추가 (용량이 부족하면 두 배로 늘림)
+        """
+        size = self.list_sizes[number]
+        needed = size + len(vectors)
+        if needed > len(self.list_vectors[number]):
+            capacity = max(needed, 2 * len(self.list_vectors[number]), 16)
+            for lists in (self.list_vectors, self.list_norms, self.list_ids):
+                grown = np.zeros((capacity, ) + lists[number].shape[1:], dtype=lists[number].dtype)
+                grown[:size] = lists[number][:size]
+                lists[number] = grown
+
+        self.list_vectors[number][size:needed] = vectors
+        self.list_norms[number][size:needed] = norms
+        self.list_ids[number][size:needed] = ids
+        self.list_sizes[number] = needed
+
+    def remove(self, ids):
+        """
+        id에 해당하는 벡터를 목록에서 제거 (삭제 표시된 저장소 레코드 반영)
+
+        :param ids: 제거할 id 배열
+        :return: 제거한 벡터 수 (int)
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        removed = 0
+        for number in range(self.nlist):
+            size = self.list_sizes[number]
+            keep = ~np.isin(self.list_ids[number][:size], ids)
+            if keep.all():
+                continue
+            kept = int(keep.sum())
+            for lists in (self.list_vectors, self.list_norms, self.list_ids):
+                lists[number][:kept] = lists[number][:size][keep]
+            self.list_sizes[number] = kept
+            removed += size - kept
+
+        known = ids[ids < len(self.id_labels)]
+        self.id_labels[known] = b''
+        return removed
+
+    def search(self, queries, k=10, nprobe=None):
+        """
+        입력 벡터 별로 가까운 nprobe개 묶음 안에서 가장 가까운 k개 벡터 검색
+
+        :param queries: (Q, 128) 또는 (128, ) 형태의 입력 벡터
+        :param k: 반환할 벡터 수 (int)
+        :param nprobe: 비교할 묶음 수 (None이면 생성 시 값)
+        :return: ((Q, k) 거리, (Q, k) id) 튜플 (후보가 k개보다 적으면 거리 inf, id -1)
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        best_distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        best_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        if len(queries) == 0 or len(self) == 0:
+            return best_distances, best_ids
+
+        centroid_distances = squared_distances(queries, self.centroids, self.centroid_norms)
+        if nprobe < self.nlist:
+            probes = np.argpartition(centroid_distances, nprobe - 1, axis=1)[:, :nprobe]
+        else:
+            probes = np.broadcast_to(np.arange(self.nlist), (len(queries), self.nlist))
+
+        # 묶음 별로 그 묶음을 검색하는 입력 벡터들을 모아 한 번의 행렬 곱으로 계산
+        flat = probes.ravel()
+        order = np.argsort(flat, kind='stable')
+        sorted_lists = flat[order]
+        starts = np.flatnonzero(np.r_[True, sorted_lists[1:] != sorted_lists[:-1]])
+        for start, end in zip(starts, np.r_[starts[1:], len(order)]):
+            number = sorted_lists[start]
+            size = self.list_sizes[number]
+            if size == 0:
+                continue
+            rows = order[start:end] // nprobe
+            distances = squared_distances(queries[rows], self.list_vectors[number][:size],
+                                          self.list_norms[number][:size])
+
+            candidates = np.concatenate([best_distances[rows], distances], axis=1)
+            candidate_ids = np.concatenate(
+                [best_ids[rows], np.broadcast_to(self.list_ids[number][:size], distances.shape)], axis=1)
+            top = np.argpartition(candidates, k - 1, axis=1)[:, :k]
+            best_distances[rows] = np.take_along_axis(candidates, top, axis=1)
+            best_ids[rows] = np.take_along_axis(candidate_ids, top, axis=1)
+
+        order = np.argsort(best_distances, axis=1)
+        best_distances = np.sqrt(np.take_along_axis(best_distances, order, axis=1))
+        return best_distances, np.take_along_axis(best_ids, order, axis=1)
+
+    def identify_batch(self, face_vectors, k=1, search_vectors=ANN_SEARCH_VECTORS):
+        """
+        가까운 벡터 후보에서 사용자 별 최소 거리 기준 상위 k명을 반환 (Gallery.identify_batch와 같은 형식)
+
+        :param face_vectors: (Q, 128) 형태의 입력 벡터
+        :param k: 반환할 후보 수 (int)
+        :param search_vectors: 사용자 후보를 찾기 위해 검색하는 벡터 수 (int)
+        :return: 입력 벡터 별 [(사용자 이름, 거리), ...] 리스트
+        """
+        distances, ids = self.search(face_vectors, max(search_vectors, k))
+        results = []
+        for row_distances, row_ids in zip(distances, ids):
+            users = {}
+            for distance, label in zip(row_distances, self.id_labels[row_ids[row_ids >= 0]]):
+                if label and label not in users:
+                    users[label] = float(distance)
+            results.append([(label.decode('utf-8'), distance) for label, distance in list(users.items())[:k]])
+        return results
+
+    def update_from_store(self, store):
+        """
+        저장소에서 색인 이후 추가된 레코드를 추가하고 삭제 표시된 레코드를 제거
+
+        :param store: EmbeddingStore 객체
+        :return: (추가한 수, 제거한 수) 튜플
+        """
+        version = store.version()
+        if self.source_version is not None and version[0] != self.generation:
+            raise ValueError('저장소가 다시 쓰여 레코드 위치가 바뀌었습니다. 색인을 다시 생성하세요.')
+        records = store.records()
+        live = store.live_mask(records)
+
+        # 이미 색인한 레코드 중 삭제 표시된 것
+        indexed = np.flatnonzero(~live[:self.source_count])
+        indexed = indexed[indexed < len(self.id_labels)]
+        removed = self.remove(indexed[self.id_labels[indexed] != b'']) if len(indexed) else 0
+
+        new_rows = self.source_count + np.flatnonzero(live[self.source_count:])
+        added = self.add(records['vector'][new_rows], new_rows, np.char.decode(records['user'][new_rows], 'utf-8'))
+        self.source_version = [version[0], len(records), version[2]]
+        return added, removed
+
+    def save(self, folder=ANN_INDEX_DIR):
+        """
+        묶음 순서로 이어 붙인 배열로 저장
+
+        :param folder: 저장 폴더
+        """
+        os.makedirs(folder, exist_ok=True)
+        sizes = self.list_sizes
+        np.save(os.path.join(folder, 'centroids.npy'), self.centroids)
+        np.save(os.path.join(folder, 'vectors.npy'), np.concatenate(
+            [vectors[:size] for vectors, size in zip(self.list_vectors, sizes)]))
+        np.save(os.path.join(folder, 'ids.npy'), np.concatenate(
+            [ids[:size] for ids, size in zip(self.list_ids, sizes)]))
+        np.save(os.path.join(folder, 'offsets.npy'), np.r_[0, np.cumsum(sizes)])
+        np.save(os.path.join(folder, 'id_labels.npy'), self.id_labels)
+        with open(os.path.join(folder, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'nlist': self.nlist, 'nprobe': self.nprobe, 'count': len(self),
+                       'source_version': self.source_version}, f)
+
+    @classmethod
+    def load(cls, folder=ANN_INDEX_DIR):
+        """
+        save()로 저장한 색인 로드
+
+        :param folder: 저장 폴더
+        :return: IVFIndex 객체 (파일이 없으면 None)
+        """
+        if not os.path.exists(os.path.join(folder, 'meta.json')):
+            return None
+        with open(os.path.join(folder, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        index = cls(np.load(os.path.join(folder, 'centroids.npy')), meta['nprobe'])
+        vectors = np.load(os.path.join(folder, 'vectors.npy'))
+        ids = np.load(os.path.join(folder, 'ids.npy'))
+        offsets = np.load(os.path.join(folder, 'offsets.npy'))
+        norms = np.einsum('ij,ij->i', vectors, vectors)
+        for number in range(index.nlist):
+            rows = slice(offsets[number], offsets[number + 1])
+            # 로드한 배열의 구간을 그대로 사용 (추가 시 용량이 부족하면 새 배열로 복사)
+            index.list_vectors[number] = vectors[rows]
+            index.list_norms[number] = norms[rows]
+            index.list_ids[number] = ids[rows]
+        index.list_sizes = np.diff(offsets).astype(np.intp)
+        index.id_labels = np.load(os.path.join(folder, 'id_labels.npy'))
+        index.source_version = meta['source_version']
+        return index
+
+
+def build_from_store(store=None, nlist=ANN_NLIST, nprobe=ANN_NPROBE):
+    """
+    저장소의 삭제되지 않은 모든 레코드로 색인 생성
+
+    :param store: EmbeddingStore 객체 (None이면 기본 저장소)
+    :param nlist: 묶음 수 (None이면 4 * sqrt(N))
+    :param nprobe: 검색 시 비교하는 묶음 수
+    :return: IVFIndex 객체
+    """
+    from utils.embedding_store import EmbeddingStore
+
+    store = store or EmbeddingStore()
+    records = store.records()
+    rows = np.flatnonzero(store.live_mask(records))
+    index = IVFIndex.train(records['vector'][rows], nlist, nprobe)
+    index.update_from_store(store)
+    return index
+
+
+if __name__ == "__main__":
+    from utils.embedding_store import EmbeddingStore
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "info"
+    store = EmbeddingStore()
+
+    if command == "build":
+        start = time.perf_counter()
+        index = build_from_store(store)
+        index.save()
+        print(f'색인 생성 완료: 벡터 {len(index)}개, 묶음 {index.nlist}개 ({time.perf_counter() - start:.2f}초)')
+    elif command == "update":
+        index = IVFIndex.load()
+        if index is None or index.generation != store.generation():
+            print(f'색인이 없거나 저장소가 다시 쓰였습니다. 먼저 build를 실행하세요: {ANN_INDEX_DIR}')
+            sys.exit(1)
+        added, removed = index.update_from_store(store)
+        index.save()
+        print(f'색인 갱신 완료: {added}개 추가, {removed}개 제거 (전체 {len(index)}개)')
+    else:
+        index = IVFIndex.load()
+        if index is None:
+            print(f'색인이 없습니다: {ANN_INDEX_DIR}')
+        else:
+            sizes = index.list_sizes
+            print(f'벡터 {len(index)}개, 묶음 {index.nlist}개 (nprobe {index.nprobe}), '
+                  f'묶음 크기 평균 {sizes.mean():.1f} / 최대 {sizes.max()}, 저장소 레코드 {index.source_count}/{store.count()}')
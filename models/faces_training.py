@@ -1,31 +1,39 @@
 import os
+import glob
 import numpy as np
-import matplotlib.pyplot as plt
-import tensorflow as tf
-from tensorflow.keras.layers import Input, Dense, Lambda
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.models import Model
-from sklearn.model_selection import train_test_split
+from config import MODEL_DIR, get_model_path, get_weights_path
+from utils.embedding_store import load_user_vectors
+from utils.vector_checking import get_vector_digest
+from models.numpy_inference import THRESHOLD, export_weights, load_weights, compare_with_keras
+
+# TensorFlow, matplotlib, sklearn은 로드 시간이 길어 실제로 학습/로드할 때만 import
+
+# 프로세스 내에서 로드한 모델 캐시 {user_name: (digest, model)}
+_model_cache = {}
+
 
 """
-    1. 추출한 벡터 간 유사도 측정
+    1. 사용자 얼굴 벡터 학습 (등록 단계)
 """
-def measure_similarity(user_name, face_vectors):
+def train_model(user_name, show_plot=False):
     """
-    사용자 이름과(user_name) 캡처한 얼굴 벡터 데이터를(face_vectors) 로드해 학습
+    {user_name} 사용자의 저장된 얼굴 벡터로 모델을 학습하고 파일로 저장
+    모델 파일 이름에는 사용자 벡터의 내용 해시가 포함되어, 벡터가 바뀌면 새로 학습됨
 
     데이터 분할 비율:
-        데이터가 적으므로(20장) 학습/검증/테스트 비율을 다음과 같이 설정
+        데이터가 적으므로(20장) 학습/검증 비율을 다음과 같이 설정
         학습 데이터: 16개 (80%)
         검증 데이터: 4개 (20%)
-        테스트 데이터: 1개 (입력된 사용자 얼굴)
 
     :param user_name: 사용자 이름
-    :param face_vectors: 캡처된 이미지에서 추출한 벡터
-    :return: 도어락 열림(1) 또는 닫힘(0) 값 출력
+    :param show_plot: 학습 손실 그래프 표시 여부 (bool)
+    :return: 학습된 모델
     """
-    # 학습 데이터: 16개(80%), 검증 데이터: 4개(20%), 테스트 데이터: 1개(입력된 사용자 얼굴)로 분할
-    X_train, X_val, X_test = prepare_data(user_name, face_vectors)
+    from tensorflow.keras.layers import Input, Dense
+    from tensorflow.keras.models import Sequential
+
+    # 학습 데이터: 16개(80%), 검증 데이터: 4개(20%)로 분할
+    X_train, X_val = prepare_data(user_name)
 
     # 모델 설계
     model = Sequential([
@@ -59,32 +67,116 @@ def measure_similarity(user_name, face_vectors):
     ## batch_size=4 : 학습 데이터를 4개씩 나누어서 한 번에 처리
     history = model.fit(X_train, y_train, validation_data=(X_val, y_val), epochs=50, batch_size=4)
 
-    # 학습 결과 출력 : dict_keys(['loss', 'accuracy', 'val_loss', 'val_accuracy'])
-    print(history.history.keys())
-
     # 학습 손실 값 및 정확도 출력
     print(f"최종 학습 손실: {history.history['loss'][-1]:.4f}")
     print(f"최종 검증 손실: {history.history['val_loss'][-1]:.4f}")
     print(f"최종 학습 정확도: {history.history['accuracy'][-1]:.4f}")
     print(f"최종 검증 정확도: {history.history['val_accuracy'][-1]:.4f}")
 
-    # 손실 값 그래프
-    plt.plot(history.history['loss'], label='Training Loss')
-    plt.plot(history.history['val_loss'], label='Validation Loss')
-    plt.xlabel('Epochs')
-    plt.ylabel('Loss')
-    plt.legend()
-    plt.show()
+    # 손실 값 그래프 (등록 단계에서 요청한 경우에만 표시)
+    if show_plot:
+        import matplotlib.pyplot as plt
+        plt.plot(history.history['loss'], label='Training Loss')
+        plt.plot(history.history['val_loss'], label='Validation Loss')
+        plt.xlabel('Epochs')
+        plt.ylabel('Loss')
+        plt.legend()
+        plt.show()
+
+    # 벡터 해시로 버전이 붙은 모델 파일 저장
+    digest = get_vector_digest(user_name)
+    save_model(user_name, digest, model)
+
+    # 저장된 NumPy 가중치가 Keras 예측과 같은 결과를 내는지 확인
+    max_error, _ = compare_with_keras(model, load_weights(get_weights_path(user_name, digest)),
+                                      np.concatenate([X_train, X_val]))
+    print(f'NumPy 추론 최대 오차: {max_error:.6f}')
+
+    return model
+
+
+def save_model(user_name, digest, model):
+    """
+    학습된 모델(.keras)과 NumPy 추론용 가중치(.npz)를 저장하고, 이전 버전의 모델 파일은 삭제
+
+    :param user_name: 사용자 이름
+    :param digest: 사용자 벡터 내용 해시 (str)
+    :param model: 학습된 모델
+    :return: 저장된 모델 파일 경로 (str)
+    """
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    model_path = get_model_path(user_name, digest)
+
+    weights_path = get_weights_path(user_name, digest)
+
+    # 이전 벡터 데이터로 학습된 모델 파일 정리
+    for old_path in glob.glob(get_model_path(user_name, '*')) + glob.glob(get_weights_path(user_name, '*')):
+        if old_path not in (model_path, weights_path):
+            os.remove(old_path)
+
+    model.save(model_path)
+
+    # 인식 단계에서 TensorFlow 없이 사용할 가중치 파일(.npz) 저장
+    export_weights(model, weights_path)
+    _model_cache[user_name] = (digest, model)
+    print(f'{user_name}님의 모델이 저장되었습니다: {model_path}')
+
+    return model_path
+
+
+def load_model(user_name):
+    """
+    {user_name} 사용자의 학습된 모델을 로드
+    벡터가 바뀌어 해당 버전의 모델이 없으면 다시 학습
+
+    :param user_name: 사용자 이름
+    :return: 학습된 모델
+    """
+    digest = get_vector_digest(user_name)
+
+    # 같은 프로세스에서 이미 로드한 모델이 최신이면 그대로 사용
+    cached = _model_cache.get(user_name)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+
+    model_path = get_model_path(user_name, digest)
+    if os.path.exists(model_path):
+        import tensorflow as tf
+        model = tf.keras.models.load_model(model_path)
+        _model_cache[user_name] = (digest, model)
+        return model
+
+    # 벡터 데이터가 변경되었거나 모델이 없으면 재학습
+    print(f'{user_name}님의 학습된 모델이 없어 새로 학습합니다.')
+    return train_model(user_name)
+
+
+"""
+    2. 추출한 벡터 간 유사도 측정 (인식 단계)
+"""
+def measure_similarity(user_name, face_vectors):
+    """
+    저장된 {user_name} 사용자 모델로 캡처한 얼굴 벡터(face_vectors)를 판별
+    모델은 등록 단계에서 한 번 학습되어 저장되며, 벡터가 바뀐 경우에만 재학습
+
+    :param user_name: 사용자 이름
+    :param face_vectors: 캡처된 이미지에서 추출한 벡터
+    :return: 도어락 열림(1) 또는 닫힘(0) 값 출력
+    """
+    model = load_model(user_name)
+
+    # 입력 벡터를 (1, 128)로 변환
+    X_test = np.asarray(face_vectors, dtype=np.float32).reshape(1, -1)
 
     # 테스트 데이터 예측
-    test_prediction = model.predict(X_test)  # 입력된 얼굴 벡터 예측
+    ## 단일 입력이므로 model.predict() 대신 직접 호출해 오버헤드를 줄임
+    test_prediction = model(X_test, training=False).numpy()
 
     # 예측 확률 값 출력
     print(f"테스트 데이터 예측값: {test_prediction[0][0]:.4f}")
 
     # 사용자 확인
-    threshold = 0.9  # 임계값 설정
-    if test_prediction[0][0] > threshold:
+    if test_prediction[0][0] > THRESHOLD:
         print(f"{user_name} 사용자 인식")
         return 1
     else:
@@ -94,23 +186,17 @@ def measure_similarity(user_name, face_vectors):
 
 
 
-def prepare_data(user_name, face_vectors, path="data/vector_data/"):
+def prepare_data(user_name):
     """
-    학습을 위한 {user_name} 사용자 얼굴 벡터 파일 로드 및 캡처한 얼굴 벡터 저장
+    학습을 위한 {user_name} 사용자 얼굴 벡터 로드 및 분할
 
     :param user_name: 사용자 이름
-    :param face_vectors: 캡처된 사용자 얼굴 벡터
-    :param path: 저장된 벡터 파일 경로
-    :return: 학습 데이터, 검증 데이터, 테스트 데이터
+    :return: 학습 데이터, 검증 데이터
     """
-    # .npy 파일 경로 설정
-    # 학습을 위한 {user_name} 사용자 얼굴 벡터 파일 로드 및 촬영한 얼굴 벡터 저장
-    file_path = os.path.join(path, f'vector_data_{user_name}.npy')
+    from sklearn.model_selection import train_test_split
 
-    # 저장된 사용자 벡터 로드 (20, 128)
-    user_vectors = np.load(file_path)
-    # 입력 벡터를 (1, 128)로 변환
-    input_vectors = face_vectors.reshape(1, -1)  # (1, 128)
+    # 저장소(없으면 기존 .npy 파일)에서 사용자 벡터 로드 (20, 128)
+    user_vectors = load_user_vectors(user_name)
 
     # 학습 데이터와 검증 데이터 분할
     X_train, X_val = train_test_split(user_vectors, test_size=0.2, random_state=42)
@@ -118,6 +204,5 @@ def prepare_data(user_name, face_vectors, path="data/vector_data/"):
     # 데이터 확인용 메세지
     print(f'학습 데이터 크기: {X_train.shape}')            # (16, 128)
     print(f'검증 데이터 크기: {X_val.shape}')              # (4, 128)
-    print(f'테스트 데이터 크기: {input_vectors.shape}')     # (1, 128)
 
-    return X_train, X_val, input_vectors
\ No newline at end of file
+    return X_train, X_val
@@ -0,0 +1,255 @@
+import os
+import glob
+import numpy as np
+from config import (VECTOR_DIR, STORE_PATH, GALLERY_VECTOR_FORMAT, ANN_ENABLED, ANN_MIN_VECTORS, ANN_INDEX_DIR,
+                    get_quantized_dir)
+from utils.embedding_store import EmbeddingStore
+from utils.quantization import QuantizedMatrix
+
+"""
+    등록된 모든 사용자의 얼굴 벡터를 하나의 행렬로 모아 1:N 식별을 수행
+
+    - 얼굴 벡터 저장소(없으면 VECTOR_DIR 하위의 모든 vector_data_*.npy 파일)를 (N, 128) float32 행렬과 레이블 배열로 로드
+    - 입력 벡터와 모든 등록 벡터 간 거리를 한 번의 행렬 연산으로 계산
+    - 사용자 별 최소 거리로 상위 k명의 후보를 반환
+    - 등록 벡터는 float32 / float16 / int8 형식으로 보관하고, 저장된 형식 그대로 거리 계산 (utils/quantization.py)
+    - 등록 벡터가 많으면 근사 최근접 이웃 색인(models/ann_index.py)으로 가까운 후보만 비교 (config.ANN_ENABLED)
+"""
+
+# 같은 사람으로 판단하는 최대 거리 (face_recognition.compare_faces 기본값)
+TOLERANCE = 0.6
+
+
+def load_vector_files(path=VECTOR_DIR, exclude=()):
+    """
+    폴더 내의 vector_data_{user_name}.npy 파일 로드 (사용자 이름 순)
+
+    :param path: 벡터 파일 폴더
+    :param exclude: 제외할 사용자 이름 목록 (저장소에 벡터가 있는 사용자)
+    :return: (사용자 별 (N, 128) float32 배열 리스트, 사용자 별 레이블 배열 리스트) 튜플
+    """
+    exclude = set(exclude)
+    vectors = []
+    labels = []
+    for file_path in sorted(glob.glob(os.path.join(path, 'vector_data_*.npy'))):
+        user_name = os.path.basename(file_path)[len('vector_data_'):-len('.npy')]
+        if user_name in exclude:
+            continue
+        user_vectors = np.load(file_path).reshape(-1, 128)
+        if len(user_vectors) == 0:
+            continue
+        vectors.append(user_vectors.astype(np.float32))
+        labels.append(np.full(len(user_vectors), user_name))
+
+    return vectors, labels
+
+
+class Gallery:
+    def __init__(self, vectors, labels, vector_format=GALLERY_VECTOR_FORMAT):
+        """
+        Gallery 클래스 생성자
+
+        :param vectors: (N, 128) 형태의 등록 벡터 (또는 이미 변환된 QuantizedMatrix 객체)
+        :param labels: (N, ) 형태의 사용자 이름 배열 (같은 사용자끼리 연속으로 저장)
+        :param vector_format: 등록 벡터 보관 형식 ("float32", "float16", "int8")
+        """
+        if isinstance(vectors, QuantizedMatrix):
+            self.matrix = vectors
+        else:
+            # 거리 계산에 반복 사용하는 등록 벡터의 제곱 노름도 함께 계산
+            self.matrix = QuantizedMatrix.from_float(np.asarray(vectors, dtype=np.float32).reshape(-1, 128),
+                                                     vector_format)
+        self.labels = np.asarray(labels)
+
+        # 사용자 별 구간 시작 위치 (np.minimum.reduceat에 사용)
+        if len(self.labels):
+            starts = np.flatnonzero(np.r_[True, self.labels[1:] != self.labels[:-1]])
+        else:
+            starts = np.zeros(0, dtype=np.intp)
+        self.starts = starts
+        self.users = self.labels[starts]
+        self.user_slices = {str(user): slice(start, end) for user, start, end
+                            in zip(self.users, starts, np.r_[starts[1:], len(self.labels)])}
+
+        # 1:N 식별에 사용하는 근사 최근접 이웃 색인 (None이면 전체 비교)
+        self.index = None
+
+    @property
+    def vectors(self):
+        """
+        float32로 복원한 등록 벡터 (float32 형식이면 복사 없음)
+        """
+        return self.matrix.to_float()
+
+    @property
+    def squared_norms(self):
+        return self.matrix.squared_norms
+
+    @classmethod
+    def from_store(cls, store=None, vector_format=GALLERY_VECTOR_FORMAT):
+        """
+        얼굴 벡터 저장소의 삭제되지 않은 레코드로 Gallery 생성
+
+        :param store: EmbeddingStore 객체 (None이면 기본 저장소)
+        :param vector_format: 등록 벡터 보관 형식
+        :return: Gallery 객체
+        """
+        store = store or EmbeddingStore()
+        records = store.records()
+        rows = np.flatnonzero(store.live_mask(records))
+
+        # 사용자 별 구간이 연속되도록 사용자 이름 순으로 정렬 (같은 사용자 내에서는 저장 순서 유지)
+        rows = rows[np.argsort(records['user'][rows], kind='stable')]
+        labels = np.char.decode(records['user'][rows], 'utf-8')
+
+        return cls(records['vector'][rows], labels, vector_format)
+
+    @classmethod
+    def from_quantized(cls, folder):
+        """
+        save_quantized()로 저장한 변환된 벡터를 메모리 매핑으로 열어 Gallery 생성
+
+        :param folder: 저장 폴더
+        :return: (Gallery 객체, 메타 정보 dict) 튜플
+        """
+        matrix, labels, meta = QuantizedMatrix.load(folder)
+        return cls(matrix, labels), meta
+
+    def save_quantized(self, folder, source_version=None):
+        """
+        변환된 벡터를 저장 (다음 실행부터 변환 없이 로드)
+
+        :param folder: 저장 폴더
+        :param source_version: 변환에 사용한 저장소 버전 (EmbeddingStore.version())
+        """
+        self.matrix.save(folder, self.labels, source_version)
+
+    @classmethod
+    def load(cls, path=VECTOR_DIR, vector_format=GALLERY_VECTOR_FORMAT):
+        """
+        얼굴 벡터 저장소가 있으면 저장소에서, 없으면 폴더 내의 모든 vector_data_{user_name}.npy 파일을 로드해 Gallery 생성
+        float32 외의 형식은 저장소와 같은 버전에서 변환해 둔 파일이 있으면 그 파일을 사용
+        저장소에 없는 사용자의 .npy 파일은 함께 로드 (1:1 판별의 load_user_vectors와 같은 사용자 목록)
+
+        :param path: 벡터 파일 폴더
+        :param vector_format: 등록 벡터 보관 형식
+        :return: Gallery 객체
+        """
+        store = EmbeddingStore(os.path.join(path, os.path.basename(STORE_PATH)))
+        if store.count() > 0:
+            legacy_vectors, legacy_labels = load_vector_files(path, exclude=store.users())
+            if legacy_vectors:
+                # 저장소와 .npy 파일을 합친 Gallery는 저장소 기준으로 만든 변환 파일, 색인을 사용할 수 없음
+                print(f'저장소에 없는 사용자 {len(legacy_vectors)}명의 .npy 벡터를 함께 로드합니다. '
+                      f'(python -m utils.embedding_store migrate 로 저장소에 가져올 수 있음)')
+                gallery = cls.from_store(store, "float32")
+                vectors = np.concatenate([gallery.vectors] + legacy_vectors)
+                labels = np.concatenate([gallery.labels.astype(str)] + legacy_labels)
+                order = np.argsort(labels, kind='stable')
+                return cls(vectors[order], labels[order], vector_format)
+
+            quantized_dir = os.path.join(path, os.path.basename(get_quantized_dir(vector_format)))
+            if vector_format != "float32" and os.path.exists(os.path.join(quantized_dir, 'meta.json')):
+                gallery, meta = cls.from_quantized(quantized_dir)
+                if meta.get('source_version') == store.version() and meta['format'] == vector_format:
+                    return gallery.attach_index(store, path)
+            return cls.from_store(store, vector_format).attach_index(store, path)
+
+        vectors, labels = load_vector_files(path)
+        if not vectors:
+            print(f'등록된 얼굴 벡터가 없습니다: {path}')
+            return cls(np.zeros((0, 128), dtype=np.float32), np.zeros(0, dtype=str), vector_format)
+
+        return cls(np.concatenate(vectors), np.concatenate(labels), vector_format)
+
+    def attach_index(self, store, path=VECTOR_DIR):
+        """
+        설정에서 사용하도록 되어 있고 등록 벡터가 충분히 많으면 저장된 색인을 연결
+        색인 이후 저장소에 추가된 레코드는 메모리에서만 이어서 추가 (파일 갱신은 python -m models.ann_index update)
+
+        :param store: 색인과 같은 EmbeddingStore 객체
+        :param path: 벡터 파일 폴더
+        :return: self
+        """
+        if not ANN_ENABLED or len(self) < ANN_MIN_VECTORS:
+            return self
+
+        from models.ann_index import IVFIndex
+
+        index = IVFIndex.load(os.path.join(path, os.path.basename(os.path.normpath(ANN_INDEX_DIR))))
+        if index is None:
+            print(f'근사 최근접 이웃 색인이 없어 전체 비교로 식별합니다: {ANN_INDEX_DIR}')
+            return self
+        if index.generation != store.generation():
+            print('저장소가 다시 쓰여 색인을 사용할 수 없습니다. python -m models.ann_index build 로 다시 생성하세요.')
+            return self
+        if index.source_version != store.version():
+            index.update_from_store(store)
+        self.index = index
+        return self
+
+    def __len__(self):
+        return len(self.labels)
+
+    def distances(self, face_vectors, rows=slice(None)):
+        """
+        입력 벡터와 등록 벡터 간 유클리드 거리를 한 번에 계산
+        ||a - b||^2 = ||a||^2 - 2 a·b + ||b||^2
+
+        :param face_vectors: (Q, 128) 또는 (128, ) 형태의 입력 벡터
+        :param rows: 비교할 등록 벡터 범위 (기본값: 전체)
+        :return: (Q, N) 형태의 거리 행렬
+        """
+        return self.matrix.distances(face_vectors, rows)
+
+    def identify_batch(self, face_vectors, k=1):
+        """
+        여러 입력 벡터에 대해 사용자 별 최소 거리 기준 상위 k명을 반환
+
+        :param face_vectors: (Q, 128) 형태의 입력 벡터
+        :param k: 반환할 후보 수 (int)
+        :return: 입력 벡터 별 [(사용자 이름, 거리), ...] 리스트
+        """
+        if len(self) == 0:
+            return [[] for _ in np.asarray(face_vectors).reshape(-1, 128)]
+        if self.index is not None:
+            return self.index.identify_batch(face_vectors, k)
+
+        # 사용자 별 최소 거리 (Q, 사용자 수)
+        user_distances = np.minimum.reduceat(self.distances(face_vectors), self.starts, axis=1)
+
+        k = min(k, len(self.users))
+        top = np.argpartition(user_distances, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(user_distances, top):
+            candidates = candidates[np.argsort(row[candidates])]
+            results.append([(str(self.users[i]), float(row[i])) for i in candidates])
+
+        return results
+
+    def identify(self, face_vector, k=1):
+        """
+        입력 얼굴 벡터가 누구인지 상위 k명의 후보와 거리를 반환
+
+        :param face_vector: (128, ) 형태의 입력 벡터
+        :param k: 반환할 후보 수 (int)
+        :return: 거리 순으로 정렬된 [(사용자 이름, 거리), ...] 리스트
+        """
+        return self.identify_batch(face_vector, k)[0]
+
+    def verify(self, user_name, face_vector, tolerance=TOLERANCE):
+        """
+        입력 얼굴 벡터가 {user_name} 사용자인지 판별 (해당 사용자 구간만 비교)
+
+        :param user_name: 사용자 이름
+        :param face_vector: (128, ) 형태의 입력 벡터
+        :param tolerance: 같은 사람으로 판단하는 최대 거리 (float)
+        :return: 도어락 열림(1) 또는 닫힘(0) 값 출력
+        """
+        rows = self.user_slices.get(user_name)
+        if rows is None:
+            print(f'{user_name}님의 데이터가 존재하지 않습니다.')
+            return 0
+
+        distance = float(self.distances(face_vector, rows).min())
+        return 1 if distance <= tolerance else 0
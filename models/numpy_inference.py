@@ -0,0 +1,218 @@
+import os
+import numpy as np
+from config import VERIFIER_BACKEND, get_weights_path
+from utils.vector_checking import get_vector_digest
+from utils import metrics
+
+"""
+    TensorFlow 없이 NumPy만으로 사용자 판별 모델(128 -> 6 -> 5 -> 4 -> 1)을 실행
+
+    - 학습 단계(faces_training.train_model)에서 Dense 층의 가중치를 .npz 파일로 저장
+    - 인식 단계에서는 .npz 가중치를 로드해 행렬 곱 연쇄로 예측
+    - 여러 개의 128차원 벡터를 (N, 128) 배열로 한 번에 예측 가능
+    - config.VERIFIER_BACKEND가 "prototype" / "knn"이면 학습 없는 판별 통계(models/prototype.py)로 같은 형태의 점수 계산
+    - "shared"이면 모든 사용자를 함께 학습한 공유 모델(models/shared_model.py)에서 해당 사용자 출력만 계산
+"""
+
+# 사용자 인식 임계값 (faces_training.THRESHOLD와 동일)
+THRESHOLD = 0.9
+
+# model.predict()와 NumPy 예측 값의 허용 오차
+TOLERANCE = 1e-4
+
+# 프로세스 내에서 로드한 가중치 캐시 {user_name: (digest, layers)}
+_weights_cache = {}
+
+
+def export_weights(model, path):
+    """
+    학습된 Keras 모델의 Dense 층 가중치와 활성화 함수를 .npz 파일로 저장
+
+    :param model: 학습된 Keras Sequential 모델
+    :param path: 저장할 .npz 파일 경로
+    :return: 저장된 층 개수 (int)
+    """
+    arrays = {}
+    activations = []
+    for layer in model.layers:
+        weights = layer.get_weights()
+        # 가중치가 없는 층(Input 등)은 건너뜀
+        if not weights:
+            continue
+        index = len(activations)
+        arrays[f'W{index}'] = weights[0].astype(np.float32)
+        arrays[f'b{index}'] = weights[1].astype(np.float32)
+        activations.append(layer.get_config()['activation'])
+
+    arrays['activations'] = np.array(activations)
+    np.savez_compressed(path, **arrays)
+
+    return len(activations)
+
+
+def load_weights(path):
+    """
+    .npz 파일에서 층별 (가중치, 편향, 활성화 함수) 목록을 로드
+
+    :param path: .npz 파일 경로
+    :return: [(W, b, activation), ...] 리스트
+    """
+    with np.load(path) as data:
+        activations = [str(a) for a in data['activations']]
+        return [(data[f'W{i}'], data[f'b{i}'], activations[i]) for i in range(len(activations))]
+
+
+def forward(layers, X):
+    """
+    Dense 층을 순서대로 계산하는 NumPy 순전파
+
+    :param layers: load_weights()가 반환한 층 목록
+    :param X: (N, 128) 또는 (128, ) 형태의 얼굴 벡터
+    :return: (N, 1) 형태의 예측 확률
+    """
+    out = np.asarray(X, dtype=np.float32)
+    if out.ndim == 1:
+        out = out.reshape(1, -1)
+
+    for W, b, activation in layers:
+        out = out @ W
+        out += b
+        if activation == 'relu':
+            np.maximum(out, 0, out=out)
+        elif activation == 'sigmoid':
+            # 큰 음수 입력에서 exp 오버플로를 피하기 위해 범위를 제한
+            np.clip(out, -60, 60, out=out)
+            np.negative(out, out=out)
+            np.exp(out, out=out)
+            out += 1
+            np.reciprocal(out, out=out)
+        elif activation != 'linear':
+            raise ValueError(f'지원하지 않는 활성화 함수입니다: {activation}')
+
+    return out
+
+
+def compare_with_keras(model, layers, X, tolerance=TOLERANCE):
+    """
+    NumPy 순전파 결과가 model.predict()와 같은지 확인
+
+    :param model: 학습된 Keras 모델
+    :param layers: load_weights()가 반환한 층 목록
+    :param X: (N, 128) 형태의 비교용 얼굴 벡터
+    :param tolerance: 허용 오차 (float)
+    :return: (최대 오차, 판별 결과 일치 여부) 튜플
+    """
+    X = np.asarray(X, dtype=np.float32)
+    keras_prediction = model.predict(X, verbose=0)
+    numpy_prediction = forward(layers, X)
+
+    max_error = float(np.max(np.abs(keras_prediction - numpy_prediction)))
+    same_decision = bool(np.all((keras_prediction > THRESHOLD) == (numpy_prediction > THRESHOLD)))
+    if max_error > tolerance or not same_decision:
+        print(f'NumPy 추론 결과가 Keras와 다릅니다. 최대 오차: {max_error:.6f}')
+
+    return max_error, same_decision
+
+
+def load_user_weights(user_name):
+    """
+    {user_name} 사용자의 최신 가중치를 로드
+    가중치 파일이 없거나 벡터 파일이 바뀐 경우에만 TensorFlow로 학습
+
+    :param user_name: 사용자 이름
+    :return: load_weights()가 반환한 층 목록
+    """
+    digest = get_vector_digest(user_name)
+
+    # 같은 프로세스에서 이미 로드한 가중치가 최신이면 그대로 사용
+    cached = _weights_cache.get(user_name)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+
+    weights_path = get_weights_path(user_name, digest)
+    if not os.path.exists(weights_path):
+        # 학습 및 가중치 저장이 필요한 경우에만 TensorFlow를 불러옴
+        from models.faces_training import load_model
+        model = load_model(user_name)
+
+        # 가중치 파일 저장 이전에 학습된 모델(.keras)은 로드만 되므로 여기서 가중치를 내보냄
+        if not os.path.exists(weights_path):
+            export_weights(model, weights_path)
+
+    with metrics.stage("disk_io"):
+        layers = load_weights(weights_path)
+    _weights_cache[user_name] = (digest, layers)
+
+    return layers
+
+
+def load_verifier(user_name, backend=VERIFIER_BACKEND):
+    """
+    {user_name} 사용자의 판별에 필요한 가중치 또는 판별 통계를 로드
+
+    :param user_name: 사용자 이름
+    :param backend: "keras", "prototype", "knn", "shared"
+    :return: 층 목록 (keras, shared) 또는 판별 통계 dict
+    """
+    if backend == "keras":
+        return load_user_weights(user_name)
+    if backend == "shared":
+        from models.shared_model import load_shared_model
+        return load_shared_model().user_layers(user_name)
+
+    from models.prototype import load_prototype
+    return load_prototype(user_name)
+
+
+def run_verifier(verifier, face_vectors, backend=VERIFIER_BACKEND):
+    """
+    load_verifier()로 로드한 가중치 또는 판별 통계로 점수 계산
+
+    :param verifier: load_verifier()가 반환한 값
+    :param face_vectors: (N, 128) 또는 (128, ) 형태의 얼굴 벡터
+    :param backend: "keras", "prototype", "knn", "shared"
+    :return: (N, 1) 형태의 점수 (THRESHOLD 초과이면 같은 사용자)
+    """
+    if backend in ("keras", "shared"):
+        return forward(verifier, face_vectors)
+
+    from models.prototype import predict
+    return predict(verifier, face_vectors, backend)
+
+
+def predict_user(user_name, face_vectors, backend=VERIFIER_BACKEND):
+    """
+    설정한 판별 방식으로 얼굴 벡터가 {user_name} 사용자일 점수 계산
+
+    :param user_name: 사용자 이름
+    :param face_vectors: (N, 128) 또는 (128, ) 형태의 얼굴 벡터
+    :param backend: "keras", "prototype", "knn", "shared"
+    :return: (N, 1) 형태의 점수
+    """
+    return run_verifier(load_verifier(user_name, backend), face_vectors, backend)
+
+
+def verify_user(user_name, face_vectors):
+    """
+    NumPy 추론으로 캡처한 얼굴 벡터가 {user_name} 사용자인지 판별 (도어락 기본 경로)
+
+    :param user_name: 사용자 이름
+    :param face_vectors: 캡처된 이미지에서 추출한 벡터
+    :return: 도어락 열림(1) 또는 닫힘(0) 값 출력
+    """
+    verifier = load_verifier(user_name)
+    with metrics.stage("classification"):
+        prediction = run_verifier(verifier, face_vectors)
+
+    # 예측 확률 값 출력
+    print(f"테스트 데이터 예측값: {prediction[0][0]:.4f}")
+
+    # 사용자 확인
+    if prediction[0][0] > THRESHOLD:
+        metrics.increment("accepted")
+        print(f"{user_name} 사용자 인식")
+        return 1
+    else:
+        metrics.increment("rejected")
+        print("등록되지 않은 사용자입니다.")
+        return 0
@@ -0,0 +1,167 @@
+import os
+import glob
+import numpy as np
+from config import (MODEL_DIR, PROTOTYPE_RADIUS_QUANTILE, PROTOTYPE_RADIUS_MARGIN, PROTOTYPE_KNN,
+                    get_prototype_path)
+from utils.embedding_store import load_user_vectors
+from utils.vector_checking import get_vector_digest
+from utils import metrics
+
+"""
+    학습 없이 사용자 얼굴 벡터의 통계만으로 판별하는 검증기 (Keras 모델 대신 선택 가능, config.VERIFIER_BACKEND)
+
+    - prototype : 사용자 벡터의 중심(centroid)과의 거리가 보정된 반경(radius) 이내이면 같은 사용자
+    - knn       : 가장 가까운 k개 등록 벡터와의 평균 거리가 보정된 반경 이내이면 같은 사용자
+    - 반경 보정 : 등록 벡터 자신의 거리 분포 상위 분위수(PROTOTYPE_RADIUS_QUANTILE)에 여유 배율을 곱하고,
+                  같은 사람으로 판단하는 최대 거리(gallery.TOLERANCE)를 넘지 않도록 제한
+    - 점수      : THRESHOLD ** (거리 / 반경) -> 반경에서 정확히 THRESHOLD가 되어 Keras 모델 점수와 같은 기준으로 사용
+    - 통계는 등록 단계에서 한 번 계산해 벡터 내용 해시가 붙은 .npz 파일로 저장
+"""
+
+BACKENDS = ("keras", "prototype", "knn", "shared")
+
+# 프로세스 내에서 로드한 통계 캐시 {user_name: (digest, prototype)}
+_prototype_cache = {}
+
+
+def _calibrated_radius(distances):
+    """
+    등록 벡터의 거리 분포로 판별 반경 계산
+
+    :param distances: 등록 벡터 별 거리 배열
+    :return: 반경 (float)
+    """
+    from models.gallery import TOLERANCE
+
+    if len(distances) == 0:
+        return TOLERANCE
+    radius = float(np.quantile(distances, PROTOTYPE_RADIUS_QUANTILE)) * PROTOTYPE_RADIUS_MARGIN
+    return min(max(radius, 1e-6), TOLERANCE)
+
+
+def knn_distances(vectors, face_vectors, k=PROTOTYPE_KNN, exclude_self=False):
+    """
+    입력 벡터 별로 가장 가까운 k개 등록 벡터와의 평균 거리
+
+    :param vectors: (N, 128) 등록 벡터
+    :param face_vectors: (Q, 128) 입력 벡터
+    :param k: 평균에 사용하는 이웃 수
+    :param exclude_self: 입력이 등록 벡터 자신일 때 자기 자신 제외 (보정용, Q == N)
+    :return: (Q, ) 평균 거리 배열
+    """
+    squared = (np.einsum('ij,ij->i', face_vectors, face_vectors)[:, None] - 2 * face_vectors @ vectors.T
+               + np.einsum('ij,ij->i', vectors, vectors))
+    distances = np.sqrt(np.maximum(squared, 0))
+    if exclude_self:
+        np.fill_diagonal(distances, np.inf)
+    k = max(min(k, len(vectors) - int(exclude_self)), 1)
+    nearest = np.partition(distances, k - 1, axis=1)[:, :k]
+    return nearest.mean(axis=1)
+
+
+def compute_prototype(vectors):
+    """
+    사용자 벡터의 중심, 반경 등 판별 통계 계산
+
+    :param vectors: (N, 128) 형태의 사용자 얼굴 벡터
+    :return: {'centroid', 'radius', 'knn_radius', 'vectors', 'spread'} dict
+    """
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, 128)
+    if len(vectors) == 0:
+        raise ValueError('판별 통계를 계산할 벡터가 없습니다.')
+
+    centroid = vectors.mean(axis=0)
+    centroid_distances = np.linalg.norm(vectors - centroid, axis=1)
+
+    # 자기 자신을 제외한 k개 이웃 평균 거리 (벡터가 하나뿐이면 기본 반경 사용)
+    knn = knn_distances(vectors, vectors, exclude_self=True) if len(vectors) > 1 else np.zeros(0)
+
+    return {
+        'centroid': centroid,
+        'radius': np.float32(_calibrated_radius(centroid_distances)),
+        'knn_radius': np.float32(_calibrated_radius(knn)),
+        'vectors': vectors,
+        'spread': np.float32(centroid_distances.mean()),
+    }
+
+
+def save_prototype(user_name, digest=None):
+    """
+    {user_name} 사용자의 판별 통계를 계산해 저장 (등록 단계), 이전 버전 파일은 삭제
+
+    :param user_name: 사용자 이름
+    :param digest: 사용자 벡터 내용 해시 (None이면 계산)
+    :return: 판별 통계 dict
+    """
+    digest = digest or get_vector_digest(user_name)
+    prototype = compute_prototype(load_user_vectors(user_name))
+
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    path = get_prototype_path(user_name, digest)
+    for old_path in glob.glob(get_prototype_path(user_name, '*')):
+        if old_path != path:
+            os.remove(old_path)
+    np.savez(path, **prototype)
+
+    _prototype_cache[user_name] = (digest, prototype)
+    print(f'{user_name}님의 판별 통계가 저장되었습니다: 반경 {prototype["radius"]:.3f}, '
+          f'kNN 반경 {prototype["knn_radius"]:.3f} ({path})')
+    return prototype
+
+
+@metrics.timed("disk_io")
+def read_prototype(path):
+    """
+    save_prototype()이 저장한 .npz 파일에서 판별 통계 로드
+
+    :param path: .npz 파일 경로
+    :return: 판별 통계 dict
+    """
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def load_prototype(user_name):
+    """
+    {user_name} 사용자의 최신 판별 통계 로드 (없거나 벡터가 바뀌었으면 새로 계산해 저장)
+
+    :param user_name: 사용자 이름
+    :return: 판별 통계 dict
+    """
+    digest = get_vector_digest(user_name)
+
+    cached = _prototype_cache.get(user_name)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+
+    path = get_prototype_path(user_name, digest)
+    if not os.path.exists(path):
+        return save_prototype(user_name, digest)
+
+    prototype = read_prototype(path)
+    _prototype_cache[user_name] = (digest, prototype)
+    return prototype
+
+
+def predict(prototype, face_vectors, backend="prototype"):
+    """
+    판별 통계로 입력 벡터의 점수 계산 (Keras 모델의 예측 확률과 같은 형태)
+
+    :param prototype: load_prototype()이 반환한 dict
+    :param face_vectors: (N, 128) 또는 (128, ) 형태의 입력 벡터
+    :param backend: "prototype" 또는 "knn"
+    :return: (N, 1) 형태의 점수 (반경 이내이면 THRESHOLD 초과)
+    """
+    from models.numpy_inference import THRESHOLD
+
+    face_vectors = np.asarray(face_vectors, dtype=np.float32).reshape(-1, 128)
+    if backend == "prototype":
+        distances = np.linalg.norm(face_vectors - prototype['centroid'], axis=1)
+        radius = prototype['radius']
+    elif backend == "knn":
+        distances = knn_distances(prototype['vectors'], face_vectors)
+        radius = prototype['knn_radius']
+    else:
+        raise ValueError(f'지원하지 않는 검증기입니다: {backend}')
+
+    return np.power(THRESHOLD, distances / radius).astype(np.float32)[:, None]
@@ -0,0 +1,303 @@
+import os
+import sys
+import time
+import numpy as np
+from config import (SHARED_MODEL_PATH, SHARED_MODEL_HIDDEN, SHARED_MODEL_EPOCHS, SHARED_MODEL_BATCH_SIZE,
+                    SHARED_MODEL_LEARNING_RATE, SHARED_MODEL_BACKGROUND, SHARED_MODEL_MIN_STEPS)
+from models.numpy_inference import forward, load_weights
+from utils import metrics
+
+"""
+    등록된 모든 사용자를 하나의 모델로 판별하는 공유 모델 (사용자마다 모델을 학습하는 대신 선택, config.VERIFIER_BACKEND = "shared")
+
+    - 구조 : 128 -> SHARED_MODEL_HIDDEN (relu) -> 사용자 수 (sigmoid), 사용자 별 출력이 one-vs-rest 판별기
+    - 학습 : 저장소를 한 번 읽어 모든 사용자 벡터로 함께 학습 (TensorFlow 없이 NumPy mini-batch Adam)
+        - 사용자 자신의 벡터는 양성, 다른 사용자의 벡터는 음성
+        - 배치마다 등록 벡터에서 같은 사람으로 판단하는 거리보다 멀리 떨어진 배경 벡터를 음성으로 추가
+          (등록되지 않은 얼굴 거부, 사용자가 1명이라 다른 사용자 음성이 없는 경우 포함)
+        - 사용자 별 양성/음성 수 차이는 손실 가중치로 보정
+    - 추론 : 순전파 한 번으로 모든 사용자의 점수 (Q, 사용자 수) 계산 (numpy_inference.forward와 같은 층 형식)
+    - 점수는 Keras 모델의 예측 확률과 같이 THRESHOLD 초과이면 같은 사용자
+    - 저장소 버전(EmbeddingStore.version())과 함께 저장하고, 저장소가 바뀌면 다시 학습
+    - 사용자가 1명이면 다른 사용자 음성이 없어 판별 범위가 좁으므로 prototype 방식을 권장
+
+    실행 방법 (프로젝트 루트에서)
+        python -m models.shared_model train
+        python -m models.shared_model info
+"""
+
+# 프로세스 내에서 로드한 공유 모델 캐시 {파일 경로: SharedModel}
+_shared_cache = {}
+
+
+class SharedModel:
+    def __init__(self, layers, labels, source_version=None):
+        """
+        SharedModel 클래스 생성자
+
+        :param layers: [(W, b, activation), ...] 층 목록 (마지막 층 출력이 사용자 별 점수)
+        :param labels: 출력 순서의 사용자 이름 배열
+        :param source_version: 학습에 사용한 저장소 버전 (EmbeddingStore.version())
+        """
+        self.layers = layers
+        self.labels = np.asarray(labels)
+        self.columns = {name: column for column, name in enumerate(self.labels.tolist())}
+        self.source_version = source_version
+
+    def __len__(self):
+        return len(self.labels)
+
+    @classmethod
+    def train(cls, vectors, labels, hidden=SHARED_MODEL_HIDDEN, epochs=SHARED_MODEL_EPOCHS,
+              batch_size=SHARED_MODEL_BATCH_SIZE, learning_rate=SHARED_MODEL_LEARNING_RATE,
+              background=SHARED_MODEL_BACKGROUND, min_steps=SHARED_MODEL_MIN_STEPS, seed=0, verbose=True):
+        """
+        모든 사용자 벡터로 공유 모델 학습
+
+        :param vectors: (N, 128) 형태의 얼굴 벡터
+        :param labels: (N, ) 벡터 별 사용자 이름
+        :param hidden: 은닉층 크기 (int)
+        :param epochs: 학습 반복 수 (int)
+        :param batch_size: 배치 크기 (int)
+        :param learning_rate: Adam 학습률 (float)
+        :param background: 배치 크기 대비 배경 음성 벡터 비율 (float)
+        :param min_steps: 최소 가중치 갱신 횟수 (벡터가 적으면 epochs보다 많이 반복)
+        :param seed: 난수 시드 (int)
+        :param verbose: 학습 결과 출력 여부 (bool)
+        :return: SharedModel 객체
+        """
+        from models.gallery import TOLERANCE
+
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, 128)
+        if len(vectors) == 0:
+            raise ValueError('학습할 벡터가 없습니다.')
+        names, targets = np.unique(np.asarray(labels), return_inverse=True)
+        count, users = len(vectors), len(names)
+        rng = np.random.default_rng(seed)
+        start = time.perf_counter()
+
+        # 평균을 빼고 전체 값의 표준편차로 나누어 학습 (dlib 벡터 값은 0.1 정도로 작아 학습이 느림)
+        ## 차원별 표준편차를 사용하면 사용자가 적을 때 같은 사용자 안의 흩어짐만으로 나누게 되어 판별 범위가 지나치게 좁아짐
+        ## 학습 후 첫 번째 층에 합쳐 저장하므로 추론은 원래 벡터를 그대로 사용
+        mean = vectors.mean(axis=0)
+        std = max(float(vectors.std()), 1e-3)
+
+        params = [rng.normal(0, np.sqrt(2 / 128), (128, hidden)).astype(np.float32),
+                  np.zeros(hidden, dtype=np.float32),
+                  rng.normal(0, np.sqrt(1 / hidden), (hidden, users)).astype(np.float32),
+                  np.zeros(users, dtype=np.float32)]
+        moments = [np.zeros_like(p) for p in params]
+        squares = [np.zeros_like(p) for p in params]
+        beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+
+        # 사용자 별 양성/음성 가중치 : 한 번의 학습 반복에서 양성과 음성의 손실 비중이 같도록 보정
+        positives = np.bincount(targets, minlength=users).astype(np.float32)
+        total = count * (1 + background)
+        pos_weight = 0.5 * total / positives
+        neg_weight = 0.5 * total / (total - positives)
+
+        # 벡터가 적으면 한 번의 학습 반복에 배치가 적으므로 최소 갱신 횟수를 채울 때까지 반복
+        batches = -(-count // batch_size)
+        epochs = max(epochs, -(-min_steps // batches))
+
+        step = 0
+        for epoch in range(epochs):
+            order = rng.permutation(count)
+            epoch_loss = 0.0
+            for begin in range(0, count, batch_size):
+                rows = order[begin:begin + batch_size]
+                X, t = vectors[rows], targets[rows]
+
+                # 배경 음성 : 등록 벡터에서 같은 사람으로 판단하는 최대 거리(TOLERANCE) ~ 2배 떨어진 임의 방향의 벡터
+                extra = int(round(len(rows) * background))
+                if extra:
+                    directions = rng.normal(size=(extra, 128)).astype(np.float32)
+                    directions *= (rng.uniform(TOLERANCE, 2 * TOLERANCE, extra)
+                                   / np.linalg.norm(directions, axis=1)).astype(np.float32)[:, None]
+                    X = np.concatenate([X, vectors[rng.integers(count, size=extra)] + directions])
+                X = (X - mean) / std
+
+                W1, b1, W2, b2 = params
+                hidden_out = np.maximum(X @ W1 + b1, 0)
+                logits = hidden_out @ W2
+                logits += b2
+                np.clip(logits, -60, 60, out=logits)
+                p = np.exp(-logits, out=logits)
+                p += 1
+                np.reciprocal(p, out=p)
+
+                # 가중 이진 크로스엔트로피의 logits에 대한 기울기 : 음성은 p, 양성(배치 앞부분의 사용자 열)은 p - 1
+                scale = 1.0 / (len(X) * users)
+                positive = (np.arange(len(rows)), t)
+                positive_p = p[positive]
+                if epoch == epochs - 1:
+                    # 마지막 반복의 손실 (출력용, 모든 열을 음성으로 계산한 후 양성 열만 바꿈)
+                    batch_loss = (np.sum(np.log(1 - p + 1e-7) * neg_weight)
+                                  + np.sum(pos_weight[t] * np.log(positive_p + 1e-7)
+                                           - neg_weight[t] * np.log(1 - positive_p + 1e-7)))
+                    epoch_loss -= float(batch_loss) * scale * len(rows)
+                grad = p
+                grad *= neg_weight * scale
+                grad[positive] = (positive_p - 1) * pos_weight[t] * scale
+
+                hidden_grad = grad @ W2.T
+                hidden_grad[hidden_out <= 0] = 0
+                grads = [X.T @ hidden_grad, hidden_grad.sum(axis=0), hidden_out.T @ grad, grad.sum(axis=0)]
+
+                step += 1
+                for param, g, m, v in zip(params, grads, moments, squares):
+                    m *= beta1
+                    m += (1 - beta1) * g
+                    v *= beta2
+                    v += (1 - beta2) * g * g
+                    param -= (learning_rate * (m / (1 - beta1 ** step))
+                              / (np.sqrt(v / (1 - beta2 ** step)) + epsilon)).astype(np.float32)
+
+        if verbose:
+            print(f'공유 모델 학습 완료: 사용자 {users}명, 벡터 {count}개, '
+                  f'최종 학습 손실 {epoch_loss / count:.4f} ({time.perf_counter() - start:.2f}초)')
+
+        W1, b1, W2, b2 = params
+        W1, b1 = W1 / std, b1 - (mean / std) @ W1
+        return cls([(W1, b1, 'relu'), (W2, b2, 'sigmoid')], names)
+
+    def scores(self, face_vectors):
+        """
+        순전파 한 번으로 모든 사용자의 점수 계산
+
+        :param face_vectors: (Q, 128) 또는 (128, ) 형태의 얼굴 벡터
+        :return: (Q, 사용자 수) 형태의 점수 (열 순서는 self.labels)
+        """
+        return forward(self.layers, face_vectors)
+
+    def identify_batch(self, face_vectors, k=1):
+        """
+        입력 벡터 별 점수가 높은 상위 k명
+
+        :param face_vectors: (Q, 128) 형태의 얼굴 벡터
+        :param k: 반환할 후보 수 (int)
+        :return: 입력 벡터 별 [(사용자 이름, 점수), ...] 리스트
+        """
+        scores = self.scores(face_vectors)
+        k = min(k, len(self))
+        top = np.argsort(-scores, axis=1)[:, :k]
+        return [[(str(self.labels[column]), float(row[column])) for column in columns]
+                for row, columns in zip(scores, top)]
+
+    def user_layers(self, user_name):
+        """
+        {user_name} 사용자 출력만 계산하는 층 목록 (사용자 판별용, numpy_inference.forward로 (N, 1) 점수 계산)
+
+        :param user_name: 사용자 이름
+        :return: [(W, b, activation), ...] 리스트
+        """
+        column = self.columns.get(user_name)
+        if column is None:
+            raise KeyError(f'공유 모델에 없는 사용자입니다: {user_name}')
+        W, b, activation = self.layers[-1]
+        return self.layers[:-1] + [(W[:, [column]], b[[column]], activation)]
+
+    def save(self, path=SHARED_MODEL_PATH):
+        """
+        층 가중치(numpy_inference.load_weights 형식), 사용자 이름, 저장소 버전을 .npz 파일로 저장
+
+        :param path: 저장할 .npz 파일 경로
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        arrays = {}
+        for index, (W, b, _) in enumerate(self.layers):
+            arrays[f'W{index}'] = W
+            arrays[f'b{index}'] = b
+        arrays['activations'] = np.array([activation for _, _, activation in self.layers])
+        arrays['labels'] = self.labels
+        arrays['source_version'] = np.array(self.source_version or [], dtype=np.int64)
+
+        # 임시 파일에 쓴 후 교체 (인식 중인 프로세스가 쓰는 도중의 파일을 읽지 않도록)
+        temp_path = path + '.tmp.npz'
+        np.savez(temp_path, **arrays)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path=SHARED_MODEL_PATH):
+        """
+        save()로 저장한 공유 모델 로드
+
+        :param path: .npz 파일 경로
+        :return: SharedModel 객체 (파일이 없으면 None)
+        """
+        if not os.path.exists(path):
+            return None
+        layers = load_weights(path)
+        with np.load(path) as data:
+            labels = data['labels']
+            source_version = data['source_version'].tolist() or None
+        return cls(layers, labels, source_version)
+
+
+def train_from_store(store=None, **kwargs):
+    """
+    저장소를 한 번 읽어 삭제되지 않은 모든 벡터로 공유 모델 학습
+
+    :param store: EmbeddingStore 객체 (None이면 기본 저장소)
+    :param kwargs: SharedModel.train()의 학습 설정
+    :return: SharedModel 객체
+    """
+    from utils.embedding_store import EmbeddingStore
+
+    store = store or EmbeddingStore()
+    version = store.version()
+    records = store.records()
+    rows = np.flatnonzero(store.live_mask(records))
+    vectors = np.array(records['vector'][rows], dtype=np.float32)
+    labels = np.char.decode(records['user'][rows], 'utf-8')
+    del records
+
+    model = SharedModel.train(vectors, labels, **kwargs)
+    model.source_version = version
+    return model
+
+
+def load_shared_model(store=None, path=SHARED_MODEL_PATH):
+    """
+    저장소 버전과 같은 공유 모델 로드 (없거나 저장소가 바뀌었으면 다시 학습해 저장)
+
+    :param store: EmbeddingStore 객체 (None이면 기본 저장소)
+    :param path: 공유 모델 파일 경로
+    :return: SharedModel 객체
+    """
+    from utils.embedding_store import EmbeddingStore
+
+    store = store or EmbeddingStore()
+    version = store.version()
+
+    # 같은 프로세스에서 이미 로드한 모델이 최신이면 그대로 사용
+    cached = _shared_cache.get(path)
+    if cached is not None and cached.source_version == version:
+        return cached
+
+    with metrics.stage("disk_io"):
+        model = SharedModel.load(path)
+    if model is None or model.source_version != version:
+        print('공유 모델이 없어 새로 학습합니다.' if model is None else '저장소가 바뀌어 공유 모델을 새로 학습합니다.')
+        model = train_from_store(store)
+        model.save(path)
+
+    _shared_cache[path] = model
+    return model
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "info"
+
+    if command == "train":
+        model = train_from_store()
+        model.save()
+        _shared_cache[SHARED_MODEL_PATH] = model
+        print(f'공유 모델이 저장되었습니다: {SHARED_MODEL_PATH}')
+    else:
+        model = SharedModel.load()
+        if model is None:
+            print('공유 모델이 없습니다. (python -m models.shared_model train)')
+            sys.exit(1)
+        print(f'사용자 {len(model)}명, 저장소 버전 {model.source_version}, '
+              f'층 크기 {[W.shape for W, _, _ in model.layers]}')
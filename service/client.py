@@ -0,0 +1,122 @@
+import sys
+import json
+import socket
+import argparse
+import http.client
+from urllib.parse import quote
+from config import SERVICE_HOST, SERVICE_PORT, SERVICE_SOCKET
+
+"""
+    : 인식 서비스(verification_server.py) 클라이언트
+    : 한 연결을 계속 사용 (keep-alive)하므로 스레드마다 별도의 객체를 사용
+
+    실행 방법 (프로젝트 루트에서)
+        python -m service.client data/captured_images/captured_img.jpg
+        python -m service.client data/captured_images/captured_img.jpg --user wooseong
+"""
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout=30):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class VerificationClient:
+    def __init__(self, host=SERVICE_HOST, port=SERVICE_PORT, socket_path=SERVICE_SOCKET, timeout=30):
+        """
+        VerificationClient 클래스 생성자
+
+        :param host: 서버 HTTP 주소
+        :param port: 서버 HTTP 포트
+        :param socket_path: Unix 도메인 소켓 경로 (지정하면 host/port 대신 사용)
+        :param timeout: 요청 제한 시간 (초)
+        """
+        if socket_path:
+            self.connection = UnixHTTPConnection(socket_path, timeout)
+        else:
+            self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        요청을 보내고 JSON 응답 반환 (연결이 끊긴 경우 한 번 다시 연결)
+
+        :return: 응답 dict
+        """
+        for attempt in range(2):
+            try:
+                self.connection.request(method, path, body=body, headers=headers or {})
+                response = self.connection.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, http.client.HTTPException):
+                self.connection.close()
+                if attempt:
+                    raise
+
+        result = json.loads(data.decode('utf-8'))
+        if response.status != 200:
+            raise RuntimeError(f'요청 실패 ({response.status}): {result.get("error")}')
+        return result
+
+    @staticmethod
+    def verify_path(user_name):
+        return '/verify' + (f'?user={quote(user_name)}' if user_name else '')
+
+    def verify_image(self, image, user_name=None):
+        """
+        인코딩된 이미지(JPEG/PNG)로 인식 요청
+
+        :param image: 이미지 파일 경로 또는 이미지 바이트
+        :param user_name: 확인할 사용자 이름 (None이면 식별)
+        :return: {'identity', 'score', 'decision', 'faces', 'elapsed_ms'} dict
+        """
+        if isinstance(image, str):
+            with open(image, 'rb') as f:
+                image = f.read()
+        return self.request('POST', self.verify_path(user_name), image, {'Content-Type': 'image/jpeg'})
+
+    def verify_frame(self, frame, user_name=None):
+        """
+        압축하지 않은 BGR 프레임으로 인식 요청 (인코딩/디코딩 비용 없음)
+
+        :param frame: (높이, 너비, 3) uint8 배열
+        :param user_name: 확인할 사용자 이름 (None이면 식별)
+        :return: 인식 결과 dict
+        """
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        headers = {'Content-Type': 'application/octet-stream', 'X-Frame-Width': str(width),
+                   'X-Frame-Height': str(height), 'X-Frame-Channels': str(channels)}
+        return self.request('POST', self.verify_path(user_name), frame.tobytes(), headers)
+
+    def health(self):
+        return self.request('GET', '/health')
+
+    def reload(self):
+        return self.request('POST', '/reload')
+
+    def close(self):
+        self.connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="얼굴 인식 서비스 클라이언트")
+    parser.add_argument("image", help="인식할 이미지 경로")
+    parser.add_argument("--user", help="확인할 사용자 이름 (생략하면 식별)")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--socket", default=SERVICE_SOCKET)
+    args = parser.parse_args()
+
+    client = VerificationClient(args.host, args.port, args.socket)
+    result = client.verify_image(args.image, args.user)
+    print(json.dumps(result, ensure_ascii=False))
+    # 도어락 열림(1) 또는 닫힘(0)
+    print(result['decision'])
+    sys.exit(0 if result['decision'] else 1)
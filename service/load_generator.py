@@ -0,0 +1,126 @@
+import sys
+import time
+import argparse
+import threading
+import numpy as np
+from config import SERVICE_HOST, SERVICE_PORT, SERVICE_SOCKET, IMAGE_DIR
+from utils.image_files import list_images
+from service.client import VerificationClient
+
+"""
+    : 인식 서비스에 여러 스레드로 동시에 요청을 보내 초당 처리 요청 수와 지연 시간을 측정
+    : 동시 요청 수를 여러 개 지정하면 각각 측정해 표로 비교
+
+    실행 방법 (서버 실행 후, 프로젝트 루트에서)
+        python -m service.load_generator --images data/user_faces --concurrency 1 2 4 8 --requests 200
+        python -m service.load_generator --frames --concurrency 4
+"""
+
+
+def run_load(payloads, concurrency, total_requests, user_name=None, frames=False,
+             host=SERVICE_HOST, port=SERVICE_PORT, socket_path=SERVICE_SOCKET):
+    """
+    동시 요청 수만큼 스레드를 만들어 총 요청 수를 나눠 전송
+
+    :param payloads: 이미지 바이트 리스트 (frames=True면 BGR 프레임 리스트)
+    :param concurrency: 동시 요청 수 (int)
+    :param total_requests: 전체 요청 수 (int)
+    :param user_name: 확인할 사용자 이름 (None이면 식별)
+    :param frames: 압축하지 않은 프레임으로 전송할지 여부 (bool)
+    :return: {'requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'server_ms'} dict
+    """
+    latencies = []
+    server_times = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+
+    def worker():
+        client = VerificationClient(host, port, socket_path)
+        try:
+            while True:
+                with lock:
+                    index = next(counter, None)
+                if index is None:
+                    return
+                payload = payloads[index % len(payloads)]
+                start = time.perf_counter()
+                try:
+                    if frames:
+                        result = client.verify_frame(payload, user_name)
+                    else:
+                        result = client.verify_image(payload, user_name)
+                except Exception as e:
+                    with lock:
+                        errors[0] += 1
+                    print(f'요청 실패: {e}')
+                    continue
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    server_times.append(result['elapsed_ms'])
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    values = np.asarray(latencies) if latencies else np.zeros(1)
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': len(latencies) / wall if wall else 0.0,
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'server_ms': float(np.mean(server_times)) if server_times else 0.0,
+    }
+
+
+def print_results(results):
+    """
+    동시 요청 수별 측정 결과를 표로 출력
+
+    :param results: run_load() 반환 값 리스트
+    """
+    print(f'{"동시 요청":>10}{"요청":>8}{"실패":>6}{"요청/초":>10}{"p50(ms)":>10}{"p95(ms)":>10}{"p99(ms)":>10}{"서버(ms)":>10}')
+    for row in results:
+        print(f'{row["concurrency"]:>10}{row["requests"]:>8}{row["errors"]:>6}{row["rps"]:>10.2f}'
+              f'{row["p50_ms"]:>10.2f}{row["p95_ms"]:>10.2f}{row["p99_ms"]:>10.2f}{row["server_ms"]:>10.2f}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="얼굴 인식 서비스 부하 측정")
+    parser.add_argument("--images", default=IMAGE_DIR, help="요청에 사용할 이미지 폴더")
+    parser.add_argument("--frames", action="store_true", help="JPEG 대신 압축하지 않은 BGR 프레임으로 전송")
+    parser.add_argument("--user", help="확인할 사용자 이름 (생략하면 식별)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8], help="동시 요청 수")
+    parser.add_argument("--requests", type=int, default=100, help="동시 요청 수별 전체 요청 수")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--socket", default=SERVICE_SOCKET)
+    args = parser.parse_args()
+
+    paths = list_images(args.images)
+    if not paths:
+        print(f'이미지를 찾을 수 없습니다: {args.images}')
+        sys.exit(1)
+
+    if args.frames:
+        import cv2 as cv
+        payloads = [frame for frame in (cv.imread(path) for path in paths) if frame is not None]
+    else:
+        payloads = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                payloads.append(f.read())
+
+    results = [run_load(payloads, concurrency, args.requests, args.user, args.frames,
+                        args.host, args.port, args.socket) for concurrency in args.concurrency]
+    print_results(results)
@@ -0,0 +1,147 @@
+import time
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import Future
+import numpy as np
+from config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+from utils import metrics
+
+"""
+    : 여러 요청 스레드가 동시에 보낸 작업을 모아 한 번에 처리하는 배치 처리기
+    : 첫 작업이 들어온 후 최대 max_wait_ms 동안 또는 max_batch_size개가 모일 때까지 기다린 후
+      process_batch(작업 리스트)를 한 번 호출하고, 결과를 각 요청의 Future로 돌려줌
+    : 배치 처리 중 예외가 생기면 작업을 하나씩 다시 처리해 실패한 작업의 Future에만 예외를 전달
+    : 배치 크기 분포와 대기 시간을 기록
+"""
+
+
+class MicroBatcher:
+    def __init__(self, process_batch, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS):
+        """
+        MicroBatcher 클래스 생성자
+
+        :param process_batch: 작업 리스트를 받아 같은 순서의 결과 리스트를 반환하는 함수
+        :param max_batch_size: 한 번에 처리할 최대 작업 수 (int)
+        :param max_wait_ms: 첫 작업이 들어온 후 다른 작업을 기다리는 최대 시간 (ms)
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+
+        # 통계
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.size_counts = Counter()
+        self.queue_waits = []
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, item):
+        """
+        작업 추가
+
+        :param item: process_batch()에 전달할 작업
+        :return: 결과를 받을 concurrent.futures.Future
+        """
+        future = Future()
+        self.queue.put((item, future, time.perf_counter()))
+        return future
+
+    def __call__(self, item):
+        """
+        작업을 추가하고 결과가 나올 때까지 대기
+
+        :param item: process_batch()에 전달할 작업
+        :return: 해당 작업의 결과
+        """
+        return self.submit(item).result()
+
+    def _collect(self):
+        """
+        첫 작업을 기다린 후 마감 시각까지 최대 max_batch_size개 수집
+
+        :return: [(작업, Future, 추가 시각), ...] 리스트
+        """
+        batch = [self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            waits = [started - submitted for _, _, submitted in batch]
+
+            with self.lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.size_counts[len(batch)] += 1
+                self.queue_waits.extend(waits)
+                # 통계용 대기 시간은 최근 값만 보관
+                del self.queue_waits[:-10000]
+            metrics.increment("batches")
+            metrics.increment("batched_requests", len(batch))
+            if metrics.enabled:
+                for wait in waits:
+                    metrics.observe("batch_queue_wait", wait)
+
+            try:
+                with metrics.stage("batch"):
+                    results = [(True, result) for result in self.process_batch([item for item, _, _ in batch])]
+            except Exception as e:
+                results = [(False, e)] if len(batch) == 1 else self._process_each(batch)
+
+            # 결과 수가 작업 수와 다르면 어느 결과가 어느 작업의 것인지 알 수 없으므로 모든 작업을 실패 처리
+            ## zip()은 짧은 쪽에 맞춰 끝나므로 확인하지 않으면 남은 Future가 영원히 완료되지 않음
+            if len(results) != len(batch):
+                error = RuntimeError(f'배치 결과 수({len(results)})가 작업 수({len(batch)})와 다릅니다.')
+                results = [(False, error)] * len(batch)
+
+            for (_, future, _), (ok, result) in zip(batch, results):
+                if ok:
+                    future.set_result(result)
+                else:
+                    future.set_exception(result)
+
+    def _process_each(self, batch):
+        """
+        배치 처리에 실패한 경우 작업을 하나씩 처리 (한 요청의 오류가 같은 배치의 다른 요청을 실패시키지 않도록)
+
+        :param batch: _collect()가 반환한 리스트
+        :return: 작업 별 (성공 여부, 결과 또는 예외) 튜플 리스트
+        """
+        metrics.increment("batch_retries")
+        results = []
+        for item, _, _ in batch:
+            try:
+                results.append((True, self.process_batch([item])[0]))
+            except Exception as e:
+                results.append((False, e))
+        return results
+
+    def stats(self):
+        """
+        배치 크기와 대기 시간 통계
+
+        :return: dict
+        """
+        with self.lock:
+            waits = np.asarray(self.queue_waits) * 1000 if self.queue_waits else np.zeros(1)
+            return {
+                'batches': self.batches,
+                'items': self.items,
+                'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+                'batch_sizes': dict(sorted(self.size_counts.items())),
+                'queue_wait_p50_ms': float(np.percentile(waits, 50)),
+                'queue_wait_p95_ms': float(np.percentile(waits, 95)),
+            }
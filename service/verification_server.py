@@ -0,0 +1,187 @@
+import os
+import json
+import argparse
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from config import SERVICE_HOST, SERVICE_PORT, SERVICE_SOCKET, SERVICE_BATCHING, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+from utils import metrics
+from service.verification_service import VerificationService, decode_image, decode_frame
+
+"""
+    : 모델을 미리 로드해 두고 요청마다 얼굴 인식 결과를 반환하는 헤드리스 서버
+      (도어락을 열 때마다 python app.py로 새 프로세스를 띄우고 dlib/TensorFlow/벡터 파일을 다시 로드하지 않음)
+    : localhost HTTP 또는 Unix 도메인 소켓에서 요청 수신
+    : API
+        POST /verify[?user=이름]   본문: JPEG/PNG 이미지 (Content-Type: image/*)
+                                   또는 BGR 프레임 (Content-Type: application/octet-stream,
+                                   X-Frame-Width / X-Frame-Height / X-Frame-Channels 헤더)
+                                   응답: {"identity", "score", "decision", "faces", "elapsed_ms"}
+                                   오류: 400 (잘못된 이미지/프레임), 404 (등록되지 않은 사용자), 500 (처리 중 오류)
+                                   응답: {"error"}
+        POST /reload               Gallery와 가중치 다시 로드 (사용자 등록 후)
+        GET  /health               서비스 상태 (배치 크기 분포와 대기 시간 포함)
+        GET  /metrics              단계별 시간 (Prometheus 텍스트, --metrics 또는 METRICS_ENABLED일 때)
+
+    실행 방법 (프로젝트 루트에서)
+        python -m service.verification_server --port 8765
+        python -m service.verification_server --socket /tmp/facerec.sock
+"""
+
+
+class VerificationHandler(BaseHTTPRequestHandler):
+    # keep-alive 연결을 지원해 요청마다 TCP 연결을 새로 맺지 않도록 함
+    protocol_version = "HTTP/1.1"
+    # 헤더와 본문을 따로 보낼 때 Nagle 알고리즘으로 생기는 약 40ms 지연 방지
+    disable_nagle_algorithm = True
+    service = None
+
+    def send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_body(self):
+        """
+        요청 본문 읽기
+
+        :return: 본문 bytes (Content-Length가 숫자가 아니거나 음수면 400 응답 후 None)
+        """
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            # 남은 본문의 길이를 알 수 없으므로 응답 후 연결 종료
+            self.close_connection = True
+            self.send_json(400, {'error': f"잘못된 Content-Length: {self.headers.get('Content-Length')}"})
+            return None
+        return self.rfile.read(length) if length > 0 else b''
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/health':
+            self.send_json(200, self.service.health())
+        elif path == '/metrics':
+            data = metrics.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self.send_json(404, {'error': f'알 수 없는 경로: {path}'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self.read_body()
+        if body is None:
+            return
+
+        if url.path == '/reload':
+            try:
+                self.service.reload()
+            except Exception as e:
+                self.send_json(500, {'error': f'다시 로드하지 못했습니다: {e}'})
+                return
+            self.send_json(200, self.service.health())
+            return
+        if url.path != '/verify':
+            self.send_json(404, {'error': f'알 수 없는 경로: {url.path}'})
+            return
+
+        user_name = parse_qs(url.query).get('user', [None])[0]
+        try:
+            if self.headers.get('Content-Type', '').startswith('application/octet-stream'):
+                image = decode_frame(body, int(self.headers['X-Frame-Width']), int(self.headers['X-Frame-Height']),
+                                     int(self.headers.get('X-Frame-Channels', 3)))
+            else:
+                image = decode_image(body)
+        except (KeyError, ValueError) as e:
+            self.send_json(400, {'error': f'프레임을 읽을 수 없습니다: {e}'})
+            return
+        if image is None:
+            self.send_json(400, {'error': '이미지를 디코딩할 수 없습니다.'})
+            return
+
+        # 처리 중 오류가 나도 연결을 끊지 않고 JSON 오류 응답을 보냄
+        try:
+            result = self.service.verify(image, user_name)
+        except FileNotFoundError as e:
+            self.send_json(404, {'error': str(e)})
+            return
+        except Exception as e:
+            metrics.increment("errors")
+            self.send_json(500, {'error': f'인식 중 오류가 발생했습니다: {type(e).__name__}: {e}'})
+            return
+        self.send_json(200, result)
+
+    def address_string(self):
+        # Unix 도메인 소켓은 클라이언트 주소가 없음
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        # 요청마다 접속 기록을 출력하지 않음 (부하 측정 시 출력 비용 제외)
+        pass
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        # 이전 실행에서 남은 소켓 파일 제거
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+
+def create_server(service, host=SERVICE_HOST, port=SERVICE_PORT, socket_path=SERVICE_SOCKET):
+    """
+    인식 서비스를 사용하는 HTTP 서버 생성
+
+    :param service: 모델을 로드한 VerificationService 객체
+    :param host: HTTP 주소
+    :param port: HTTP 포트 (0이면 빈 포트 자동 선택)
+    :param socket_path: Unix 도메인 소켓 경로 (지정하면 host/port 대신 사용)
+    :return: serve_forever()로 실행할 서버 객체
+    """
+    # Unix 도메인 소켓에는 TCP 옵션(TCP_NODELAY)을 설정할 수 없음
+    handler = type('BoundVerificationHandler', (VerificationHandler, ),
+                   {'service': service, 'disable_nagle_algorithm': not socket_path})
+    if socket_path:
+        return ThreadingUnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="얼굴 인식 서비스")
+    parser.add_argument("--host", default=SERVICE_HOST, help="HTTP 주소")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help="HTTP 포트")
+    parser.add_argument("--socket", default=SERVICE_SOCKET, help="Unix 도메인 소켓 경로 (지정 시 HTTP 포트 대신 사용)")
+    parser.add_argument("--metrics", action="store_true", help="단계별 시간 계측 사용 (GET /metrics)")
+    parser.add_argument("--no-batching", action="store_true", help="요청마다 따로 벡터 추출 및 판별")
+    parser.add_argument("--batch-size", type=int, default=BATCH_MAX_SIZE, help="한 번에 처리할 최대 얼굴 수")
+    parser.add_argument("--batch-wait-ms", type=float, default=BATCH_MAX_WAIT_MS, help="다른 요청을 기다리는 최대 시간 (ms)")
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable()
+
+    service = VerificationService(SERVICE_BATCHING and not args.no_batching, args.batch_size, args.batch_wait_ms)
+    service.warm_up()
+
+    server = create_server(service, args.host, args.port, args.socket)
+    print(f'인식 서비스 시작: {args.socket or f"http://{args.host}:{args.port}"}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
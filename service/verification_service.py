@@ -0,0 +1,172 @@
+import time
+import threading
+import numpy as np
+import cv2 as cv
+from config import SERVICE_BATCHING, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+from utils import metrics
+
+"""
+    : 얼굴 검출기, 벡터 추출기, 등록 사용자 Gallery, 사용자 모델 가중치를 한 번만 로드해 두고
+      요청마다 이미지 한 장의 인식 결과(사용자, 점수, 열림 여부)를 반환
+    : HTTP 서버(verification_server.py)와 분리되어 있어 다른 입력 방식에서도 그대로 사용 가능
+    : 배치 처리를 사용하면 전처리와 얼굴 검출은 요청 스레드에서 수행하고,
+      동시에 들어온 요청들의 벡터 추출과 판별은 MicroBatcher가 모아 한 번에 수행
+"""
+
+
+def decode_image(data):
+    """
+    JPEG/PNG 등 인코딩된 이미지 바이트를 BGR 프레임으로 변환
+
+    :param data: 이미지 파일 내용 (bytes)
+    :return: OpenCV BGR 프레임 (변환할 수 없으면 None)
+    """
+    return cv.imdecode(np.frombuffer(data, dtype=np.uint8), cv.IMREAD_COLOR)
+
+
+def decode_frame(data, width, height, channels=3):
+    """
+    압축하지 않은 BGR 프레임 바이트를 배열로 변환 (복사 없음)
+
+    :param data: 프레임 바이트 (height * width * channels)
+    :param width: 프레임 너비 (int)
+    :param height: 프레임 높이 (int)
+    :param channels: 채널 수 (int, BGR 3채널만 지원)
+    :return: (height, width, channels) uint8 배열
+    """
+    if channels != 3:
+        raise ValueError(f'BGR 3채널 프레임만 지원합니다: {channels}채널')
+    if width <= 0 or height <= 0:
+        raise ValueError(f'프레임 크기가 올바르지 않습니다: {width}x{height}')
+    expected = width * height * channels
+    if len(data) != expected:
+        raise ValueError(f'프레임 크기가 맞지 않습니다: {len(data)} bytes (예상 {expected} bytes)')
+    return np.frombuffer(data, dtype=np.uint8).reshape(height, width, channels)
+
+
+class VerificationService:
+    def __init__(self, batching=SERVICE_BATCHING, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS):
+        """
+        VerificationService 클래스 생성자 (모델 로드는 warm_up()에서 수행)
+
+        :param batching: 동시 요청의 벡터 추출과 판별을 모아서 처리할지 여부 (bool)
+        :param max_batch_size: 한 번에 처리할 최대 얼굴 수 (int)
+        :param max_wait_ms: 첫 요청 후 다른 요청을 기다리는 최대 시간 (ms)
+        """
+        self.batcher = None
+        if batching:
+            from service.micro_batcher import MicroBatcher
+            self.batcher = MicroBatcher(self.process_batch, max_batch_size, max_wait_ms)
+        self.gallery = None
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+
+    def warm_up(self):
+        """
+        face_recognition(dlib 모델), Gallery, 등록된 모든 사용자의 가중치를 미리 로드
+        첫 요청도 이후 요청과 같은 속도로 처리되도록 빈 이미지로 검출을 한 번 실행
+        """
+        import face_recognition
+        from models.gallery import Gallery
+        from models.numpy_inference import load_verifier
+
+        start = time.perf_counter()
+        gallery = Gallery.load()
+        for user_name in gallery.user_slices:
+            try:
+                load_verifier(user_name)
+            except Exception as e:
+                print(f'{user_name}님의 모델을 로드하지 못했습니다: {e}')
+        face_recognition.face_locations(np.zeros((64, 64, 3), dtype=np.uint8))
+
+        with self.lock:
+            self.gallery = gallery
+        print(f'인식 서비스 준비 완료: 사용자 {len(gallery.user_slices)}명, '
+              f'벡터 {len(gallery)}개 ({time.perf_counter() - start:.2f}초)')
+
+    def reload(self):
+        """
+        등록 사용자가 바뀐 경우 Gallery와 가중치를 다시 로드
+        """
+        from models.numpy_inference import _weights_cache
+        from models.prototype import _prototype_cache
+        from models.shared_model import _shared_cache
+
+        _weights_cache.clear()
+        _prototype_cache.clear()
+        _shared_cache.clear()
+        self.warm_up()
+
+    def verify(self, image, user_name=None):
+        """
+        이미지 한 장에서 얼굴을 찾아 사용자 판별
+
+        :param image: OpenCV BGR 프레임
+        :param user_name: 확인할 사용자 이름 (None이면 등록된 모든 사용자 중에서 식별)
+        :return: {'identity', 'score', 'decision', 'faces', 'elapsed_ms'} dict
+        :raises FileNotFoundError: 등록되지 않은 사용자 이름인 경우
+        """
+        from models.numpy_inference import THRESHOLD
+        from utils.preprocessing_of_captured import preprocess_and_detect
+
+        gallery = self.gallery
+        if user_name is not None and gallery is not None and user_name not in gallery.user_slices:
+            raise FileNotFoundError(f'등록되지 않은 사용자입니다: {user_name}')
+
+        start = time.perf_counter()
+        with metrics.stage("request"):
+            equalized_image, face_locations = preprocess_and_detect(image)
+            if not face_locations:
+                identity, score = None, 0.0
+            elif self.batcher is not None:
+                identity, score = self.batcher((equalized_image, face_locations[0], user_name))
+            else:
+                identity, score = self.process_batch([(equalized_image, face_locations[0], user_name)])[0]
+
+        decision = identity is not None and score > THRESHOLD
+        metrics.increment("accepted" if decision else "rejected")
+        with self.lock:
+            self.requests += 1
+
+        return {
+            'identity': identity,
+            'score': score,
+            'decision': int(decision),
+            'faces': len(face_locations),
+            'elapsed_ms': (time.perf_counter() - start) * 1000,
+        }
+
+    def process_batch(self, items):
+        """
+        여러 요청의 얼굴 벡터 추출과 판별을 한 번에 수행
+
+        :param items: [(균등화된 이미지, 얼굴 좌표, 확인할 사용자 이름), ...] 리스트
+        :return: 요청 별 (사용자 이름 또는 None, 점수) 튜플 리스트
+        """
+        from utils.live_recognition import score_faces
+        from utils.preprocessing_of_captured import encode_faces_batch
+
+        images = [image for image, _, _ in items]
+        encodings = encode_faces_batch(images, [[location] for _, location, _ in items])
+        with metrics.stage("classification"):
+            return score_faces(np.array([vectors[0] for vectors in encodings]),
+                               [user_name for _, _, user_name in items], self.gallery)
+
+    def health(self):
+        """
+        서비스 상태
+
+        :return: dict
+        """
+        gallery = self.gallery
+        health = {
+            'ready': gallery is not None,
+            'users': len(gallery.user_slices) if gallery is not None else 0,
+            'vectors': len(gallery) if gallery is not None else 0,
+            'requests': self.requests,
+            'uptime_seconds': time.time() - self.started,
+        }
+        if self.batcher is not None:
+            health['batcher'] = self.batcher.stats()
+        return health
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 프로젝트 루트에서 python -m pytest 로 실행하지 않아도 모듈을 찾을 수 있도록 루트 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from models.ann_index import IVFIndex, build_from_store
+from utils.embedding_store import EmbeddingStore
+from benchmarks.quantization_report import make_synthetic_gallery
+
+
+def exact_search(queries, vectors, k):
+    distances = np.linalg.norm(queries[:, None, :].astype(np.float64) - vectors[None, :, :], axis=2)
+    ids = np.argsort(distances, axis=1, kind='stable')[:, :k]
+    return np.take_along_axis(distances, ids, axis=1), ids
+
+
+@pytest.fixture
+def gallery():
+    vectors, labels = make_synthetic_gallery(users=50, per_user=8, spread=0.05, seed=3)
+    queries = vectors[::8] + np.random.default_rng(4).normal(scale=0.05, size=(50, 128))
+    return vectors.astype(np.float32), labels, queries.astype(np.float32)
+
+
+def test_full_probe_equals_exact_search(gallery):
+    vectors, labels, queries = gallery
+    index = IVFIndex.train(vectors, nlist=16, nprobe=2)
+    index.add(vectors, np.arange(len(vectors)), labels)
+
+    distances, ids = index.search(queries, k=5, nprobe=index.nlist)
+    exact_distances, exact_ids = exact_search(queries, vectors, 5)
+    np.testing.assert_array_equal(ids, exact_ids)
+    np.testing.assert_allclose(distances, exact_distances, atol=1e-4)
+
+
+def test_recall_increases_with_nprobe(gallery):
+    vectors, labels, queries = gallery
+    index = IVFIndex.train(vectors, nlist=16)
+    index.add(vectors, np.arange(len(vectors)), labels)
+    _, exact_ids = exact_search(queries, vectors, 1)
+
+    recalls = [np.mean(index.search(queries, k=1, nprobe=nprobe)[1][:, 0] == exact_ids[:, 0])
+               for nprobe in (1, 4, 16)]
+    assert recalls == sorted(recalls)
+    assert recalls[-1] == 1.0
+    # 사용자 별로 모인 벡터는 가까운 몇 개 묶음만 비교해도 대부분 찾음
+    assert recalls[1] >= 0.9
+
+    # 찾은 가장 가까운 벡터의 사용자가 입력 벡터의 사용자
+    identities = [candidates[0][0] for candidates in index.identify_batch(queries, k=1)]
+    assert identities == list(labels[::8])
+
+
+def test_fewer_candidates_than_k_are_padded():
+    index = IVFIndex.train(np.eye(4, 128, dtype=np.float32), nlist=2)
+    index.add(np.eye(2, 128, dtype=np.float32), [0, 1])
+    distances, ids = index.search(np.zeros(128), k=3, nprobe=2)
+    assert ids[0].tolist()[:2] == [0, 1] and ids[0, 2] == -1
+    assert np.isinf(distances[0, 2])
+
+
+def test_update_from_store_adds_and_removes(gallery, tmp_path):
+    vectors, labels, queries = gallery
+    store = EmbeddingStore(str(tmp_path / 'embeddings.bin'))
+    for user in np.unique(labels)[:25]:
+        store.append(user, vectors[labels == user])
+
+    index = build_from_store(store, nlist=8, nprobe=8)
+    assert len(index) == 200 and index.source_version == [0, 200, 0]
+    assert index.update_from_store(store) == (0, 0)
+
+    # 새 사용자 추가와 기존 사용자 삭제를 색인에 반영
+    for user in np.unique(labels)[25:]:
+        store.append(user, vectors[labels == user])
+    store.mark_deleted(np.arange(8))
+    assert index.update_from_store(store) == (200, 8)
+    assert len(index) == 392 and index.source_version == [0, 400, 8]
+
+    # 전체 묶음 검색은 삭제되지 않은 레코드 전체 검색과 같음
+    live = np.arange(8, 400)
+    _, ids = index.search(queries, k=3, nprobe=index.nlist)
+    _, exact_ids = exact_search(queries, store.records()['vector'][live], 3)
+    np.testing.assert_array_equal(ids, live[exact_ids])
+    assert 'user00000' not in {name for candidates in index.identify_batch(queries, k=3) for name, _ in candidates}
+
+    # 저장 후 로드한 색인에도 이어서 추가
+    index.save(str(tmp_path / 'index'))
+    loaded = IVFIndex.load(str(tmp_path / 'index'))
+    store.append('late', vectors[:2] + 1)
+    assert loaded.update_from_store(store) == (2, 0)
+    assert len(loaded) == 394
+
+    # 다시 쓴 저장소는 레코드 위치가 바뀌므로 갱신하지 않음
+    store.rewrite()
+    with pytest.raises(ValueError):
+        loaded.update_from_store(store)
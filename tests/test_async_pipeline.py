@@ -0,0 +1,56 @@
+import sys
+import types
+import asyncio
+import numpy as np
+import pytest
+import utils.preprocessing_of_captured as preprocessing
+from utils.async_pipeline import DoorLockPipeline
+
+
+@pytest.fixture(autouse=True)
+def fake_face_recognition(monkeypatch):
+    # encode 단계는 시작 시 face_recognition을 import 하므로 설치되지 않은 환경에서도 실행되도록 대체
+    monkeypatch.setitem(sys.modules, 'face_recognition', types.ModuleType('face_recognition'))
+
+
+async def frames(count):
+    for _ in range(count):
+        yield np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+async def missing_video():
+    raise FileNotFoundError('동영상을 열 수 없습니다: missing.mp4')
+    yield
+
+
+async def collect(pipeline, timeout=5):
+    async def run():
+        return [decision async for decision in pipeline.decisions()]
+    return await asyncio.wait_for(run(), timeout)
+
+
+def test_source_error_reaches_consumer():
+    pipeline = DoorLockPipeline(missing_video(), user_name='wooseong', save_captures=False)
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(collect(pipeline))
+
+
+def test_detect_error_does_not_hang_blocked_capture(monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError('검출 실패')
+
+    monkeypatch.setattr(preprocessing, 'preprocess_and_detect', fail)
+    # 큐가 작아 capture 단계는 가득 찬 큐에서 기다리는 상태
+    pipeline = DoorLockPipeline(frames(50), user_name='wooseong', queue_size=1, save_captures=False)
+    with pytest.raises(RuntimeError):
+        asyncio.run(collect(pipeline))
+
+
+def test_frames_without_faces_finish_normally(monkeypatch):
+    monkeypatch.setattr(preprocessing, 'preprocess_and_detect', lambda frame, **kwargs: (frame, []))
+    pipeline = DoorLockPipeline(frames(5), user_name='wooseong', queue_size=2, save_captures=False)
+    decisions = asyncio.run(collect(pipeline))
+
+    assert [d.frame_index for d in decisions] == list(range(5))
+    assert all(d.identity is None and d.unlock is None for d in decisions)
+    assert pipeline.stats()['processed']['decision'] == 5
@@ -0,0 +1,87 @@
+import os
+import zlib
+import pytest
+from utils.capture_archive import CaptureArchive, RECORD_HEADER, RECORD_MAGIC, INDEX_DTYPE
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return CaptureArchive(str(tmp_path), segment_bytes=1 << 20, retention_bytes=None, retention_days=None,
+                          fsync=False)
+
+
+def record_bytes(data, timestamp, decision=-1, identity=b''):
+    return RECORD_HEADER.pack(RECORD_MAGIC, timestamp, decision, identity, len(data), zlib.crc32(data)) + data
+
+
+def test_append_query_read_round_trip(archive):
+    for i in range(5):
+        archive.append(f'image-{i}'.encode(), timestamp=100.0 + i, decision=i % 2, identity='alice')
+
+    entries = archive.query(101.0, 104.0)
+    assert [float(entry['timestamp']) for _, entry in entries] == [101.0, 102.0, 103.0]
+    assert [archive.read(number, entry) for number, entry in entries] == [b'image-1', b'image-2', b'image-3']
+    assert all(entry['identity'] == b'alice' for _, entry in entries)
+    assert [float(entry['timestamp']) for _, entry in archive.query(decision=1)] == [101.0, 103.0]
+
+    # 다시 열어도 같은 색인
+    reopened = CaptureArchive(archive.path, retention_bytes=None, retention_days=None, fsync=False)
+    assert len(reopened.query()) == 5
+
+
+def test_truncated_tail_is_recovered(archive):
+    archive.append(b'first', timestamp=1.0)
+    archive.append(b'second', timestamp=2.0)
+    number = archive.segments[-1]
+
+    # 레코드는 기록되었지만 색인을 추가하기 전에 중단된 경우 + 불완전한 다음 레코드와 색인 항목
+    with open(archive.segment_path(number), 'ab') as f:
+        f.write(record_bytes(b'third', 3.0))
+        f.write(record_bytes(b'fourth', 4.0)[:-2])
+    with open(archive.index_path(number), 'ab') as f:
+        f.write(b'\0' * (INDEX_DTYPE.itemsize // 2))
+
+    recovered = CaptureArchive(archive.path, retention_bytes=None, retention_days=None, fsync=False)
+    entries = recovered.query()
+    assert [recovered.read(n, entry) for n, entry in entries] == [b'first', b'second', b'third']
+    assert os.path.getsize(recovered.index_path(number)) == 3 * INDEX_DTYPE.itemsize
+
+    # 잘라낸 위치 뒤에 이어서 기록
+    recovered.append(b'fifth', timestamp=5.0)
+    assert [recovered.read(n, entry) for n, entry in recovered.query(4.0)] == [b'fifth']
+
+
+def test_corrupted_record_fails_crc(archive):
+    number, _ = archive.append(b'image', timestamp=1.0)
+    entry = archive.query()[0][1]
+    with open(archive.segment_path(number), 'r+b') as f:
+        f.seek(int(entry['offset']) + RECORD_HEADER.size)
+        f.write(b'X')
+    with pytest.raises(ValueError):
+        archive.read(number, entry)
+
+
+def test_long_identity_is_cut_on_character_boundary(archive):
+    archive.append(b'image', timestamp=1.0, identity='가' * 20)
+    identity = archive.query()[0][1]['identity']
+    assert identity.decode('utf-8') == '가' * 10
+
+
+def test_concurrent_writers_share_one_segment(archive):
+    import threading
+
+    # 여러 스레드가 동시에 기록해도 시각 순서가 유지되어 새 세그먼트를 만들지 않음
+    def run():
+        for _ in range(25):
+            archive.append(b'x' * 1000)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert archive.segments == [1]
+    timestamps = [float(entry['timestamp']) for _, entry in archive.query()]
+    assert len(timestamps) == 100
+    assert timestamps == sorted(timestamps)
@@ -0,0 +1,129 @@
+import os
+import numpy as np
+import pytest
+from utils.embedding_store import EmbeddingStore, RECORD_DTYPE, HEADER_SIZE, stored_source
+
+
+def vectors(count, value):
+    return np.full((count, 128), value, dtype=np.float32)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EmbeddingStore(str(tmp_path / 'embeddings.bin'))
+
+
+def test_append_delete_rewrite_round_trip(store):
+    assert store.append('alice', vectors(3, 1.0), ['a0', 'a1', 'a2'], timestamp=1.0) == 3
+    assert store.append('bob', vectors(2, 2.0), ['b0', 'b1'], timestamp=2.0) == 2
+    assert store.users() == ['alice', 'bob']
+    assert store.version() == [0, 5, 0]
+
+    # 이미 삭제된 레코드와 중복된 위치는 세지 않음
+    assert store.mark_deleted([0, 1]) == 2
+    assert store.mark_deleted([1, 1, 2]) == 1
+    assert store.mark_deleted([0]) == 0
+    assert store.version() == [0, 5, 3]
+    assert store.users() == ['bob']
+
+    assert store.rewrite() == 3
+    assert store.version() == [1, 2, 0]
+    records = store.records()
+    assert list(records['source']) == [b'b0', b'b1']
+    assert list(records['timestamp']) == [2.0, 2.0]
+    np.testing.assert_array_equal(store.user_vectors('bob'), vectors(2, 2.0))
+    assert len(store.user_vectors('alice')) == 0
+
+
+def test_truncated_tail_is_ignored_and_replaced(store):
+    store.append('alice', vectors(2, 1.0))
+    # 기록 중 중단되어 레코드 일부만 남은 경우
+    with open(store.path, 'ab') as f:
+        f.write(b'\1' * (RECORD_DTYPE.itemsize // 2))
+
+    assert store.count() == 2
+    np.testing.assert_array_equal(store.user_vectors('alice'), vectors(2, 1.0))
+
+    store.append('alice', vectors(1, 3.0))
+    assert os.path.getsize(store.path) == HEADER_SIZE + 3 * RECORD_DTYPE.itemsize
+    np.testing.assert_array_equal(store.user_vectors('alice')[2], vectors(1, 3.0)[0])
+
+
+def test_long_user_name_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.append('가' * 11, vectors(1, 1.0))
+    assert store.count() == 0
+    store.append('가' * 10, vectors(1, 1.0))
+    assert store.users() == ['가' * 10]
+
+
+def test_long_source_is_shortened_with_hash(store):
+    base = 'data/user_faces/' + '얼굴' * 40
+    sources = [base + '/01.jpg', base + '/02.jpg']
+    store.append('alice', vectors(2, 1.0), sources)
+
+    stored = [source.decode('utf-8') for source in store.records()['source']]
+    assert stored == [stored_source(s) for s in sources]
+    assert stored[0] != stored[1]
+    assert all(len(s.encode('utf-8')) <= RECORD_DTYPE['source'].itemsize for s in stored)
+    assert stored_source('short.jpg') == 'short.jpg'
+
+
+def test_manifest_sync_keeps_long_paths(store, tmp_path):
+    from utils.enrollment_manifest import EnrollmentManifest
+
+    manifest = EnrollmentManifest('test_long_path_user', path=str(tmp_path / 'manifest.json'))
+    path = 'data/user_faces/' + 'a' * 200 + '.jpg'
+    manifest.images[path] = {'size': 1, 'mtime': 1.0, 'sha256': '', 'encoding': [0.5] * 128}
+    manifest.changed.add(path)
+    assert manifest.sync_store(store) == (1, 0)
+
+    # 바뀐 이미지가 없으면 줄여서 기록된 경로의 레코드를 다시 추가하거나 삭제하지 않음
+    assert manifest.sync_store(store) == (0, 0)
+    assert store.count() == 1
+
+
+def test_vector_digest_is_reused_until_store_changes(store, monkeypatch):
+    from utils.vector_checking import get_vector_digest
+
+    store.append('alice', vectors(2, 1.0))
+    scans = []
+    user_vectors = store.user_vectors
+    monkeypatch.setattr(store, 'user_vectors', lambda name: scans.append(name) or user_vectors(name))
+
+    digest = get_vector_digest('alice', store)
+    assert get_vector_digest('alice', store) == digest
+    assert len(scans) == 1
+
+    # 다른 사용자의 추가도 저장소 버전을 바꾸므로 다시 계산 (내용이 같으면 해시도 같음)
+    store.append('bob', vectors(1, 2.0))
+    assert get_vector_digest('alice', store) == digest
+    assert len(scans) == 2
+
+    store.mark_deleted([0])
+    assert get_vector_digest('alice', store) != digest
+    assert len(scans) == 3
+
+
+def test_concurrent_appends_keep_every_record(store):
+    import threading
+
+    # 같은 파일을 연 서로 다른 EmbeddingStore 객체 (별도 프로세스와 같이 파일 잠금으로만 순서를 맞춤)
+    def run(i):
+        writer = EmbeddingStore(store.path)
+        for j in range(20):
+            writer.append(f'user{i}', vectors(3, i + j / 100), [f'{i}-{j}'] * 3)
+
+    threads = [threading.Thread(target=run, args=(i, )) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.count() == 4 * 20 * 3
+    assert store.users() == ['user0', 'user1', 'user2', 'user3']
+    records = store.records()
+    for record in records:
+        i, j = (int(v) for v in record['source'].decode().split('-'))
+        assert record['user'] == f'user{i}'.encode()
+        np.testing.assert_allclose(record['vector'], i + j / 100, rtol=1e-6)
@@ -0,0 +1,72 @@
+import numpy as np
+import cv2 as cv
+from utils.encoding_cache import EncodingCache, face_hash
+from utils.live_recognition import TemporalVoter
+
+
+def make_face(shift=0, angle=0.0):
+    # 두 눈(어두운 원)과 입이 있는 합성 얼굴 (shift만큼 이동, angle만큼 회전)
+    image = np.full((200, 200, 3), 200, dtype=np.uint8)
+    cv.ellipse(image, (100, 100), (50, 65), 0, 0, 360, (150, 150, 150), -1)
+    cv.circle(image, (80, 85), 8, (30, 30, 30), -1)
+    cv.circle(image, (120, 85), 8, (30, 30, 30), -1)
+    cv.line(image, (85, 130), (115, 135), (60, 60, 60), 3)
+    matrix = cv.getRotationMatrix2D((100, 100), angle, 1.0)
+    matrix[0, 2] += shift
+    image = cv.warpAffine(image, matrix, (200, 200), borderMode=cv.BORDER_REPLICATE)
+
+    eyes = np.array([[80, 85, 1], [120, 85, 1]], dtype=np.float64) @ matrix.T
+    landmarks = {'right_eye': [tuple(eyes[0])] * 2, 'left_eye': [tuple(eyes[1])] * 2}
+    return image, landmarks
+
+
+def counting_compute(counter):
+    def compute():
+        counter.append(1)
+        return np.full(128, len(counter), dtype=np.float64)
+    return compute
+
+
+def test_aligned_hash_ignores_small_rotation():
+    image, landmarks = make_face()
+    rotated, rotated_landmarks = make_face(angle=12)
+    box = (30, 160, 170, 40)
+    assert bin(face_hash(image, box) ^ face_hash(rotated, box)).count('1') > 4
+    assert face_hash(image, box, landmarks) == face_hash(rotated, box, rotated_landmarks)
+
+
+def test_hit_requires_box_overlap():
+    cache = EncodingCache(max_distance=4, min_iou=0.5, enabled=True)
+    calls = []
+    image, landmarks = make_face()
+    moved, moved_landmarks = make_face(shift=60)
+
+    cache.get_or_compute(image, (30, 160, 170, 40), counting_compute(calls), landmarks)
+    cache.get_or_compute(image, (32, 162, 172, 42), counting_compute(calls), landmarks)
+    assert cache.last_hit and len(calls) == 1
+
+    # 정렬한 얼굴이 같아도 다른 위치의 얼굴은 새로 추출
+    cache.get_or_compute(moved, (30, 220, 170, 100), counting_compute(calls), moved_landmarks)
+    assert not cache.last_hit and len(calls) == 2
+
+
+def test_empty_box_is_computed_without_caching():
+    cache = EncodingCache(enabled=True)
+    calls = []
+    image, landmarks = make_face()
+    for box in [(50, 50, 50, 50), (250, 300, 260, 210), (10, 5, 20, 8)]:
+        cache.get_or_compute(image, box, counting_compute(calls), landmarks)
+        assert not cache.last_hit
+    assert len(calls) == 3
+    assert len(cache.entries) == 0
+    assert face_hash(image, (50, 50, 50, 50)) is None
+
+
+def test_cached_results_are_not_votes():
+    voter = TemporalVoter(window=5, min_votes=3, threshold=0.9)
+    assert voter.add('alice', 0.95) is None
+    # 같은 벡터의 반복 결과는 투표 수에 포함되지 않음
+    for _ in range(5):
+        assert voter.add('alice', 0.95, fresh=False) is None
+    voter.add('alice', 0.95)
+    assert voter.add('alice', 0.95) == 'alice'
@@ -0,0 +1,57 @@
+import sys
+import types
+import numpy as np
+import pytest
+from utils.face_tracking import TrackingDetector
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    # 입력 이미지 크기를 기록하고 이미지 가운데의 얼굴 하나를 반환하는 face_recognition 대역
+    calls = []
+
+    def face_locations(img, model="hog"):
+        height, width = img.shape[:2]
+        calls.append((height, width))
+        return [(height // 4, width * 3 // 4, height * 3 // 4, width // 4)]
+
+    module = types.ModuleType('face_recognition')
+    module.face_locations = face_locations
+    monkeypatch.setitem(sys.modules, 'face_recognition', module)
+    return calls
+
+
+def test_roi_uses_full_frame_scale(calls):
+    detector = TrackingDetector(redetect_every=10, margin=0.5, scale=None, target_width=480)
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+
+    full = detector.detect(frame)
+    assert calls[0] == (270, 480)
+    assert full == [(268, 1440, 808, 480)]
+
+    roi = detector.detect(frame)
+    assert detector.roi_hits == 1
+    # ROI도 0.25배로 축소해 검출
+    roi_top, roi_right, roi_bottom, roi_left = detector.expand_box(full[0], 1080, 1920)
+    assert calls[1] == (int((roi_bottom - roi_top) * 0.25), int((roi_right - roi_left) * 0.25))
+
+    # 전체 프레임 좌표로 변환된 ROI 결과는 ROI 가운데에 위치
+    top, right, bottom, left = roi[0]
+    assert abs((top + bottom) / 2 - (roi_top + roi_bottom) / 2) <= 4
+    assert abs((left + right) / 2 - (roi_left + roi_right) / 2) <= 4
+    assert roi_left <= left < right <= roi_right
+
+
+def test_small_frame_is_not_upscaled(calls):
+    detector = TrackingDetector(scale=None, target_width=640)
+    assert detector.detection_scale(320) == 1.0
+    assert TrackingDetector(scale=0.5).detection_scale(1920) == 0.5
+
+
+def test_zero_redetect_interval_never_forces_full_detection(calls):
+    detector = TrackingDetector(redetect_every=0, scale=None, target_width=480)
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    for _ in range(25):
+        detector.detect(frame)
+    assert detector.full_calls == 1
+    assert detector.roi_calls == 24
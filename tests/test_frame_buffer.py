@@ -0,0 +1,49 @@
+import threading
+import numpy as np
+from utils.frame_buffer import LatestFrameBuffer, CaptureThread
+
+
+class StalledCamera:
+    # read()가 unblock 될 때까지 멈춰 있는 카메라 대역
+    def __init__(self):
+        self.unblock = threading.Event()
+        self.reading = threading.Event()
+        self.released = False
+        self.read_after_release = False
+
+    def read(self):
+        if self.released:
+            self.read_after_release = True
+        self.reading.set()
+        self.unblock.wait()
+        return True, np.zeros((2, 2, 3), dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+def test_camera_is_released_after_stalled_read_returns():
+    camera = StalledCamera()
+    buffer = LatestFrameBuffer()
+    thread = CaptureThread(camera, buffer)
+    thread.start()
+    camera.reading.wait(5)
+
+    # read()가 멈춰 있으면 종료를 기다리다 포기하고, 카메라는 아직 해제하지 않음
+    assert thread.stop(timeout=0.05) is False
+    assert not camera.released
+
+    camera.unblock.set()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert camera.released and not camera.read_after_release
+    assert buffer.peek() is not None
+
+
+def test_stop_returns_true_when_thread_exits():
+    camera = StalledCamera()
+    camera.unblock.set()
+    thread = CaptureThread(camera, LatestFrameBuffer())
+    thread.start()
+    assert thread.stop(timeout=5) is True
+    assert camera.released
@@ -0,0 +1,62 @@
+import os
+import numpy as np
+from models.gallery import Gallery
+from utils.embedding_store import EmbeddingStore
+from benchmarks.quantization_report import make_synthetic_gallery
+
+
+def brute_force(vectors, labels, query, k):
+    # 사용자 별 최소 거리를 float64로 직접 계산한 기준 결과
+    distances = np.linalg.norm(np.asarray(vectors, dtype=np.float64) - query, axis=1)
+    best = {}
+    for label, distance in zip(labels, distances):
+        best[label] = min(best.get(label, np.inf), distance)
+    return sorted(best.items(), key=lambda item: item[1])[:k]
+
+
+def test_identify_batch_matches_brute_force():
+    vectors, labels = make_synthetic_gallery(20, 5, seed=1)
+    # 사용자마다 벡터 수가 다르도록 일부 제거 (reduceat 구간 길이가 다른 경우)
+    keep = np.ones(len(labels), dtype=bool)
+    keep[[0, 1, 2, 11, 57]] = False
+    vectors, labels = vectors[keep], labels[keep]
+    gallery = Gallery(vectors, labels, "float32")
+
+    queries = make_synthetic_gallery(20, 1, seed=1)[0] + 0.01
+    for query, result in zip(queries, gallery.identify_batch(queries, k=3)):
+        expected = brute_force(vectors, labels, query, 3)
+        assert [name for name, _ in result] == [name for name, _ in expected]
+        np.testing.assert_allclose([d for _, d in result], [d for _, d in expected], atol=1e-4)
+
+    # 후보 수가 사용자 수보다 많으면 모든 사용자
+    assert len(gallery.identify(queries[0], k=50)) == 20
+
+
+def test_user_slices_and_verify():
+    vectors, labels = make_synthetic_gallery(3, 4, seed=2)
+    gallery = Gallery(vectors, labels, "float32")
+    assert {name: (rows.start, rows.stop) for name, rows in gallery.user_slices.items()} == \
+        {'user00000': (0, 4), 'user00001': (4, 8), 'user00002': (8, 12)}
+    assert gallery.verify('user00001', vectors[5]) == 1
+    assert gallery.verify('nobody', vectors[5]) == 0
+
+
+def test_empty_gallery_returns_no_candidates():
+    gallery = Gallery(np.zeros((0, 128), dtype=np.float32), np.zeros(0, dtype=str), "float32")
+    assert gallery.identify_batch(np.zeros((2, 128)), k=1) == [[], []]
+
+
+def test_load_includes_users_only_in_npy_files(tmp_path):
+    vectors, labels = make_synthetic_gallery(3, 4, seed=3)
+    store = EmbeddingStore(os.path.join(str(tmp_path), 'embeddings.store'))
+    store.append('user00001', vectors[4:8])
+    store.append('user00002', vectors[8:12])
+    # user00000은 기존 .npy 파일에만 있고, user00001의 .npy 파일은 저장소 벡터가 우선
+    np.save(os.path.join(str(tmp_path), 'vector_data_user00000.npy'), vectors[:4])
+    np.save(os.path.join(str(tmp_path), 'vector_data_user00001.npy'), vectors[:2])
+
+    gallery = Gallery.load(str(tmp_path), "float32")
+    assert list(gallery.user_slices) == ['user00000', 'user00001', 'user00002']
+    assert len(gallery) == 12
+    np.testing.assert_allclose(gallery.vectors[gallery.user_slices['user00000']], vectors[:4], atol=1e-6)
+    assert gallery.identify(vectors[1])[0][0] == 'user00000'
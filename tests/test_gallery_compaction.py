@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+import utils.gallery_compaction as gallery_compaction
+from utils.gallery_compaction import compact_vectors, compact_user, load_compaction, SOURCE_PREFIX
+from utils.embedding_store import EmbeddingStore
+from models.ann_index import kmeans
+from benchmarks.quantization_report import make_synthetic_gallery
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(gallery_compaction, 'get_compaction_path',
+                        lambda user_name: str(tmp_path / f'compaction_{user_name}.json'))
+    return EmbeddingStore(str(tmp_path / 'embeddings.bin'))
+
+
+def test_counts_sum_to_input_vectors():
+    vectors, _ = make_synthetic_gallery(users=6, per_user=10, spread=0.02, seed=8)
+    medoids, counts, means, maxes = compact_vectors(vectors, k=6)
+    assert len(np.unique(medoids)) == len(medoids) <= 6
+    assert counts.sum() == len(vectors)
+    assert (means <= maxes + 1e-9).all()
+
+    # 대표 벡터가 이미 여러 벡터를 대표하면 그 수만큼 셈
+    weights = np.arange(1, len(vectors) + 1)
+    _, weighted_counts, _, _ = compact_vectors(vectors, k=6, weights=weights)
+    assert weighted_counts.sum() == weights.sum()
+
+
+def test_weighted_kmeans_counts_represented_vectors():
+    # 가중치 3인 벡터는 같은 벡터 세 개와 같은 중심을 만듦
+    vectors = np.zeros((2, 128), dtype=np.float32)
+    vectors[:, -1] = [1.0, 3.0]
+    centroids, _ = kmeans(vectors, 1, weights=[1, 3])
+    assert centroids[0, -1] == pytest.approx(2.5)
+
+
+def test_previous_distances_are_added_to_statistics():
+    vectors = np.zeros((2, 128), dtype=np.float32)
+    vectors[1, 0] = 0.1
+    _, counts, means, maxes = compact_vectors(vectors, k=1, weights=[3, 1],
+                                              mean_distances=[0.2, 0.0], max_distances=[0.3, 0.0])
+    assert counts.tolist() == [4]
+    # medoid는 가중 중심(0.025)에 가까운 첫 벡터 : 평균 (3 * 0.2 + 1 * 0.1) / 4, 최대 max(0.3, 0.1)
+    assert means[0] == pytest.approx(0.175, rel=1e-5)
+    assert maxes[0] == pytest.approx(0.3)
+
+
+def test_incremental_compaction_keeps_counts(store):
+    vectors, _ = make_synthetic_gallery(users=1, per_user=50, spread=0.05, seed=9)
+    store.append('alice', vectors[:40], [f'a{i}.jpg' for i in range(40)], timestamp=1.0)
+    store.append('bob', vectors[:2], ['b0.jpg', 'b1.jpg'], timestamp=1.0)
+
+    assert compact_user('alice', store, k=4, timestamp=2.0) == (40, 4)
+    compaction = load_compaction('alice')
+    assert sum(r['count'] for r in compaction['representatives'].values()) == 40
+    assert len(compaction['absorbed']) == 40
+    assert all(source.startswith(SOURCE_PREFIX) for source in compaction['representatives'])
+    assert len(store.user_vectors('alice')) == 4 and len(store.user_vectors('bob')) == 2
+
+    # k개 이하인 사용자는 그대로 두고, 새 벡터가 추가되어 k개를 넘으면 대표 벡터를 가중치로 다시 압축
+    assert compact_user('alice', store, k=4, timestamp=3.0) == (4, 4)
+    store.append('alice', vectors[40:], [f'a{i}.jpg' for i in range(40, 50)], timestamp=4.0)
+    assert compact_user('alice', store, k=4, timestamp=5.0) == (14, 4)
+    compaction = load_compaction('alice')
+    assert sum(r['count'] for r in compaction['representatives'].values()) == 50
+    assert compaction['absorbed'] == sorted(f'a{i}.jpg' for i in range(50))
@@ -0,0 +1,116 @@
+import sys
+import types
+import numpy as np
+import pytest
+import utils.encoding_cache as encoding_cache
+import utils.live_recognition as live_recognition
+import utils.preprocessing_of_captured as preprocessing
+from utils.live_recognition import LiveRecognizer
+from utils.face_tracking import TrackingDetector
+from utils.encoding_cache import EncodingCache
+from tests.test_encoding_cache import make_face
+
+
+@pytest.fixture
+def recognizer(monkeypatch):
+    # 얼굴 하나를 찾고 항상 alice로 인식하는 대역 (검출기, 캐시, 전처리기는 통계에만 사용)
+    monkeypatch.setattr(preprocessing, 'preprocess_image_and_extract_vector',
+                        lambda frame, cache_fresh=None, **kwargs: [np.zeros(128)])
+    monkeypatch.setattr(live_recognition, 'score_face', lambda vector, user_name, gallery: ('alice', 0.95))
+    recognizer = LiveRecognizer('alice', interval=0.0, window=5, min_votes=3)
+    recognizer.detector = TrackingDetector()
+    recognizer.encoding_cache = EncodingCache(enabled=False)
+    recognizer.preprocessor = object()
+    return recognizer
+
+
+def test_status_text_reads_decision_consistently(recognizer):
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    for _ in range(2):
+        recognizer._process(frame)
+    stats = recognizer.stats()
+    assert stats['decision'] is None and stats['time_to_decision'] is None
+    assert '열림' not in recognizer.status_text()
+
+    recognizer._process(frame)
+    stats = recognizer.stats()
+    assert stats['decision'] == 'alice'
+    assert stats['time_to_decision'] is not None
+    assert stats['last_result'] == ('alice', 0.95)
+    assert 'alice 열림' in recognizer.status_text()
+
+
+class FakeClock:
+    # 캐시와 인식기가 함께 사용하는 시계 (advance()로만 시간이 흐름)
+    def __init__(self):
+        self.now = 1000.0
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+
+class FixedDetector:
+    # 항상 같은 위치의 얼굴 하나를 반환하는 검출기 대역
+    def detect(self, image):
+        return [(30, 160, 170, 40)]
+
+    def stats(self):
+        return {}
+
+
+@pytest.fixture
+def live_cache(monkeypatch):
+    # 가만히 서 있는 사람: 같은 프레임이 interval마다 들어오고 벡터 추출은 캐시를 거침
+    clock = FakeClock()
+    monkeypatch.setattr(encoding_cache, 'time', clock)
+    monkeypatch.setattr(live_recognition, 'time', clock)
+
+    frame, landmarks = make_face()
+    encodings = []
+    fake = types.ModuleType('face_recognition')
+    fake.face_landmarks = lambda image, boxes, model='small': [landmarks]
+
+    def face_encodings(image, boxes):
+        encodings.append(1)
+        return [np.zeros(128)]
+
+    fake.face_encodings = face_encodings
+    monkeypatch.setitem(sys.modules, 'face_recognition', fake)
+    monkeypatch.setattr(live_recognition, 'score_face', lambda vector, user_name, gallery: ('alice', 0.95))
+
+    def run(interval, frames, vote_age):
+        recognizer = LiveRecognizer('alice', interval=interval, window=5, min_votes=3)
+        recognizer.detector = FixedDetector()
+        recognizer.encoding_cache = EncodingCache(ttl=2.0, vote_age=vote_age, enabled=True)
+        for _ in range(frames):
+            clock.advance(interval)
+            recognizer._process(frame)
+            if recognizer.stats()['decision'] is not None:
+                break
+        return recognizer.stats(), len(encodings)
+
+    return run
+
+
+def test_cache_hits_on_recent_encodings_vote(live_cache):
+    # 첫 프레임만 벡터를 추출하고 이후 적중도 투표에 포함되어 세 번째 프레임(0.6초)에 결정
+    stats, encodings = live_cache(interval=0.2, frames=10, vote_age=1.0)
+    assert stats['decision'] == 'alice'
+    assert stats['time_to_decision'] == pytest.approx(0.6)
+    assert stats['frames_processed'] == 3
+    assert encodings == 1
+    assert stats['encoding_cache']['hits'] == 2
+
+
+def test_cache_hits_on_old_encodings_do_not_vote(live_cache):
+    # vote_age보다 오래된 벡터의 적중은 투표에서 제외되어 TTL이 지나 새로 추출한 결과만 투표
+    stats, encodings = live_cache(interval=0.2, frames=30, vote_age=0.0)
+    assert stats['decision'] == 'alice'
+    assert encodings == 3
+    assert stats['time_to_decision'] > 4.0
@@ -0,0 +1,84 @@
+import sys
+import types
+import threading
+import numpy as np
+import pytest
+import models.numpy_inference as numpy_inference
+from service.micro_batcher import MicroBatcher
+from utils.live_recognition import score_faces
+from utils.preprocessing_of_captured import encode_faces_batch
+
+
+def process_batch(items):
+    for item in items:
+        if item == 'unknown':
+            raise FileNotFoundError('unknown님의 얼굴 벡터 데이터가 존재하지 않습니다.')
+    return [item.upper() for item in items]
+
+
+def submit_together(batcher, items):
+    # 세 요청이 같은 배치에 들어가도록 동시에 추가
+    barrier = threading.Barrier(len(items))
+    futures = [None] * len(items)
+
+    def run(i):
+        barrier.wait()
+        futures[i] = batcher.submit(items[i])
+
+    threads = [threading.Thread(target=run, args=(i, )) for i in range(len(items))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return futures
+
+
+def test_failing_item_does_not_fail_batch():
+    batcher = MicroBatcher(process_batch, max_batch_size=8, max_wait_ms=200)
+    futures = submit_together(batcher, ['alice', 'unknown', 'bob'])
+
+    assert futures[0].result(timeout=5) == 'ALICE'
+    assert futures[2].result(timeout=5) == 'BOB'
+    with pytest.raises(FileNotFoundError):
+        futures[1].result(timeout=5)
+    assert batcher.stats()['items'] == 3
+
+
+def test_batch_results_in_order():
+    batcher = MicroBatcher(process_batch, max_batch_size=8, max_wait_ms=200)
+    futures = submit_together(batcher, ['a', 'b', 'c'])
+    assert sorted(future.result(timeout=5) for future in futures) == ['A', 'B', 'C']
+
+
+def test_short_batch_result_fails_every_future():
+    # 결과를 하나 빠뜨리는 배치 함수 : 남은 Future가 완료되지 않고 남으면 안 됨
+    batcher = MicroBatcher(lambda items: [item.upper() for item in items][:-1], max_batch_size=8, max_wait_ms=200)
+    futures = submit_together(batcher, ['a', 'b', 'c'])
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+
+
+def test_unknown_user_scores_zero(monkeypatch):
+    def predict_user(user_name, face_vectors):
+        if user_name == 'unknown':
+            raise FileNotFoundError(user_name)
+        return np.full((len(face_vectors), 1), 0.95)
+
+    monkeypatch.setattr(numpy_inference, 'predict_user', predict_user)
+    results = score_faces(np.zeros((3, 128)), ['alice', 'unknown', 'alice'])
+    assert results == [('alice', pytest.approx(0.95)), ('unknown', 0.0), ('alice', pytest.approx(0.95))]
+
+
+def test_encode_batch_falls_back_without_private_api(monkeypatch):
+    # face_recognition.api 내부 함수가 없는 버전은 이미지마다 face_encodings()로 추출
+    module = types.ModuleType('face_recognition')
+    module.face_encodings = lambda image, locations: [np.full(128, image[0, 0, 0], dtype=np.float64)
+                                                      for _ in locations]
+    monkeypatch.setitem(sys.modules, 'face_recognition', module)
+    monkeypatch.setitem(sys.modules, 'face_recognition.api', types.ModuleType('face_recognition.api'))
+
+    images = [np.full((4, 4, 3), value, dtype=np.uint8) for value in (1, 2)]
+    encodings = encode_faces_batch(images, [[(0, 4, 4, 0)], [(0, 4, 4, 0), (0, 2, 2, 0)]])
+    assert [len(vectors) for vectors in encodings] == [1, 2]
+    assert encodings[1][1][0] == 2
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+import models.numpy_inference as numpy_inference
+import models.faces_training as faces_training
+from models.numpy_inference import export_weights, load_weights, forward, load_user_weights
+
+
+class FakeDense:
+    # Keras Dense 층의 get_weights(), get_config() 대역
+    def __init__(self, W, b, activation):
+        self.weights = [W, b]
+        self.activation = activation
+
+    def get_weights(self):
+        return self.weights
+
+    def get_config(self):
+        return {'activation': self.activation}
+
+
+class FakeInput:
+    def get_weights(self):
+        return []
+
+
+def make_model(seed=0):
+    rng = np.random.default_rng(seed)
+    sizes = [128, 6, 5, 4, 1]
+    activations = ['relu', 'relu', 'relu', 'sigmoid']
+    layers = [FakeDense(rng.normal(size=(a, b)).astype(np.float32), rng.normal(size=b).astype(np.float32), act)
+              for a, b, act in zip(sizes[:-1], sizes[1:], activations)]
+    model = type('FakeModel', (), {})()
+    model.layers = [FakeInput()] + layers
+    return model
+
+
+def reference_forward(model, X):
+    # float64로 계산한 기준 순전파
+    out = np.asarray(X, dtype=np.float64)
+    for layer in model.layers[1:]:
+        W, b = layer.get_weights()
+        out = out @ W + b
+        out = np.maximum(out, 0) if layer.activation == 'relu' else 1 / (1 + np.exp(-out))
+    return out
+
+
+def test_export_load_forward_round_trip(tmp_path):
+    model = make_model()
+    path = str(tmp_path / 'weights.npz')
+    assert export_weights(model, path) == 4
+
+    layers = load_weights(path)
+    assert [activation for _, _, activation in layers] == ['relu', 'relu', 'relu', 'sigmoid']
+
+    X = np.random.default_rng(1).normal(size=(16, 128)).astype(np.float32)
+    np.testing.assert_allclose(forward(layers, X), reference_forward(model, X), atol=1e-5)
+    # 벡터 하나도 (1, 1)로 예측
+    assert forward(layers, X[0]).shape == (1, 1)
+
+
+def test_sigmoid_does_not_overflow():
+    layers = [(np.full((128, 1), 100.0, dtype=np.float32), np.zeros(1, dtype=np.float32), 'sigmoid')]
+    with np.errstate(over='raise'):
+        out = forward(layers, -np.ones((2, 128)))
+    assert np.all(out >= 0) and np.all(out < 1e-20)
+
+
+def test_unknown_activation_is_rejected():
+    with pytest.raises(ValueError):
+        forward([(np.eye(128, dtype=np.float32), np.zeros(128, dtype=np.float32), 'tanh')], np.zeros(128))
+
+
+def test_weights_exported_for_model_saved_without_npz(tmp_path, monkeypatch):
+    # 가중치 파일(.npz) 저장 이전에 학습된 모델만 있는 경우 (load_model은 학습하지 않고 모델만 로드)
+    model = make_model()
+    weights_path = str(tmp_path / 'weights_alice_abc.npz')
+    monkeypatch.setattr(numpy_inference, 'get_vector_digest', lambda user_name: 'abc')
+    monkeypatch.setattr(numpy_inference, 'get_weights_path', lambda user_name, digest: weights_path)
+    monkeypatch.setattr(faces_training, 'load_model', lambda user_name: model)
+    monkeypatch.setattr(numpy_inference, '_weights_cache', {})
+
+    layers = load_user_weights('alice')
+    X = np.random.default_rng(2).normal(size=(4, 128))
+    np.testing.assert_allclose(forward(layers, X), reference_forward(model, X), atol=1e-5)
+    assert load_weights(weights_path)[0][0].shape == (128, 6)
@@ -0,0 +1,97 @@
+import sys
+import types
+import threading
+import numpy as np
+import pytest
+import cv2 as cv
+from utils.preprocessing_of_captured import (FramePreprocessor, get_preprocessor, preprocess_and_detect,
+                                             apply_histogram_equalization, adjust_brightness_and_contrast)
+
+
+def make_frame(height=120, width=160, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    # 검출에 사용한 이미지를 기록하고 얼굴 하나를 반환하는 face_recognition 대역
+    calls = []
+
+    def face_locations(img, model="hog"):
+        calls.append(img)
+        height, width = img.shape[:2]
+        return [(height // 4, width * 3 // 4, height * 3 // 4, width // 4)]
+
+    module = types.ModuleType('face_recognition')
+    module.face_locations = face_locations
+    monkeypatch.setitem(sys.modules, 'face_recognition', module)
+    return calls
+
+
+def test_output_matches_allocating_path():
+    frame = make_frame()
+    # 기본 전처리(흑백 균등화)는 이전 경로와 바이트 단위로 같음
+    np.testing.assert_array_equal(FramePreprocessor(("equalize", ))(frame), apply_histogram_equalization(frame))
+
+    expected = cv.cvtColor(apply_histogram_equalization(adjust_brightness_and_contrast(frame, 1.5, 50)),
+                           cv.COLOR_BGR2RGB)
+    combined = FramePreprocessor(("brightness", "equalize"), alpha=1.5, beta=50)(frame)
+    np.testing.assert_array_equal(combined, expected)
+
+    # 전처리가 없으면 RGB 순서 변환만 수행
+    np.testing.assert_array_equal(FramePreprocessor(())(frame), frame[:, :, ::-1])
+
+
+def test_buffers_are_reused_for_same_frame_size():
+    preprocessor = FramePreprocessor(("brightness", "equalize"))
+    first = preprocessor(make_frame(seed=1))
+    allocations = preprocessor.allocations
+    for seed in range(2, 6):
+        output = preprocessor(make_frame(seed=seed))
+        assert output is first
+    assert preprocessor.allocations == allocations == 3
+
+    # 프레임 크기가 바뀐 경우에만 다시 할당
+    assert preprocessor(make_frame(240, 320)).shape == (240, 320, 3)
+    assert preprocessor.allocations == 6
+
+
+def test_ring_keeps_previous_outputs():
+    preprocessor = FramePreprocessor(("equalize", ), ring=3)
+    frames = [make_frame(seed=seed) for seed in range(4)]
+    outputs = [preprocessor(frame) for frame in frames[:3]]
+    assert len({id(output) for output in outputs}) == 3
+    # ring개 이전의 결과는 덮어쓰지 않음
+    for frame, output in zip(frames, outputs):
+        np.testing.assert_array_equal(output, apply_histogram_equalization(frame))
+
+    assert preprocessor(frames[3]) is outputs[0]
+    assert preprocessor.allocations == 4
+
+
+def test_unknown_step_is_rejected():
+    with pytest.raises(ValueError):
+        FramePreprocessor(("equalize", "sharpen"))
+
+
+def test_detection_reuses_downscale_buffer(calls):
+    preprocessor = FramePreprocessor()
+    frame = make_frame(240, 320)
+    _, first = preprocess_and_detect(frame, scale=0.5, target_width=None, preprocessor=preprocessor)
+    _, second = preprocess_and_detect(make_frame(240, 320, seed=1), scale=0.5, target_width=None,
+                                      preprocessor=preprocessor)
+
+    assert calls[0].shape == (120, 160, 3) and calls[0] is calls[1]
+    assert calls[0] is preprocessor.buffers[("detection", 0)]
+    assert first == second == [(60, 240, 180, 80)]
+
+
+def test_default_preprocessor_is_per_thread():
+    preprocessor = get_preprocessor()
+    assert get_preprocessor() is preprocessor
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(get_preprocessor()))
+    thread.start()
+    thread.join()
+    assert other[0] is not preprocessor
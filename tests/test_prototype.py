@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+import models.prototype as prototype_module
+from models.prototype import compute_prototype, knn_distances, predict, load_prototype
+from models.gallery import TOLERANCE
+from models.numpy_inference import THRESHOLD
+from config import PROTOTYPE_RADIUS_QUANTILE, PROTOTYPE_RADIUS_MARGIN, PROTOTYPE_KNN
+from benchmarks.quantization_report import make_synthetic_gallery
+
+
+@pytest.fixture
+def gallery():
+    vectors, labels = make_synthetic_gallery(users=10, per_user=20, spread=0.02, seed=5)
+    return vectors.astype(np.float32), labels
+
+
+def test_radius_is_calibrated_from_enrolled_distances(gallery):
+    vectors, labels = gallery
+    own = vectors[labels == 'user00000']
+    prototype = compute_prototype(own)
+
+    centroid_distances = np.linalg.norm(own - own.mean(axis=0), axis=1)
+    expected = np.quantile(centroid_distances, PROTOTYPE_RADIUS_QUANTILE) * PROTOTYPE_RADIUS_MARGIN
+    assert prototype['radius'] == pytest.approx(expected, rel=1e-5)
+
+    # kNN 반경은 자기 자신을 제외한 k개 이웃 평균 거리로 보정
+    brute = np.linalg.norm(own[:, None, :] - own[None, :, :], axis=2)
+    np.fill_diagonal(brute, np.inf)
+    knn = np.sort(brute, axis=1)[:, :PROTOTYPE_KNN].mean(axis=1)
+    np.testing.assert_allclose(knn_distances(own, own, exclude_self=True), knn, rtol=1e-4)
+    assert prototype['knn_radius'] == pytest.approx(
+        np.quantile(knn, PROTOTYPE_RADIUS_QUANTILE) * PROTOTYPE_RADIUS_MARGIN, rel=1e-4)
+
+
+def test_score_is_threshold_at_radius(gallery):
+    vectors, labels = gallery
+    prototype = compute_prototype(vectors[labels == 'user00000'])
+    direction = np.zeros(128, dtype=np.float32)
+    direction[0] = 1
+    inside, edge, outside = (prototype['centroid'] + direction * prototype['radius'] * scale
+                             for scale in (0.5, 1.0, 2.0))
+    scores = predict(prototype, np.stack([inside, edge, outside]))[:, 0]
+    assert scores[1] == pytest.approx(THRESHOLD, rel=1e-4)
+    assert scores[0] > THRESHOLD > scores[2]
+
+
+@pytest.mark.parametrize('backend', ['prototype', 'knn'])
+def test_calibrated_radius_separates_users(gallery, backend):
+    vectors, labels = gallery
+    rng = np.random.default_rng(6)
+    for user in np.unique(labels)[:3]:
+        prototype = compute_prototype(vectors[labels == user])
+        # 등록 벡터와 같은 분포의 새 벡터는 통과, 다른 사용자 벡터는 거부
+        own = vectors[labels == user][:5] + rng.normal(scale=0.02, size=(5, 128))
+        assert (predict(prototype, own, backend) > THRESHOLD).all()
+        assert (predict(prototype, vectors[labels != user], backend) < THRESHOLD).all()
+
+
+def test_radius_is_capped_by_tolerance():
+    # 흩어짐이 큰 벡터와 벡터 하나뿐인 사용자는 gallery.TOLERANCE를 반경으로 사용
+    wide = np.random.default_rng(7).normal(scale=1.0, size=(10, 128))
+    assert compute_prototype(wide)['radius'] == pytest.approx(TOLERANCE)
+    single = compute_prototype(np.zeros((1, 128)))
+    assert single['knn_radius'] == pytest.approx(TOLERANCE)
+    assert predict(single, np.zeros((1, 128)), 'knn')[0, 0] == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        compute_prototype(np.zeros((0, 128)))
+    with pytest.raises(ValueError):
+        predict(single, np.zeros(128), 'svm')
+
+
+def test_load_recomputes_when_vectors_change(gallery, tmp_path, monkeypatch):
+    vectors, labels = gallery
+    current = {'vectors': vectors[labels == 'user00000'], 'digest': 'a'}
+    monkeypatch.setattr(prototype_module, 'MODEL_DIR', str(tmp_path))
+    monkeypatch.setattr(prototype_module, 'get_prototype_path',
+                        lambda user_name, digest: str(tmp_path / f'{user_name}_{digest}.npz'))
+    monkeypatch.setattr(prototype_module, 'get_vector_digest', lambda user_name: current['digest'])
+    monkeypatch.setattr(prototype_module, 'load_user_vectors', lambda user_name: current['vectors'])
+    monkeypatch.setattr(prototype_module, '_prototype_cache', {})
+
+    first = load_prototype('alice')
+    assert (tmp_path / 'alice_a.npz').exists()
+
+    # 다른 프로세스처럼 캐시 없이 저장된 파일에서 로드
+    prototype_module._prototype_cache.clear()
+    loaded = load_prototype('alice')
+    np.testing.assert_array_equal(loaded['centroid'], first['centroid'])
+    assert loaded['radius'] == first['radius']
+
+    # 벡터가 바뀌면 새로 계산하고 이전 파일은 삭제
+    current.update(vectors=vectors[labels == 'user00001'], digest='b')
+    changed = load_prototype('alice')
+    assert not np.allclose(changed['centroid'], first['centroid'])
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['alice_b.npz']
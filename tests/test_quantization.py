@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+import utils.quantization as quantization
+from utils.quantization import QuantizedMatrix, quantize, dequantize
+from benchmarks.quantization_report import make_synthetic_gallery
+
+
+def exact_distances(queries, vectors):
+    queries, vectors = np.asarray(queries, dtype=np.float64), np.asarray(vectors, dtype=np.float64)
+    return np.linalg.norm(queries[:, None, :] - vectors[None, :, :], axis=2)
+
+
+@pytest.fixture
+def gallery():
+    vectors, labels = make_synthetic_gallery(users=40, per_user=5, spread=0.05, seed=1)
+    # 사용자마다 등록 벡터 하나에 새 잡음을 더한 입력 벡터
+    queries = vectors[::5] + np.random.default_rng(2).normal(scale=0.05, size=(40, 128))
+    return vectors, labels, queries
+
+
+def test_float_formats_distance_error(gallery):
+    vectors, _, queries = gallery
+    exact = exact_distances(queries, vectors)
+    assert np.abs(QuantizedMatrix.from_float(vectors, "float32").distances(queries) - exact).max() < 1e-5
+    # 반정밀도의 상대 오차(2^-11)가 거리에 주는 영향
+    assert np.abs(QuantizedMatrix.from_float(vectors, "float16").distances(queries) - exact).max() < 2e-3
+
+
+def test_int8_distance_error_within_rounding_bound(gallery):
+    vectors, labels, queries = gallery
+    matrix = QuantizedMatrix.from_float(vectors, "int8")
+    exact = exact_distances(queries, vectors)
+    distances = matrix.distances(queries)
+
+    # 차원별 반올림 오차는 scale / 2 이하이므로 거리 오차는 ||scale / 2|| 이하 (float32 계산 오차 여유 포함)
+    bound = np.linalg.norm(matrix.scale / 2) + 1e-4
+    assert np.abs(distances - exact).max() <= bound
+    assert np.abs(matrix.to_float() - vectors).max() <= matrix.scale.max() / 2 + 1e-6
+
+    # 사용자 사이 거리에 비해 오차가 작으므로 가장 가까운 사용자는 float64와 같음
+    assert (labels[distances.argmin(axis=1)] == labels[exact.argmin(axis=1)]).all()
+
+
+def test_int8_clips_vectors_outside_fitted_scale():
+    codes, scale = quantize(np.array([[1.0, -2.0]]), "int8")
+    assert codes.tolist() == [[127, -127]]
+    later, _ = quantize(np.array([[3.0, 0.5]]), "int8", scale)
+    assert later.tolist() == [[127, 32]]
+    assert dequantize(later, "int8", scale)[0, 0] == pytest.approx(1.0)
+
+
+def test_blocked_distances_match_single_block(gallery, monkeypatch):
+    vectors, _, queries = gallery
+    for vector_format in ("float16", "int8"):
+        expected = QuantizedMatrix.from_float(vectors, vector_format).distances(queries)
+        monkeypatch.setattr(quantization, 'BLOCK_ROWS', 7)
+        matrix = QuantizedMatrix.from_float(vectors, vector_format)
+        np.testing.assert_allclose(matrix.distances(queries), expected, rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose(matrix.distances(queries, slice(10, 30)), expected[:, 10:30], rtol=1e-5, atol=1e-6)
+        monkeypatch.setattr(quantization, 'BLOCK_ROWS', 65536)
+
+
+def test_save_and_load_memory_mapped(gallery, tmp_path):
+    vectors, labels, queries = gallery
+    matrix = QuantizedMatrix.from_float(vectors, "int8")
+    matrix.save(str(tmp_path), labels, source_version=[1, len(vectors), 0])
+
+    loaded, loaded_labels, meta = QuantizedMatrix.load(str(tmp_path))
+    assert isinstance(loaded.codes, np.memmap)
+    assert meta == {'format': 'int8', 'count': len(vectors), 'source_version': [1, len(vectors), 0]}
+    assert (loaded_labels == labels).all()
+    np.testing.assert_array_equal(loaded.distances(queries), matrix.distances(queries))
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        quantize(np.zeros((1, 4)), "int4")
+    with pytest.raises(ValueError):
+        QuantizedMatrix(np.zeros((1, 4)), "bfloat16")
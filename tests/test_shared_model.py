@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+import models.shared_model as shared_model
+from models.shared_model import SharedModel, load_shared_model
+from models.numpy_inference import THRESHOLD, forward
+from utils.embedding_store import EmbeddingStore
+from benchmarks.quantization_report import make_synthetic_gallery
+
+
+@pytest.fixture(scope='module')
+def trained():
+    vectors, labels = make_synthetic_gallery(users=8, per_user=20, spread=0.02, seed=10)
+    model = SharedModel.train(vectors, labels, epochs=30, min_steps=300, seed=0, verbose=False)
+    return model, vectors.astype(np.float32), labels
+
+
+def test_identifies_and_rejects(trained):
+    model, vectors, labels = trained
+    rng = np.random.default_rng(11)
+    queries = vectors[::20] + rng.normal(scale=0.02, size=(8, 128))
+
+    assert [candidates[0][0] for candidates in model.identify_batch(queries)] == list(labels[::20])
+    scores = model.scores(queries)
+    assert scores.shape == (8, 8)
+    # 자기 열만 THRESHOLD 초과
+    assert ((scores > THRESHOLD) == np.eye(8, dtype=bool)).all()
+
+    # 등록 벡터에서 멀리 떨어진 얼굴은 모든 사용자에게 거부
+    far = vectors[::20] + rng.normal(scale=0.1, size=(8, 128))
+    assert (model.scores(far) < THRESHOLD).all()
+
+
+def test_user_layers_match_shared_scores(trained):
+    model, vectors, _ = trained
+    column = model.columns['user00003']
+    np.testing.assert_allclose(forward(model.user_layers('user00003'), vectors[:10]),
+                               model.scores(vectors[:10])[:, [column]], rtol=1e-6)
+    with pytest.raises(KeyError):
+        model.user_layers('mallory')
+
+
+def test_save_and_load_round_trip(trained, tmp_path):
+    model, vectors, _ = trained
+    model = SharedModel(model.layers, model.labels, [0, len(vectors), 0])
+    path = str(tmp_path / 'shared_model.npz')
+    model.save(path)
+
+    loaded = SharedModel.load(path)
+    assert loaded.source_version == [0, len(vectors), 0]
+    assert loaded.labels.tolist() == model.labels.tolist()
+    np.testing.assert_array_equal(loaded.scores(vectors), model.scores(vectors))
+    assert SharedModel.load(str(tmp_path / 'missing.npz')) is None
+
+
+def test_retrained_when_store_changes(tmp_path, monkeypatch):
+    vectors, labels = make_synthetic_gallery(users=2, per_user=10, spread=0.02, seed=12)
+    store = EmbeddingStore(str(tmp_path / 'embeddings.bin'))
+    store.append('alice', vectors[labels == 'user00000'])
+    store.append('bob', vectors[labels == 'user00001'])
+    path = str(tmp_path / 'shared_model.npz')
+    monkeypatch.setattr(shared_model, '_shared_cache', {})
+    trainings = []
+    train_from_store = shared_model.train_from_store
+
+    def counting_train(store):
+        trainings.append(1)
+        return train_from_store(store, verbose=False)
+
+    monkeypatch.setattr(shared_model, 'train_from_store', counting_train)
+
+    first = load_shared_model(store, path)
+    assert first.labels.tolist() == ['alice', 'bob'] and first.source_version == [0, 20, 0]
+    assert load_shared_model(store, path) is first
+
+    # 다른 프로세스처럼 캐시 없이 저장된 모델을 로드 (다시 학습하지 않음)
+    shared_model._shared_cache.clear()
+    assert load_shared_model(store, path).source_version == [0, 20, 0]
+    assert len(trainings) == 1
+
+    # 사용자가 추가되어 저장소 버전이 바뀌면 다시 학습
+    store.append('carol', vectors[:3] + 0.3)
+    retrained = load_shared_model(store, path)
+    assert retrained.labels.tolist() == ['alice', 'bob', 'carol'] and retrained.source_version == [0, 23, 0]
+    assert len(trainings) == 2
@@ -0,0 +1,101 @@
+import json
+import threading
+import http.client
+import numpy as np
+import pytest
+from service.verification_server import create_server
+from service.verification_service import VerificationService, decode_frame
+
+
+class FakeService:
+    # 사용자 이름에 따라 결과 또는 예외를 반환하는 서비스 대역
+    def verify(self, image, user_name=None):
+        if user_name == 'unknown':
+            raise FileNotFoundError(f'등록되지 않은 사용자입니다: {user_name}')
+        if user_name == 'broken':
+            raise RuntimeError('모델 오류')
+        return {'identity': user_name, 'score': 1.0, 'decision': True, 'faces': 1, 'elapsed_ms': 0.0}
+
+    def health(self):
+        return {'status': 'ok'}
+
+
+class FakeGallery:
+    user_slices = {'alice': slice(0, 1)}
+
+
+@pytest.fixture
+def server():
+    server = create_server(FakeService(), host='127.0.0.1', port=0, socket_path=None)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post_frame(server, user, width=2, height=2, channels=3):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+    body = bytes(width * height * channels)
+    connection.request('POST', f'/verify?user={user}', body,
+                       {'Content-Type': 'application/octet-stream', 'X-Frame-Width': str(width),
+                        'X-Frame-Height': str(height), 'X-Frame-Channels': str(channels)})
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read())
+    connection.close()
+    return result
+
+
+def test_verify_ok(server):
+    status, body = post_frame(server, 'alice')
+    assert status == 200
+    assert body['identity'] == 'alice'
+
+
+def test_non_bgr_frame_is_bad_request(server):
+    status, body = post_frame(server, 'alice', channels=4)
+    assert status == 400
+    assert 'error' in body
+
+
+def test_unknown_user_is_not_found(server):
+    status, body = post_frame(server, 'unknown')
+    assert status == 404
+    assert 'unknown' in body['error']
+
+
+def test_processing_error_is_json_500(server):
+    status, body = post_frame(server, 'broken')
+    assert status == 500
+    assert 'RuntimeError' in body['error']
+
+    # 오류 후에도 서버가 계속 요청을 처리
+    assert post_frame(server, 'alice')[0] == 200
+
+
+@pytest.mark.parametrize('length', ['abc', '-1'])
+def test_invalid_content_length_is_bad_request(server, length):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+    connection.putrequest('POST', '/verify?user=alice')
+    connection.putheader('Content-Length', length)
+    connection.endheaders()
+    response = connection.getresponse()
+    assert response.status == 400
+    assert 'Content-Length' in json.loads(response.read())['error']
+    connection.close()
+
+    # 잘못된 요청 후에도 서버가 계속 요청을 처리
+    assert post_frame(server, 'alice')[0] == 200
+
+
+def test_decode_frame_rejects_other_channels():
+    assert decode_frame(bytes(12), 2, 2).shape == (2, 2, 3)
+    with pytest.raises(ValueError):
+        decode_frame(bytes(4), 2, 2, channels=1)
+
+
+def test_service_rejects_unregistered_user():
+    service = VerificationService(batching=False)
+    service.gallery = FakeGallery()
+    with pytest.raises(FileNotFoundError):
+        service.verify(np.zeros((4, 4, 3), dtype=np.uint8), 'bob')
@@ -0,0 +1,358 @@
+import sys
+import time
+import asyncio
+import functools
+import argparse
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import cv2 as cv
+from config import (SAVE_CAPTURES, PIPELINE_QUEUE_SIZE, PIPELINE_WORKERS,
+                    LIVE_VOTE_WINDOW, LIVE_MIN_VOTES)
+from utils import metrics
+
+"""
+    : 도어락 인식 과정을 asyncio 단계들로 나눈 파이프라인
+        capture -> preprocess/detect -> encode -> decision
+                 \\-> save (기록용 캡처 아카이브 저장, 인식 단계와 독립)
+    : 단계 사이는 크기가 제한된 큐로 연결되어 느린 단계가 있으면 앞 단계가 기다림 (backpressure)
+      단, decision 단계가 밀리면 가장 오래된 결과를 버리고 최신 결과를 사용 (drop-oldest)
+      카메라처럼 멈출 수 없는 입력은 capture 큐도 drop-oldest로 동작
+    : CPU를 많이 쓰는 검출/벡터 추출/판별/저장은 스레드 풀에서 실행해 이벤트 루프를 막지 않음
+    : 한 단계에서 예외가 생기면 다음 단계에 종료 표시를 바로 전달하고, 결과 스트림에서 그 예외를 다시 발생시킴
+    : 결과는 하나의 async 스트림(DoorLockPipeline.decisions())으로 전달
+
+    실행 방법 (프로젝트 루트에서)
+        python -m utils.async_pipeline --video door.mp4
+        python -m utils.async_pipeline --images data/captured_images --user wooseong
+"""
+
+# 파이프라인 결과
+## frame_index : 입력 프레임 번호
+## identity, score : 해당 프레임의 인식 결과
+## unlock : 최근 결과 투표로 열림이 결정된 사용자 이름 (결정되지 않았으면 None)
+## latency : 프레임 입력부터 결정까지 걸린 시간 (초)
+Decision = namedtuple('Decision', ['frame_index', 'identity', 'score', 'unlock', 'latency'])
+
+# 입력 종료 표시
+_END = object()
+
+
+async def video_frames(path, loop_forever=False):
+    """
+    동영상 파일의 프레임을 순서대로 생성 (디코딩은 스레드에서 실행)
+
+    :param path: 동영상 파일 경로 (카메라 번호(int)도 가능)
+    :param loop_forever: 파일 끝에서 처음으로 돌아갈지 여부 (bool)
+    """
+    loop = asyncio.get_running_loop()
+    cap = cv.VideoCapture(path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f'동영상을 열 수 없습니다: {path}')
+    try:
+        while True:
+            ret, frame = await loop.run_in_executor(None, cap.read)
+            if not ret:
+                if loop_forever and not isinstance(path, int):
+                    cap.set(cv.CAP_PROP_POS_FRAMES, 0)
+                    continue
+                return
+            yield frame
+    finally:
+        cap.release()
+
+
+async def directory_frames(folder):
+    """
+    폴더의 이미지 파일을 이름 순서대로 프레임으로 생성
+
+    :param folder: 이미지 폴더 경로
+    """
+    from utils.image_files import list_images
+
+    loop = asyncio.get_running_loop()
+    for path in list_images(folder):
+        frame = await loop.run_in_executor(None, cv.imread, path)
+        if frame is None:
+            print(f'이미지를 로드할 수 없습니다: {path}')
+            continue
+        yield frame
+
+
+class DoorLockPipeline:
+    def __init__(self, source, user_name=None, live=False, queue_size=PIPELINE_QUEUE_SIZE,
+                 workers=PIPELINE_WORKERS, save_captures=SAVE_CAPTURES, archive=None):
+        """
+        DoorLockPipeline 클래스 생성자
+
+        :param source: 프레임을 생성하는 async iterator (video_frames(), directory_frames() 등)
+        :param user_name: 확인할 사용자 이름 (None이면 등록된 모든 사용자 중에서 식별)
+        :param live: 카메라처럼 기다릴 수 없는 입력인지 여부 (True면 capture 큐도 drop-oldest)
+        :param queue_size: 단계 사이 큐의 최대 크기 (int)
+        :param workers: 검출/벡터 추출/저장에 사용하는 스레드 수 (int)
+        :param save_captures: 기록용 캡처 저장 여부 (bool)
+        :param archive: 캡처를 저장할 CaptureArchive 객체 (None이면 기본 아카이브)
+        """
+        self.source = source
+        self.user_name = user_name
+        self.live = live
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.save_captures = save_captures
+        self.archive = archive
+
+        # 통계 : 단계별 처리 수와 버린 수
+        self.processed = {'capture': 0, 'detect': 0, 'encode': 0, 'decision': 0, 'save': 0}
+        self.dropped = {'capture': 0, 'decision': 0, 'save': 0}
+
+    @staticmethod
+    def put_drop_oldest(queue, item):
+        """
+        큐가 가득 차 있으면 가장 오래된 항목을 버리고 추가
+
+        :return: 버린 항목 수 (0 또는 1)
+        """
+        dropped = 0
+        while True:
+            try:
+                queue.put_nowait(item)
+                return dropped
+            except asyncio.QueueFull:
+                queue.get_nowait()
+                dropped += 1
+
+    def end_on_error(self, *queues):
+        """
+        단계에서 예외가 생긴 경우 다음 단계가 기다리지 않도록 종료 표시를 바로 추가
+        (큐가 가득 차 있으면 가장 오래된 항목을 버림)
+        """
+        for queue in queues:
+            if queue is not None:
+                self.put_drop_oldest(queue, _END)
+
+    async def run_in_executor(self, stage, function, *args):
+        """
+        CPU를 많이 쓰는 작업을 스레드 풀에서 실행하고 단계 시간을 기록
+        """
+        def timed():
+            with metrics.stage(stage):
+                return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+
+    async def _capture(self, out_queue, save_queue):
+        index = 0
+        try:
+            async for frame in self.source:
+                item = (index, time.perf_counter(), frame)
+                if self.live:
+                    self.dropped['capture'] += self.put_drop_oldest(out_queue, item)
+                else:
+                    await out_queue.put(item)
+                if save_queue is not None:
+                    # 저장이 밀려도 인식은 기다리지 않음
+                    self.dropped['save'] += self.put_drop_oldest(save_queue, item)
+                self.processed['capture'] += 1
+                index += 1
+        except Exception:
+            # 입력을 열 수 없거나 읽는 중 오류가 난 경우
+            self.end_on_error(out_queue, save_queue)
+            raise
+        await out_queue.put(_END)
+        if save_queue is not None:
+            # 종료 표시는 버려지지 않도록 기다렸다가 추가
+            await save_queue.put(_END)
+
+    async def _detect(self, in_queue, out_queue):
+        from utils.face_tracking import TrackingDetector
+        from utils.preprocessing_of_captured import FramePreprocessor, preprocess_and_detect
+
+        # 연속 프레임은 이전 얼굴 주변만 검색 (단계당 하나의 코루틴이 순서대로 사용)
+        detector = TrackingDetector()
+
+        # 전처리 결과는 encode 단계가 사용할 때까지 큐에 머무르므로
+        # 큐 크기 + 처리 중인 프레임 수만큼의 버퍼를 번갈아 사용
+        preprocessor = FramePreprocessor(ring=self.queue_size + 3)
+        try:
+            while True:
+                item = await in_queue.get()
+                if item is _END:
+                    break
+                index, started, frame = item
+                equalized_image, face_locations = await self.run_in_executor(
+                    "detection", functools.partial(preprocess_and_detect, detector=detector,
+                                                   preprocessor=preprocessor), frame)
+                self.processed['detect'] += 1
+                await out_queue.put((index, started, equalized_image, face_locations))
+        except Exception:
+            self.end_on_error(out_queue)
+            raise
+        await out_queue.put(_END)
+
+    async def _encode(self, in_queue, out_queue):
+        import face_recognition
+        from utils.encoding_cache import EncodingCache
+
+        cache = EncodingCache()
+
+        def encode(image, location):
+            face_vector = cache.get_or_compute(image, location,
+                                               lambda: face_recognition.face_encodings(image, [location])[0])
+            return face_vector, cache.last_fresh
+
+        try:
+            while True:
+                item = await in_queue.get()
+                if item is _END:
+                    break
+                index, started, equalized_image, face_locations = item
+                face_vector, fresh = None, True
+                if face_locations:
+                    face_vector, fresh = await self.run_in_executor("encoding", encode, equalized_image,
+                                                                    face_locations[0])
+                self.processed['encode'] += 1
+                # decision 단계가 밀리면 가장 오래된 결과를 버림
+                self.dropped['decision'] += self.put_drop_oldest(out_queue, (index, started, face_vector, fresh))
+        except Exception:
+            self.end_on_error(out_queue)
+            raise
+        await out_queue.put(_END)
+
+    async def _decide(self, in_queue):
+        from models.gallery import Gallery
+        from models.numpy_inference import THRESHOLD
+        from utils.live_recognition import TemporalVoter, score_face
+
+        # Gallery 로드와 판별도 스레드 풀에서 실행 (이벤트 루프가 막히면 drop-oldest 정책이 동작하지 않음)
+        gallery = None
+        if self.user_name is None:
+            gallery = await self.run_in_executor("classification", Gallery.load)
+        voter = TemporalVoter(LIVE_VOTE_WINDOW, LIVE_MIN_VOTES, THRESHOLD)
+        while True:
+            item = await in_queue.get()
+            if item is _END:
+                break
+            index, started, face_vector, fresh = item
+            if face_vector is None:
+                identity, score = None, 0.0
+            else:
+                identity, score = await self.run_in_executor("classification", score_face, face_vector,
+                                                             self.user_name, gallery)
+            # 오래전에 추출한 캐시 벡터의 결과는 이전 프레임의 반복이므로 투표에서 제외
+            unlock = voter.add(identity, score, fresh)
+            self.processed['decision'] += 1
+            yield Decision(index, identity, score, unlock, time.perf_counter() - started)
+
+    async def _save(self, in_queue):
+        from utils.capture_archive import CaptureArchive
+
+        archive = self.archive or CaptureArchive()
+        while True:
+            item = await in_queue.get()
+            if item is _END:
+                break
+            _, _, frame = item
+            try:
+                await self.run_in_executor("disk_io", archive.append, frame)
+                self.processed['save'] += 1
+            except (OSError, ValueError) as e:
+                print(f'이미지를 저장하지 못했습니다: {e}')
+
+    async def decisions(self):
+        """
+        프레임마다 결정 결과를 생성하는 async 스트림
+        입력이 끝나면 남은 프레임을 모두 처리한 후 종료
+
+        사용 예
+            async for decision in pipeline.decisions():
+                if decision.unlock:
+                    open_door(decision.unlock)
+        """
+        capture_queue = asyncio.Queue(self.queue_size)
+        detect_queue = asyncio.Queue(self.queue_size)
+        decision_queue = asyncio.Queue(self.queue_size)
+        save_queue = asyncio.Queue(self.queue_size) if self.save_captures else None
+
+        tasks = [asyncio.create_task(self._capture(capture_queue, save_queue)),
+                 asyncio.create_task(self._detect(capture_queue, detect_queue)),
+                 asyncio.create_task(self._encode(detect_queue, decision_queue))]
+        if save_queue is not None:
+            tasks.append(asyncio.create_task(self._save(save_queue)))
+
+        try:
+            async for decision in self._decide(decision_queue):
+                yield decision
+            # 앞 단계에서 생긴 예외 확인
+            ## 예외로 끝난 단계가 있으면 그 앞 단계는 다음 큐에서 기다리고 있을 수 있으므로 바로 예외 발생
+            for task in tasks:
+                if task.done() and not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.executor.shutdown(wait=True)
+
+    def stats(self):
+        """
+        단계별 처리 수와 버린 수
+
+        :return: dict
+        """
+        return {'processed': dict(self.processed), 'dropped': dict(self.dropped)}
+
+
+async def run_pipeline(pipeline, stop_on_unlock=True):
+    """
+    파이프라인 결과를 출력하며 실행
+
+    :param pipeline: DoorLockPipeline 객체
+    :param stop_on_unlock: 열림이 결정되면 종료할지 여부 (bool)
+    :return: 열림이 결정된 사용자 이름 또는 None
+    """
+    start = time.perf_counter()
+    unlocked = None
+    stream = pipeline.decisions()
+    try:
+        async for decision in stream:
+            print(f'프레임 {decision.frame_index}: {decision.identity or "-"} ({decision.score:.2f}), '
+                  f'지연 {decision.latency * 1000:.1f} ms' + (f' -> {decision.unlock} 열림' if decision.unlock else ''))
+            if decision.unlock and unlocked is None:
+                unlocked = decision.unlock
+                if stop_on_unlock:
+                    break
+    finally:
+        # 중간에 종료해도 단계 작업과 스레드 풀을 바로 정리
+        await stream.aclose()
+
+    elapsed = time.perf_counter() - start
+    stats = pipeline.stats()
+    print(f'처리 {stats["processed"]} / 버림 {stats["dropped"]} ({elapsed:.2f}초, '
+          f'{stats["processed"]["decision"] / max(elapsed, 1e-6):.1f} 프레임/초)')
+    return unlocked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="asyncio 도어락 인식 파이프라인")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--video", help="동영상 파일 경로")
+    group.add_argument("--images", help="이미지 폴더 경로")
+    group.add_argument("--camera", type=int, help="카메라 번호")
+    parser.add_argument("--user", help="확인할 사용자 이름 (생략하면 식별)")
+    parser.add_argument("--no-save", action="store_true", help="기록용 캡처 저장 안 함")
+    parser.add_argument("--all", action="store_true", help="열림이 결정된 후에도 입력 끝까지 처리")
+    args = parser.parse_args()
+
+    if args.video:
+        source = video_frames(args.video)
+    elif args.images:
+        source = directory_frames(args.images)
+    else:
+        source = video_frames(args.camera)
+
+    pipeline = DoorLockPipeline(source, args.user, live=args.camera is not None,
+                                save_captures=SAVE_CAPTURES and not args.no_save)
+    unlocked = asyncio.run(run_pipeline(pipeline, stop_on_unlock=not args.all))
+
+    # 도어락 열림(1) 또는 닫힘(0)
+    print(1 if unlocked else 0)
+    sys.exit(0 if unlocked else 1)
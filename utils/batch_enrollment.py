@@ -0,0 +1,104 @@
+import os
+import time
+import argparse
+from multiprocessing import Pool
+from config import IMAGE_DIR
+from utils.vector_extraction import list_user_images, encode_image
+from utils.enrollment_manifest import EnrollmentManifest
+
+"""
+    : 여러 사용자의 이미지를 프로세스 풀로 나누어 한 번에 등록
+    : 이미지 별 실패(얼굴 미검출, 파일 오류)는 기록만 하고 계속 진행
+    : 사용자 별 매니페스트와 비교해 새로 추가되었거나 바뀐 이미지만 추출
+    : 작업 순서나 프로세스 수와 관계없이 같은 결과가 저장되도록
+      (사용자, 이미지 경로) 순서로 결과를 모아 사용자 단위로 저장소에 기록
+
+    실행 방법 (프로젝트 루트에서)
+        python -m utils.batch_enrollment                  # IMAGE_DIR 하위 모든 사용자
+        python -m utils.batch_enrollment wooseong --workers 4
+"""
+
+# 얼굴 미검출 실패 메세지 (파일 오류 등 다른 실패는 다음 실행에서 다시 시도)
+NO_FACE_MESSAGE = '얼굴을 감지하지 못했습니다.'
+
+
+def _encode_task(task):
+    """
+    프로세스 풀에서 실행되는 이미지 한 장의 벡터 추출 작업
+
+    :param task: (사용자 이름, 이미지 파일 경로) 튜플
+    :return: (사용자 이름, 이미지 파일 경로, 벡터 또는 None, 오류 메세지 또는 None) 튜플
+    """
+    user_name, file_path = task
+    try:
+        face_encoding = encode_image(file_path)
+    except Exception as e:
+        # 이미지 한 장의 오류로 전체 작업이 중단되지 않도록 오류 메세지만 반환
+        return user_name, file_path, None, f'{type(e).__name__}: {e}'
+
+    if face_encoding is None:
+        return user_name, file_path, None, NO_FACE_MESSAGE
+    return user_name, file_path, face_encoding, None
+
+
+def batch_enrollment(user_names=None, workers=None, progress_every=10):
+    """
+    여러 사용자의 얼굴 이미지를 병렬로 벡터화해 저장소에 등록
+
+    :param user_names: 등록할 사용자 이름 리스트 (None이면 IMAGE_DIR 하위 모든 폴더)
+    :param workers: 프로세스 수 (None이면 CPU 코어 수)
+    :param progress_every: 진행 상황을 출력할 이미지 간격 (int)
+    :return: [(사용자 이름, 이미지 파일 경로, 오류 메세지), ...] 실패 목록
+    """
+    if user_names is None:
+        user_names = sorted(name for name in os.listdir(IMAGE_DIR)
+                            if os.path.isdir(os.path.join(IMAGE_DIR, name)))
+
+    # (사용자, 이미지 경로) 순으로 정렬된 작업 목록 (바뀐 이미지만)
+    tasks = []
+    manifests = {}
+    for user_name in sorted(user_names):
+        file_paths = list_user_images(user_name)
+        if file_paths is None:
+            continue
+        manifests[user_name] = EnrollmentManifest(user_name)
+        tasks += [(user_name, file_path) for file_path in manifests[user_name].plan(file_paths)]
+
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    print(f'{len(user_names)}명, {len(tasks)}장의 이미지를 {workers}개의 프로세스로 등록합니다.')
+
+    # 작업 순서대로 결과 수집
+    ## imap은 완료 순서와 관계없이 입력 순서대로 결과를 반환
+    failures = []
+    start = time.perf_counter()
+    with Pool(processes=workers) as pool:
+        for done, result in enumerate(pool.imap(_encode_task, tasks, chunksize=4), start=1):
+            if result[3] is None or result[3] == NO_FACE_MESSAGE:
+                manifests[result[0]].record(result[1], result[2])
+            else:
+                manifests[result[0]].forget(result[1])
+            if result[3] is not None:
+                failures.append((result[0], result[1], result[3]))
+                print(f'실패: {result[1]} ({result[3]})')
+
+            if done % progress_every == 0 or done == len(tasks):
+                elapsed = time.perf_counter() - start
+                print(f'진행: {done}/{len(tasks)} ({done / elapsed:.1f}장/초, 실패 {len(failures)}장)')
+
+    # 사용자 단위로 저장소에 기록 (모든 레코드에 같은 저장 시각 사용)
+    timestamp = time.time()
+    for user_name, manifest in sorted(manifests.items()):
+        manifest.sync_store(timestamp=timestamp)
+        manifest.save()
+
+    print(f'등록 완료: 성공 {len(tasks) - len(failures)}장, 실패 {len(failures)}장')
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="여러 사용자 얼굴 이미지 병렬 등록")
+    parser.add_argument("users", nargs="*", help="등록할 사용자 이름 (생략 시 전체)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본값: CPU 코어 수)")
+    args = parser.parse_args()
+
+    batch_enrollment(args.users or None, args.workers)
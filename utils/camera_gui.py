@@ -1,14 +1,20 @@
-import os
+import threading
+import numpy as np
 import cv2 as cv
 from tkinter import *           # Tkinter 라이브러리: GUI 생성
 from PIL import Image, ImageTk  # PIL(pillow) : OpenCV 이미지를 Tkinter에서 표시하기 위한 변환
+from config import DISPLAY_INTERVAL_MS
+from utils.frame_buffer import LatestFrameBuffer, CaptureThread
 
 
 class CameraApp:
-    def __init__(self, root):
+    def __init__(self, root, recognizer=None):
         """
         CameraApp 클래스 생성자
         GUI 초기화 수행 및 OpenCV를 통해 카메라 연결
+
+        :param root: Tkinter 창
+        :param recognizer: 실시간 인식 모드에서 사용할 LiveRecognizer 객체 (None이면 촬영 모드)
         """
 
         self.root = root                    # root : Tkinter 창으로, 여기에 GUI를 추가
@@ -21,6 +27,16 @@ class CameraApp:
             print("카메라를 열 수 없습니다.")
             exit()
 
+        # 카메라 프레임은 전용 스레드에서 읽어 최신 프레임 하나만 버퍼에 보관
+        ## Tkinter 루프는 버퍼의 최신 프레임만 화면에 표시하므로 카메라가 멈춰도 GUI가 멈추지 않음
+        self.frame_buffer = LatestFrameBuffer()
+        self.capture_thread = CaptureThread(self.cap, self.frame_buffer)
+        self.capture_thread.start()
+
+        # 화면 표시용 RGB 버퍼와 PhotoImage (프레임마다 새로 만들지 않고 재사용)
+        self.rgb_buffer = None
+        self.photo = None
+
         # Tkinter의 Label : 카메라 영상을 표시할 영역 할당
         self.video_frame = Label(self.root)
         # grid 레이아웃 : GUI 구성 요소 배치
@@ -37,6 +53,14 @@ class CameraApp:
         self.close_button = Button(self.root, text="종료", command=self.close_app)
         self.close_button.grid(row=1, column=1, pady=10)
 
+        # 실시간 인식 모드
+        ## 촬영 버튼 없이 스트리밍 프레임 일부를 인식하고, 결과를 Label에 표시
+        self.recognizer = recognizer
+        self.status_label = Label(self.root, text="")
+        if self.recognizer is not None:
+            self.capture_button.config(state=DISABLED)
+            self.status_label.grid(row=2, column=0, columnspan=2)
+
         # 캡처 이미지 저장 변수 (초기값 None)
         ## 사용자가 캡처한 이미지 저장
         self.captured_image = None
@@ -55,14 +79,10 @@ class CameraApp:
         OpenCV는 BGR 형식으로, Tkinter와 Pillow는 RGB 형식으로 이미지를 처리하기 때문에
         이미지 형태를 BGR -> RGV로 변환
         """
-        # 객체 self.cap을 이용해 현재 카메라 프레임 읽기
-        ## 캡처된 프레임은 Numpy 배열 형태로 반환
-        ## read() 메서드 반환 값 2가지
-        ### ret : 프레임이 성공적으로 읽혔는지 여부를 나타내는 Boolean 값
-        ### frame : 카메라에서 읽어 온 현재 프레임 (BGR 형태)
-        ret, frame = self.cap.read()
-
-        if ret:
+        # 캡처 스레드가 버퍼에 기록한 가장 최근 프레임 사용 (Numpy 배열, BGR 형태)
+        frame = self.frame_buffer.peek()
+
+        if frame is not None:
             # 캡처된 프레임 저장 (BGR 형식)
             self.captured_image = frame
             # 캡처 후 상태로 전환하며 스트리밍 중단
@@ -70,15 +90,7 @@ class CameraApp:
             print('이미지 촬영이 완료되었습니다.')
 
             # 캡처한 이미지를 Tkinter Label에 표시 (GUI 화면에 고정)
-            ## OpenCV의 BGR 이미지(Numpy 배열 이미지 형식)를 RGB 형식으로 변환
-            frame = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
-            ## Tkinter는 OpenCV의 Numpy 배열 이미지를 지원하지 않으므로 이를 위한 변환
-            ### Image.fromarray(frame) : Numpy 배열 이미지를 Pillow의 Image 객체로 변환
-            ### ImageTK.PhotoImage : Pillow의 Image 객체를 Tkinter에서 사용 가능한 객체로 변환
-            #### 이를 통해 Tkinter의 Label 위젯에 이미지를 표시할 수 있게 됨
-            self.photo = ImageTk.PhotoImage(image=Image.fromarray(frame))
-            # Tkinter Label에 형식이 변화된 이미지를 표시
-            self.video_frame.config(image=self.photo)
+            self.show_frame(frame)
         else:
             print('프레임을 읽지 못했습니다.')
             return
@@ -88,7 +100,11 @@ class CameraApp:
         """
         종료 버튼 클릭 또는 얼굴 인식 완료 시 Tkinter 창을 닫고 리소스 해제
         """
-        self.cap.release()      # 카메라 리소스 해제
+        # 캡처 스레드 종료 (카메라 리소스는 캡처 스레드가 읽기를 마친 후 직접 해제)
+        if not self.capture_thread.stop():
+            print('카메라 읽기가 끝나지 않아 캡처 스레드가 종료된 후 카메라를 해제합니다.')
+        stats = self.frame_buffer.stats()
+        print(f'프레임 통계: 캡처 {stats["captured"]}, 표시 {stats["displayed"]}, 버림 {stats["dropped"]}')
         self.root.quit()        # Tkinter 루프 종료
         self.root.destroy       # Tkinter 창 닫기
 
@@ -102,38 +118,84 @@ class CameraApp:
         return self.captured_image
 
 
+    def update_recognition(self, frame):
+        """
+        실시간 인식 모드에서 프레임을 인식기에 전달하고 결과를 화면에 표시
+        열림이 결정되면 해당 프레임을 캡처 이미지로 저장하고 잠시 후 창을 닫음
+
+        :param frame: OpenCV BGR 프레임
+        """
+        self.recognizer.submit(frame)
+        self.status_label.config(text=self.recognizer.status_text())
+
+        # 결정된 사용자와 결정까지 걸린 시간은 인식 스레드가 갱신하므로 한 번에 읽은 값을 사용
+        stats = self.recognizer.stats()
+        if stats['decision'] is not None and not self.is_captured:
+            self.captured_image = frame
+            self.is_captured = True
+            print(f'{stats["decision"]} 사용자 인식 (결정까지 {stats["time_to_decision"]:.2f}초, '
+                  f'화면 {stats["display_fps"]:.1f} FPS, 인식 {stats["recognition_fps"]:.1f} FPS)')
+            # 결과를 확인할 수 있도록 1초 후 종료
+            self.root.after(1000, self.close_app)
+
+
+    def show_frame(self, frame):
+        """
+        BGR 프레임을 Tkinter Label에 표시
+        RGB 버퍼와 PhotoImage를 재사용해 프레임마다 새 이미지 객체를 만들지 않음
+
+        :param frame: OpenCV BGR 프레임
+        """
+        height, width = frame.shape[:2]
+        # 해상도가 바뀐 경우에만 표시용 버퍼를 새로 할당
+        if self.rgb_buffer is None or self.rgb_buffer.shape != frame.shape:
+            self.rgb_buffer = np.empty_like(frame)
+            self.photo = None
+
+        # OpenCV의 BGR 이미지(Numpy 배열 이미지 형식)를 RGB 형식으로 변환 (dst 버퍼에 직접 기록)
+        cv.cvtColor(frame, cv.COLOR_BGR2RGB, dst=self.rgb_buffer)
+        ## Tkinter는 OpenCV의 Numpy 배열 이미지를 지원하지 않으므로 이를 위한 변환
+        ### Image.frombuffer : 복사 없이 RGB 버퍼를 Pillow의 Image 객체로 사용
+        ### ImageTK.PhotoImage : Pillow의 Image 객체를 Tkinter에서 사용 가능한 객체로 변환
+        #### 처음 한 번만 생성하고, 이후에는 paste()로 내용만 교체
+        image = Image.frombuffer('RGB', (width, height), self.rgb_buffer, 'raw', 'RGB', 0, 1)
+        if self.photo is None:
+            self.photo = ImageTk.PhotoImage(image=image)
+            # Tkinter Label에 형식이 변화된 이미지를 표시
+            self.video_frame.config(image=self.photo)
+        else:
+            self.photo.paste(image)
+
+
     def update_video_frame(self):
         """
-        카메라에서 실시간 프레임을 읽어와 Tkinter Label에 출력
+        캡처 스레드가 버퍼에 기록한 최신 프레임을 Tkinter Label에 출력
         """
         # 캡처 상태가 아니라면 계속 업데이트
         if not self.is_captured:
-            ret, frame = self.cap.read()
-            # 프레임 단위로 영상이 잘 읽어지고 있다면
-            if ret:
-                # OpenCV의 BGR 이미지(Numpy 배열 이미지 형식)를 RGB 형식으로 변환
-                frame = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
-                ## Tkinter는 OpenCV의 Numpy 배열 이미지를 지원하지 않으므로 이를 위한 변환
-                ### Image.fromarray(frame) : Numpy 배열 이미지를 Pillow의 Image 객체로 변환
-                ### ImageTK.PhotoImage : Pillow의 Image 객체를 Tkinter에서 사용 가능한 객체로 변환
-                #### 이를 통해 Tkinter의 Label 위젯에 이미지를 표시할 수 있게 됨
-                self.photo = ImageTk.PhotoImage(image=Image.fromarray(frame))
-                # Tkinter Label에 형식이 변화된 이미지를 표시
-                self.video_frame.config(image=self.photo)
-        # 10ms 후 다시 호출해 실시간 영상 업데이트 유지
-        self.root.after(10, self.update_video_frame)
-
-
-def run_CameraApp():
+            # 마지막 표시 이후 새 프레임이 있을 때만 화면 갱신
+            frame = self.frame_buffer.get_latest()
+            if frame is not None:
+                self.show_frame(frame)
+
+                # 실시간 인식 모드 : 프레임 전달 및 인식 상태 표시
+                if self.recognizer is not None:
+                    self.update_recognition(frame)
+        # 화면 갱신 주기(DISPLAY_INTERVAL_MS) 후 다시 호출해 실시간 영상 업데이트 유지
+        self.root.after(DISPLAY_INTERVAL_MS, self.update_video_frame)
+
+
+def run_CameraApp(recognizer=None):
     """
     CameraApp GUI를 실행하고, 캡처된 이미지를 반환
 
-    :return: OpenCV BGR 이미지 또는 None
+    :param recognizer: 실시간 인식 모드에서 사용할 LiveRecognizer 객체 (None이면 촬영 모드)
+    :return: OpenCV BGR 이미지 또는 None (실시간 인식 모드에서는 인식이 결정된 프레임)
     """
     # Tkinter root 창 생성
     root = Tk()
     # root를 매개변수로 전달하여 CameraApp 클래스 인스턴스 생성
-    app = CameraApp(root)
+    app = CameraApp(root, recognizer)
     # Tkinter 루프 실행 (GUI 띄우기)
     root.mainloop()
 
@@ -141,22 +203,40 @@ def run_CameraApp():
     return app.get_captured_image()
 
 
-def get_img_name(base_name="captured_img", extension=".jpg", path="../data/captured_images/"):
+def save_image_async(image, decision=-1, identity=None, archive=None):
     """
-    고유한 파일 이름을 생성하는 함수
-
-    :param base_name: 기본 파일 이름 (str)
-    :param extension: 파일 확장자 (str)
-    :param folder: 저장 경로 (str)
-    :return: 고유한 파일 이름 (str)
+    캡처 이미지를 백그라운드 스레드에서 캡처 아카이브에 저장 (기록용)
+    얼굴 인식 과정은 저장을 기다리지 않고 진행
+
+    :param image: OpenCV BGR 이미지
+    :param decision: 도어락 열림(1) / 닫힘(0) / 알 수 없음(-1)
+    :param identity: 인식된 사용자 이름 (None이면 빈 값)
+    :param archive: CaptureArchive 객체 (None이면 기본 아카이브)
+    :return: 저장을 수행하는 스레드
     """
-    i = 1
-    while True:
-        # 파일 이름 생성
-        filename = os.path.join(f'{path}{base_name}{i:02d}{extension}')
+    def _save():
+        try:
+            (archive or get_capture_archive()).append(image, decision=decision, identity=identity)
+        except (OSError, ValueError) as e:
+            print(f'이미지를 저장하지 못했습니다: {e}')
+
+    # daemon=False : 프로그램이 끝나기 전에 저장이 완료되도록 함
+    thread = threading.Thread(target=_save, daemon=False)
+    thread.start()
+    return thread
+
 
-        # 설정된 저장 경로에 동일한 이름의 파일이 존재하지 않으면 저장
-        if not os.path.exists(filename):
-            return filename
-        i += 1
+_capture_archive = None
 
+
+def get_capture_archive():
+    """
+    기본 캡처 아카이브 (CAPTURE_ARCHIVE_DIR, 처음 사용할 때 열기)
+
+    :return: CaptureArchive 객체
+    """
+    global _capture_archive
+    if _capture_archive is None:
+        from utils.capture_archive import CaptureArchive
+        _capture_archive = CaptureArchive()
+    return _capture_archive
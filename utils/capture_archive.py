@@ -0,0 +1,430 @@
+import os
+import re
+import glob
+import time
+import zlib
+import struct
+import argparse
+import threading
+from contextlib import contextmanager
+import numpy as np
+import cv2 as cv
+try:
+    import fcntl
+except ImportError:
+    # Windows : 프로세스 간 잠금 없이 스레드 잠금만 사용
+    fcntl = None
+from config import (CAPTURED_DIR, CAPTURE_ARCHIVE_DIR, CAPTURE_SEGMENT_BYTES, CAPTURE_RETENTION_BYTES,
+                    CAPTURE_RETENTION_DAYS, CAPTURE_ARCHIVE_FSYNC)
+from utils import metrics
+
+"""
+    : 캡처 이미지를 파일 하나씩 저장하는 대신 추가 전용(append-only) 세그먼트 파일에 이어서 저장
+    : 파일 구조 (CAPTURE_ARCHIVE_DIR)
+        - segment_{번호}.seg : 레코드 헤더(매직, 시각, 결정, 사용자, 길이, CRC32) + JPEG 바이트를 이어서 기록
+        - segment_{번호}.idx : 레코드 별 고정 길이 색인 (위치, 길이, 시각, 결정, 사용자, CRC32)
+    : 저장은 파일 끝에 덧붙이기만 하므로 파일 수와 관계없이 O(1)이며, 같은 이름을 두고 경쟁하지 않음
+    : 세그먼트 안의 레코드는 시각 순서이므로 시간 범위 검색은 세그먼트 범위 확인 + 이진 탐색
+    : 세그먼트가 CAPTURE_SEGMENT_BYTES를 넘으면 새 세그먼트를 시작하고,
+      전체 크기(CAPTURE_RETENTION_BYTES)나 보관 기간(CAPTURE_RETENTION_DAYS)을 넘은 오래된 세그먼트는 삭제
+    : 기록 중 중단된 경우 다음 실행 시 마지막 세그먼트를 검사해 색인을 복구하고 불완전한 레코드를 잘라냄
+
+    실행 방법 (프로젝트 루트에서)
+        python -m utils.capture_archive import                 # data/captured_images의 JPEG 가져오기
+        python -m utils.capture_archive info
+        python -m utils.capture_archive export --start 2024-06-01 --end 2024-06-02 --output exported/
+"""
+
+RECORD_MAGIC = b'CAPR'
+
+# 레코드 헤더: 매직(4s), 시각(d), 결정(b), 사용자(32s), 이미지 길이(I), CRC32(I)
+RECORD_HEADER = struct.Struct('<4sdb32sII')
+
+# 결정 값 : 열림(1), 닫힘(0), 알 수 없음(-1, 결정 전에 저장한 프레임)
+DECISION_UNKNOWN = -1
+
+INDEX_DTYPE = np.dtype([
+    ('offset', '<u8'),          # 세그먼트 파일 안에서 레코드 헤더 위치
+    ('length', '<u4'),          # 이미지 길이 (bytes)
+    ('timestamp', '<f8'),       # 캡처 시각 (UNIX time)
+    ('decision', 'i1'),         # 열림(1) / 닫힘(0) / 알 수 없음(-1)
+    ('identity', 'S32'),        # 인식된 사용자 이름 (UTF-8)
+    ('crc', '<u4'),             # 이미지 CRC32
+])
+
+SEGMENT_PATTERN = re.compile(r'segment_(\d{6})\.seg$')
+
+
+class CaptureArchive:
+    def __init__(self, path=CAPTURE_ARCHIVE_DIR, segment_bytes=CAPTURE_SEGMENT_BYTES,
+                 retention_bytes=CAPTURE_RETENTION_BYTES, retention_days=CAPTURE_RETENTION_DAYS,
+                 fsync=CAPTURE_ARCHIVE_FSYNC):
+        """
+        CaptureArchive 클래스 생성자
+
+        :param path: 아카이브 폴더
+        :param segment_bytes: 새 세그먼트를 시작하는 크기 (bytes)
+        :param retention_bytes: 전체 보관 크기 (bytes, None이면 제한 없음)
+        :param retention_days: 보관 기간 (일, None이면 제한 없음)
+        :param fsync: 레코드마다 디스크에 기록을 확정할지 여부 (bool)
+        """
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.retention_bytes = retention_bytes
+        self.retention_days = retention_days
+        self.fsync = fsync
+        self.lock = threading.Lock()
+
+        os.makedirs(path, exist_ok=True)
+        # 세그먼트 번호 목록 (오름차순)
+        with self.locked():
+            self.refresh()
+            if self.segments:
+                self.recover(self.segments[-1])
+                self.enforce_retention()
+
+    @contextmanager
+    def locked(self):
+        """
+        같은 아카이브에 기록하는 다른 스레드/프로세스와 순서를 맞추기 위한 잠금
+        """
+        with self.lock, open(os.path.join(self.path, 'archive.lock'), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def segment_path(self, number):
+        return os.path.join(self.path, f'segment_{number:06d}.seg')
+
+    def index_path(self, number):
+        return os.path.join(self.path, f'segment_{number:06d}.idx')
+
+    def read_index(self, number):
+        """
+        세그먼트 색인을 np.memmap으로 열기 (복사 없음)
+
+        :param number: 세그먼트 번호
+        :return: INDEX_DTYPE 구조의 1차원 배열
+        """
+        path = self.index_path(number)
+        count = os.path.getsize(path) // INDEX_DTYPE.itemsize if os.path.exists(path) else 0
+        if count == 0:
+            return np.zeros(0, dtype=INDEX_DTYPE)
+        return np.memmap(path, dtype=INDEX_DTYPE, mode='r', shape=(count, ))
+
+    def recover(self, number):
+        """
+        기록 중 중단된 세그먼트 복구
+            - 색인의 불완전한 마지막 항목 제거
+            - 색인에 없는 세그먼트 레코드는 CRC를 확인해 색인에 추가
+            - 불완전한 마지막 레코드는 잘라냄
+
+        :param number: 세그먼트 번호
+        :return: 복구한 레코드 수 (int)
+        """
+        index_path = self.index_path(number)
+        segment_path = self.segment_path(number)
+        if not os.path.exists(index_path):
+            open(index_path, 'wb').close()
+        index_size = os.path.getsize(index_path)
+        if index_size % INDEX_DTYPE.itemsize:
+            with open(index_path, 'r+b') as f:
+                f.truncate(index_size - index_size % INDEX_DTYPE.itemsize)
+
+        index = self.read_index(number)
+        end = int(index['offset'][-1]) + RECORD_HEADER.size + int(index['length'][-1]) if len(index) else 0
+        last_timestamp = float(index['timestamp'][-1]) if len(index) else -np.inf
+        del index
+
+        recovered = []
+        with open(segment_path, 'r+b') as f:
+            f.seek(end)
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+                magic, timestamp, decision, identity, length, crc = RECORD_HEADER.unpack(header)
+                data = f.read(length)
+                if magic != RECORD_MAGIC or len(data) < length or zlib.crc32(data) != crc or timestamp < last_timestamp:
+                    break
+                recovered.append((end, length, timestamp, decision, identity, crc))
+                end += RECORD_HEADER.size + length
+                last_timestamp = timestamp
+            f.truncate(end)
+
+        if recovered:
+            with open(index_path, 'ab') as f:
+                f.write(np.array(recovered, dtype=INDEX_DTYPE).tobytes())
+            print(f'캡처 아카이브 세그먼트 {number}: {len(recovered)}개의 레코드 색인을 복구했습니다.')
+
+        return len(recovered)
+
+    def refresh(self):
+        """
+        다른 프로세스가 만들거나 삭제한 세그먼트를 반영해 세그먼트 번호 목록 갱신
+        """
+        self.segments = sorted(int(SEGMENT_PATTERN.search(name).group(1))
+                               for name in os.listdir(self.path) if SEGMENT_PATTERN.search(name))
+
+    def _last_timestamp(self, number):
+        """
+        세그먼트 마지막 레코드의 시각 (색인 끝 항목 하나만 읽음)
+
+        :return: float (레코드가 없으면 None)
+        """
+        with open(self.index_path(number), 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < INDEX_DTYPE.itemsize:
+                return None
+            f.seek(-INDEX_DTYPE.itemsize, os.SEEK_END)
+            return float(np.frombuffer(f.read(INDEX_DTYPE.itemsize), dtype=INDEX_DTYPE)['timestamp'][0])
+
+    def _open_segment(self, timestamp=None):
+        """
+        기록할 세그먼트 번호와 레코드 시각 (크기를 넘었거나 시각이 거꾸로 가는 경우 새 세그먼트 시작)
+        시각을 지정하지 않으면 잠금 안에서 현재 시각을 정하고 마지막 레코드보다 이르지 않도록 맞춤
+        (여러 스레드/프로세스가 동시에 기록해도 순서가 뒤바뀌어 세그먼트가 늘어나지 않음)
+
+        :param timestamp: 기록할 레코드의 시각 (None이면 현재 시각)
+        :return: (세그먼트 번호, 레코드 시각) 튜플
+        """
+        self.refresh()
+        assign = timestamp is None
+        if assign:
+            timestamp = time.time()
+        if self.segments:
+            number = self.segments[-1]
+            last = self._last_timestamp(number)
+            if assign and last is not None:
+                timestamp = max(timestamp, last)
+            in_order = last is None or timestamp >= last
+            if in_order and os.path.getsize(self.segment_path(number)) < self.segment_bytes:
+                return number, timestamp
+
+        number = self.segments[-1] + 1 if self.segments else 1
+        open(self.segment_path(number), 'ab').close()
+        open(self.index_path(number), 'ab').close()
+        self.segments.append(number)
+        self.enforce_retention()
+        return number, timestamp
+
+    def _append_bytes(self, path, data):
+        """
+        파일 끝에 한 번의 write로 추가 (O_APPEND)
+
+        :return: 추가한 위치 (bytes)
+        """
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | getattr(os, 'O_BINARY', 0))
+        try:
+            view = memoryview(data)
+            written = 0
+            while written < len(view):
+                written += os.write(fd, view[written:])
+            return os.lseek(fd, 0, os.SEEK_CUR) - len(data)
+        finally:
+            if self.fsync:
+                os.fsync(fd)
+            os.close(fd)
+
+    def append(self, image, timestamp=None, decision=DECISION_UNKNOWN, identity=None, quality=90):
+        """
+        캡처 이미지를 현재 세그먼트 끝에 추가
+
+        :param image: OpenCV BGR 이미지 또는 인코딩된 JPEG 바이트
+        :param timestamp: 캡처 시각 (None이면 기록 순서에 맞춘 현재 시각)
+        :param decision: 열림(1) / 닫힘(0) / 알 수 없음(-1)
+        :param identity: 인식된 사용자 이름 (None이면 빈 값)
+        :param quality: JPEG 품질 (이미지를 인코딩하는 경우)
+        :return: (세그먼트 번호, 색인 위치) 튜플
+        """
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            data = bytes(image)
+        else:
+            ok, encoded = cv.imencode('.jpg', image, [cv.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                raise ValueError('이미지를 JPEG로 인코딩할 수 없습니다.')
+            data = encoded.tobytes()
+
+        timestamp = None if timestamp is None else float(timestamp)
+        # 사용자 필드(32 bytes)보다 긴 이름은 문자 중간이 잘리지 않도록 문자 경계에서 자름
+        identity_bytes = (identity or '').encode('utf-8')[:32].decode('utf-8', errors='ignore').encode('utf-8')
+        crc = zlib.crc32(data)
+
+        with self.locked(), metrics.stage("disk_io"):
+            number, timestamp = self._open_segment(timestamp)
+            record = RECORD_HEADER.pack(RECORD_MAGIC, timestamp, decision, identity_bytes, len(data), crc) + data
+
+            # 이미지 레코드를 먼저 기록하고, 색인은 그 후에 추가 (색인이 가리키는 레코드는 항상 완전함)
+            offset = self._append_bytes(self.segment_path(number), record)
+            entry = np.array([(offset, len(data), timestamp, decision, identity_bytes, crc)], dtype=INDEX_DTYPE)
+            position = self._append_bytes(self.index_path(number), entry.tobytes()) // INDEX_DTYPE.itemsize
+
+        return number, position
+
+    def query(self, start=None, end=None, decision=None):
+        """
+        시간 범위 [start, end) 안의 캡처 색인 검색
+
+        :param start: 시작 시각 (UNIX time, None이면 처음부터)
+        :param end: 끝 시각 (UNIX time, None이면 끝까지)
+        :param decision: 결정 값으로 거르기 (None이면 전체)
+        :return: [(세그먼트 번호, 색인 항목), ...] 리스트 (시각 순)
+        """
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+
+        results = []
+        for number in list(self.segments):
+            index = self.read_index(number)
+            if len(index) == 0 or index['timestamp'][0] >= end or index['timestamp'][-1] < start:
+                continue
+            timestamps = index['timestamp']
+            lo, hi = np.searchsorted(timestamps, [start, end], side='left')
+            rows = np.arange(lo, hi)
+            if decision is not None:
+                rows = rows[index['decision'][lo:hi] == decision]
+            results.extend((number, index[row].copy()) for row in rows)
+
+        results.sort(key=lambda item: item[1]['timestamp'])
+        return results
+
+    def read(self, number, entry, verify=True):
+        """
+        색인 항목의 JPEG 바이트 읽기
+
+        :param number: 세그먼트 번호
+        :param entry: query()가 반환한 색인 항목
+        :param verify: CRC32 확인 여부 (bool)
+        :return: JPEG 바이트
+        """
+        with open(self.segment_path(number), 'rb') as f:
+            f.seek(int(entry['offset']) + RECORD_HEADER.size)
+            data = f.read(int(entry['length']))
+        if verify and zlib.crc32(data) != int(entry['crc']):
+            raise ValueError(f'캡처 이미지가 손상되었습니다: 세그먼트 {number}, 위치 {int(entry["offset"])}')
+        return data
+
+    def read_image(self, number, entry):
+        """
+        색인 항목의 이미지를 BGR 배열로 읽기
+
+        :return: OpenCV BGR 이미지
+        """
+        return cv.imdecode(np.frombuffer(self.read(number, entry), dtype=np.uint8), cv.IMREAD_COLOR)
+
+    def segment_info(self):
+        """
+        세그먼트 별 크기와 시간 범위
+
+        :return: [{'number', 'bytes', 'count', 'first', 'last'}, ...] 리스트
+        """
+        info = []
+        for number in list(self.segments):
+            index = self.read_index(number)
+            info.append({
+                'number': number,
+                'bytes': os.path.getsize(self.segment_path(number)) + os.path.getsize(self.index_path(number)),
+                'count': len(index),
+                'first': float(index['timestamp'][0]) if len(index) else None,
+                'last': float(index['timestamp'][-1]) if len(index) else None,
+            })
+        return info
+
+    def enforce_retention(self, now=None):
+        """
+        보관 크기나 기간을 넘은 오래된 세그먼트 삭제 (기록 중인 마지막 세그먼트는 삭제하지 않음)
+
+        :param now: 기준 시각 (None이면 현재 시각)
+        :return: 삭제한 세그먼트 수 (int)
+        """
+        now = time.time() if now is None else now
+        info = self.segment_info()
+        total = sum(segment['bytes'] for segment in info)
+
+        removed = 0
+        for segment in info[:-1]:
+            too_old = (self.retention_days is not None and segment['last'] is not None
+                       and segment['last'] < now - self.retention_days * 86400)
+            too_big = self.retention_bytes is not None and total > self.retention_bytes
+            if not (too_old or too_big):
+                break
+            os.remove(self.segment_path(segment['number']))
+            os.remove(self.index_path(segment['number']))
+            self.segments.remove(segment['number'])
+            total -= segment['bytes']
+            removed += 1
+
+        return removed
+
+    def import_directory(self, folder=CAPTURED_DIR, patterns=('*.jpg', '*.jpeg', '*.png')):
+        """
+        기존 캡처 이미지 폴더의 파일을 아카이브로 가져오기 (파일 수정 시각 순, 원본 바이트 그대로 저장)
+        가져온 파일 이름은 imported.txt에 기록해 다시 가져오지 않음
+
+        :param folder: 이미지 폴더
+        :param patterns: 가져올 파일 이름 패턴
+        :return: 가져온 파일 수 (int)
+        """
+        log_path = os.path.join(self.path, 'imported.txt')
+        imported = set()
+        if os.path.exists(log_path):
+            with open(log_path, encoding='utf-8') as f:
+                imported = set(line.rstrip('\n') for line in f)
+
+        paths = sorted(set(path for pattern in patterns for path in glob.glob(os.path.join(folder, pattern))),
+                       key=os.path.getmtime)
+        added = 0
+        with open(log_path, 'a', encoding='utf-8') as log:
+            for path in paths:
+                key = os.path.abspath(path)
+                if key in imported:
+                    continue
+                with open(path, 'rb') as f:
+                    data = f.read()
+                self.append(data, timestamp=os.path.getmtime(path))
+                log.write(key + '\n')
+                added += 1
+
+        return added
+
+
+def parse_time(value):
+    """
+    명령행 시각 문자열을 UNIX time으로 변환 (YYYY-MM-DD 또는 YYYY-MM-DDTHH:MM:SS)
+    """
+    if value is None:
+        return None
+    for pattern in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            return time.mktime(time.strptime(value, pattern))
+        except ValueError:
+            continue
+    raise ValueError(f'시각 형식이 올바르지 않습니다: {value}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="캡처 이미지 아카이브")
+    parser.add_argument("command", choices=["import", "info", "export"])
+    parser.add_argument("--folder", default=CAPTURED_DIR, help="가져올 이미지 폴더 (import)")
+    parser.add_argument("--start", help="시작 시각 (export)")
+    parser.add_argument("--end", help="끝 시각 (export)")
+    parser.add_argument("--output", default="exported_captures/", help="내보낼 폴더 (export)")
+    args = parser.parse_args()
+
+    archive = CaptureArchive()
+    if args.command == "import":
+        print(f'{archive.import_directory(args.folder)}개의 이미지를 가져왔습니다.')
+    elif args.command == "export":
+        entries = archive.query(parse_time(args.start), parse_time(args.end))
+        os.makedirs(args.output, exist_ok=True)
+        for number, entry in entries:
+            name = time.strftime('%Y%m%d_%H%M%S', time.localtime(entry['timestamp']))
+            path = os.path.join(args.output, f'{name}_{number:06d}_{int(entry["offset"])}.jpg')
+            with open(path, 'wb') as f:
+                f.write(archive.read(number, entry))
+        print(f'{len(entries)}개의 이미지를 내보냈습니다: {args.output}')
+
+    for segment in archive.segment_info():
+        first = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(segment['first'])) if segment['first'] else '-'
+        last = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(segment['last'])) if segment['last'] else '-'
+        print(f'세그먼트 {segment["number"]}: {segment["count"]}장, {segment["bytes"] / 1e6:.1f} MB ({first} ~ {last})')
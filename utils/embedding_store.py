@@ -0,0 +1,393 @@
+import os
+import sys
+import glob
+import time
+import struct
+import hashlib
+import threading
+from contextlib import contextmanager
+import numpy as np
+try:
+    import fcntl
+except ImportError:
+    # Windows : 프로세스 간 잠금 없이 스레드 잠금만 사용
+    fcntl = None
+from config import VECTOR_DIR, STORE_PATH, LEGACY_VECTOR_DIR, ENCODER_VERSION, get_vector_data_path
+from utils import metrics
+
+"""
+    : 전체 사용자의 얼굴 벡터를 하나의 추가 전용(append-only) 파일에 저장
+    : 파일 구조
+        - 헤더 (64 bytes) : 매직 문자열, 형식 버전, 레코드 크기, 벡터 차원, 다시 쓴 횟수(세대), 삭제 표시 누적 수
+        - 레코드 (고정 길이) : 사용자 이름, 원본 이미지, 저장 시각, 추출기 버전, 삭제 표시, 128차원 벡터
+    : 등록 시에는 레코드를 파일 끝에 덧붙이기만 하고, 읽을 때는 np.memmap으로 열어 복사 없이 사용
+    : 레코드 추가, 삭제 표시, 다시 쓰기는 파일 잠금({저장소 경로}.lock)으로 다른 등록/압축 프로세스와 순서를 맞춤
+
+    실행 방법 (프로젝트 루트에서)
+        python -m utils.embedding_store migrate   # 기존 .npy 파일을 저장소로 가져오기
+        python -m utils.embedding_store info      # 사용자 별 벡터 개수 출력
+        python -m utils.embedding_store quantize int8   # Gallery용 float16/int8 벡터 파일 생성
+        python -m utils.embedding_store rewrite   # 삭제 표시된 레코드를 제외하고 파일 다시 쓰기
+"""
+
+MAGIC = b'FACEEMB\0'
+FORMAT_VERSION = 1
+HEADER_SIZE = 64
+VECTOR_DIM = 128
+
+# 헤더: 매직(8s), 형식 버전(I), 레코드 크기(I), 벡터 차원(I)
+HEADER_FORMAT = '<8sIII'
+
+# 헤더 여백에 기록하는 상태: 세대(I, rewrite() 마다 증가), 삭제 표시 누적 수(Q)
+## 이전 버전 파일은 여백이 0이므로 세대 0, 삭제 0으로 읽힘
+STATE_FORMAT = '<IQ'
+STATE_OFFSET = struct.calcsize(HEADER_FORMAT)
+
+# 레코드 삭제 표시
+FLAG_DELETED = 1
+
+RECORD_DTYPE = np.dtype([
+    ('user', 'S32'),                        # 사용자 이름 (UTF-8)
+    ('source', 'S128'),                     # 원본 이미지 경로 (UTF-8)
+    ('timestamp', '<f8'),                   # 저장 시각 (UNIX time)
+    ('encoder', 'S16'),                     # 벡터 추출기 버전
+    ('flags', 'u1'),                        # 삭제 표시 등
+    ('reserved', 'V7'),                     # 정렬을 위한 여백
+    ('vector', '<f4', (VECTOR_DIM, )),      # 128차원 얼굴 벡터
+])
+
+
+# 원본 경로가 source 필드보다 길 때 잘라낸 뒤에 붙이는 해시 길이 ('#' + 16자리)
+SOURCE_HASH_LENGTH = 17
+
+
+def stored_source(source):
+    """
+    저장소 source 필드에 기록되는 원본 이미지 경로
+    필드 크기(UTF-8 128 bytes)보다 긴 경로는 문자 경계에서 자른 후 전체 경로의 해시를 붙여 서로 구분되도록 함
+
+    :param source: 원본 이미지 경로 (str)
+    :return: 필드에 들어가는 경로 (str)
+    """
+    encoded = source.encode('utf-8')
+    size = RECORD_DTYPE['source'].itemsize
+    if len(encoded) <= size:
+        return source
+    prefix = encoded[:size - SOURCE_HASH_LENGTH].decode('utf-8', errors='ignore')
+    return f'{prefix}#{hashlib.sha256(encoded).hexdigest()[:SOURCE_HASH_LENGTH - 1]}'
+
+
+def _encode_field(value, field):
+    """
+    고정 길이 문자열 필드에 기록할 UTF-8 바이트 (필드보다 길면 ValueError)
+
+    :param value: 기록할 문자열
+    :param field: RECORD_DTYPE 필드 이름
+    :return: bytes
+    """
+    encoded = value.encode('utf-8')
+    size = RECORD_DTYPE[field].itemsize
+    if len(encoded) > size:
+        raise ValueError(f'{field} 값이 너무 깁니다: {value} (UTF-8 {len(encoded)} bytes, 최대 {size} bytes)')
+    return encoded
+
+
+class EmbeddingStore:
+    def __init__(self, path=STORE_PATH):
+        """
+        EmbeddingStore 클래스 생성자
+
+        :param path: 저장소 파일 경로
+        """
+        self.path = path
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def locked(self):
+        """
+        같은 저장소에 기록하는 다른 스레드/프로세스(일괄 등록, 증분 등록, 압축)와 순서를 맞추기 위한 잠금
+        (잘린 레코드 정리, 레코드 추가, 헤더 수정이 서로 겹치지 않도록 함)
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self.lock, open(self.path + '.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _check_header(self, f):
+        """
+        파일 헤더를 읽어 형식이 맞는지 확인
+
+        :param f: 바이너리 모드로 열린 저장소 파일
+        """
+        magic, version, record_size, dim = struct.unpack_from(HEADER_FORMAT, f.read(HEADER_SIZE))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f'얼굴 벡터 저장소 형식이 아닙니다: {self.path}')
+        if record_size != RECORD_DTYPE.itemsize or dim != VECTOR_DIM:
+            raise ValueError(f'저장소 레코드 형식이 다릅니다: {self.path}')
+
+    def _read_state(self):
+        """
+        헤더의 세대와 삭제 표시 누적 수
+
+        :return: (세대, 삭제 표시 누적 수) 튜플
+        """
+        if not os.path.exists(self.path):
+            return 0, 0
+        with open(self.path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            return 0, 0
+        return struct.unpack_from(STATE_FORMAT, header, STATE_OFFSET)
+
+    def generation(self):
+        """
+        저장소를 다시 쓴 횟수 (바뀌면 레코드 위치가 달라짐)
+
+        :return: int
+        """
+        return self._read_state()[0]
+
+    def version(self):
+        """
+        저장소 내용의 버전 (레코드 추가, 삭제 표시, 다시 쓰기마다 바뀜)
+        저장소에서 만든 파일(변환된 벡터, 색인 등)이 최신인지 확인하는 데 사용
+
+        :return: [세대, 레코드 수, 삭제 표시 누적 수] 리스트
+        """
+        generation, deletions = self._read_state()
+        return [generation, self.count(), deletions]
+
+    def count(self):
+        """
+        저장된 레코드 수 (기록 중 중단되어 잘린 마지막 레코드는 제외)
+
+        :return: 레코드 수 (int)
+        """
+        if not os.path.exists(self.path):
+            return 0
+        return max(os.path.getsize(self.path) - HEADER_SIZE, 0) // RECORD_DTYPE.itemsize
+
+    def append(self, user_name, vectors, sources=None, timestamp=None, encoder=ENCODER_VERSION):
+        """
+        사용자 얼굴 벡터를 저장소 끝에 레코드로 추가 (기존 데이터는 다시 쓰지 않음)
+
+        :param user_name: 사용자 이름
+        :param vectors: (N, 128) 형태의 얼굴 벡터
+        :param sources: 벡터 별 원본 이미지 경로 리스트 (None이면 빈 값, 긴 경로는 stored_source()로 줄여서 기록)
+        :param timestamp: 저장 시각 (None이면 현재 시각)
+        :param encoder: 벡터 추출기 버전 (str)
+        :return: 추가된 레코드 수 (int)
+        :raises ValueError: 사용자 이름이나 추출기 버전이 필드보다 긴 경우 (잘라서 저장하면 다른 사용자와 섞일 수 있음)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, VECTOR_DIM)
+        if len(vectors) == 0:
+            return 0
+
+        records = np.zeros(len(vectors), dtype=RECORD_DTYPE)
+        records['user'] = _encode_field(user_name, 'user')
+        records['source'] = [stored_source(s).encode('utf-8') for s in sources] if sources is not None else b''
+        records['timestamp'] = time.time() if timestamp is None else timestamp
+        records['encoder'] = _encode_field(encoder, 'encoder')
+        records['vector'] = vectors
+
+        with self.locked():
+            if not os.path.exists(self.path):
+                with open(self.path, 'wb') as f:
+                    f.write(struct.pack(HEADER_FORMAT, MAGIC, FORMAT_VERSION, RECORD_DTYPE.itemsize, VECTOR_DIM)
+                            .ljust(HEADER_SIZE, b'\0'))
+
+            with open(self.path, 'r+b') as f, metrics.stage("disk_io"):
+                self._check_header(f)
+
+                # 이전 기록이 중단되어 남은 불완전한 레코드는 잘라냄 (다른 프로세스가 기록 중인 레코드는 잠금으로 보호)
+                end = HEADER_SIZE + self.count() * RECORD_DTYPE.itemsize
+                f.truncate(end)
+                f.seek(end)
+                f.write(records.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        return len(records)
+
+    def records(self, mode='r'):
+        """
+        저장소 전체 레코드를 np.memmap으로 열기 (데이터 복사 없음)
+
+        :param mode: 'r' (읽기 전용) 또는 'r+' (삭제 표시 수정)
+        :return: RECORD_DTYPE 구조의 1차원 배열
+        """
+        count = self.count()
+        if count == 0:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+
+        with open(self.path, 'rb') as f:
+            self._check_header(f)
+
+        return np.memmap(self.path, dtype=RECORD_DTYPE, mode=mode, offset=HEADER_SIZE, shape=(count, ))
+
+    def live_mask(self, records, user_name=None):
+        """
+        삭제되지 않은 (그리고 지정한 사용자의) 레코드 표시
+
+        :param records: records()가 반환한 배열
+        :param user_name: 사용자 이름 (None이면 전체)
+        :return: bool 배열
+        """
+        mask = (records['flags'] & FLAG_DELETED) == 0
+        if user_name is not None:
+            mask &= records['user'] == user_name.encode('utf-8')
+        return mask
+
+    def users(self):
+        """
+        저장소에 벡터가 있는 사용자 이름 목록
+
+        :return: 정렬된 사용자 이름 리스트
+        """
+        records = self.records()
+        names = np.unique(records['user'][self.live_mask(records)])
+        return [name.decode('utf-8') for name in names]
+
+    def user_vectors(self, user_name):
+        """
+        {user_name} 사용자의 삭제되지 않은 얼굴 벡터
+
+        :param user_name: 사용자 이름
+        :return: (N, 128) float32 배열
+        """
+        records = self.records()
+        return np.array(records['vector'][self.live_mask(records, user_name)], dtype=np.float32)
+
+    def mark_deleted(self, indices):
+        """
+        레코드에 삭제 표시 (파일을 다시 쓰지 않고 해당 레코드의 flags만 수정)
+
+        :param indices: 삭제할 레코드 위치 배열
+        :return: 새로 삭제 표시한 레코드 수 (int, 이미 삭제된 레코드와 중복된 위치는 제외)
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        if len(indices) == 0:
+            return 0
+
+        with self.locked():
+            records = self.records(mode='r+')
+            indices = np.unique(indices)
+            newly_deleted = int(np.count_nonzero((records['flags'][indices] & FLAG_DELETED) == 0))
+            if newly_deleted == 0:
+                return 0
+            records['flags'][indices] |= FLAG_DELETED
+            records.flush()
+            del records
+
+            # 헤더의 삭제 표시 누적 수 갱신
+            with open(self.path, 'r+b') as f:
+                generation, deletions = struct.unpack_from(STATE_FORMAT, f.read(HEADER_SIZE), STATE_OFFSET)
+                f.seek(STATE_OFFSET)
+                f.write(struct.pack(STATE_FORMAT, generation, deletions + newly_deleted))
+                f.flush()
+                os.fsync(f.fileno())
+
+            return newly_deleted
+
+    def rewrite(self):
+        """
+        삭제 표시된 레코드를 제외하고 저장소 파일을 다시 씀 (임시 파일에 쓴 후 교체)
+        레코드 위치가 바뀌므로 세대가 1 증가하며, 이전 세대로 만든 색인은 다시 생성해야 함
+
+        :return: 제거한 레코드 수 (int)
+        """
+        with self.locked():
+            records = self.records()
+            live = records[self.live_mask(records)]
+            generation, _ = self._read_state()
+
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'wb') as f, metrics.stage("disk_io"):
+                header = struct.pack(HEADER_FORMAT, MAGIC, FORMAT_VERSION, RECORD_DTYPE.itemsize, VECTOR_DIM)
+                header += struct.pack(STATE_FORMAT, generation + 1, 0)
+                f.write(header.ljust(HEADER_SIZE, b'\0'))
+                f.write(live.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            removed = len(records) - len(live)
+            del records, live
+            os.replace(temp_path, self.path)
+            return removed
+
+
+def load_user_vectors(user_name, store=None):
+    """
+    {user_name} 사용자의 얼굴 벡터 로드
+    저장소에 없는 사용자는 기존 vector_data_{user_name}.npy 파일에서 로드
+
+    :param user_name: 사용자 이름
+    :param store: EmbeddingStore 객체 (None이면 기본 저장소)
+    :return: (N, 128) float32 배열
+    """
+    store = store or EmbeddingStore()
+    vectors = store.user_vectors(user_name)
+    if len(vectors) == 0 and os.path.exists(get_vector_data_path(user_name)):
+        vectors = np.load(get_vector_data_path(user_name)).astype(np.float32).reshape(-1, VECTOR_DIM)
+
+    return vectors
+
+
+def migrate_npy_files(store=None, vector_dir=VECTOR_DIR, legacy_dir=LEGACY_VECTOR_DIR):
+    """
+    기존 .npy 벡터 파일을 저장소로 가져오기
+        - VECTOR_DIR/vector_data_{user_name}.npy
+        - database/{user_name}_vector_data.npy (assignment3.py 형식)
+    이미 가져온 파일(같은 source 값)은 다시 추가하지 않음
+
+    :param store: EmbeddingStore 객체 (None이면 기본 저장소)
+    :param vector_dir: 벡터 파일 폴더
+    :param legacy_dir: 이전 과제의 벡터 파일 폴더
+    :return: 추가한 레코드 수 (int)
+    """
+    store = store or EmbeddingStore()
+    files = [(os.path.basename(p)[len('vector_data_'):-len('.npy')], p)
+             for p in sorted(glob.glob(os.path.join(vector_dir, 'vector_data_*.npy')))]
+    files += [(os.path.basename(p)[:-len('_vector_data.npy')], p)
+              for p in sorted(glob.glob(os.path.join(legacy_dir, '*_vector_data.npy')))]
+
+    imported = set(store.records()['source'])
+    added = 0
+    for user_name, file_path in files:
+        vectors = np.load(file_path).reshape(-1, VECTOR_DIM)
+        sources = [f'{file_path}#{i}' for i in range(len(vectors))]
+        if sources and stored_source(sources[0]).encode('utf-8') in imported:
+            print(f'이미 가져온 파일입니다: {file_path}')
+            continue
+
+        added += store.append(user_name, vectors, sources, timestamp=os.path.getmtime(file_path))
+        print(f'{user_name}: {len(vectors)}개의 벡터를 가져왔습니다. ({file_path})')
+
+    return added
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "info"
+    store = EmbeddingStore()
+
+    if command == "migrate":
+        print(f'총 {migrate_npy_files(store)}개의 벡터를 저장소에 추가했습니다.')
+    elif command == "quantize":
+        from config import get_quantized_dir
+        from models.gallery import Gallery
+
+        vector_format = sys.argv[2] if len(sys.argv) > 2 else "int8"
+        gallery = Gallery.from_store(store, vector_format)
+        gallery.save_quantized(get_quantized_dir(vector_format), source_version=store.version())
+        print(f'{vector_format} 형식으로 {len(gallery)}개의 벡터를 저장했습니다: '
+              f'{gallery.matrix.nbytes / 1e6:.2f} MB ({get_quantized_dir(vector_format)})')
+    elif command == "rewrite":
+        before = os.path.getsize(store.path) if os.path.exists(store.path) else 0
+        removed = store.rewrite() if before else 0
+        print(f'삭제 표시된 레코드 {removed}개를 제거했습니다: {before / 1e6:.2f} MB -> '
+              f'{os.path.getsize(store.path) / 1e6 if before else 0:.2f} MB '
+              f'(근사 최근접 이웃 색인을 사용 중이면 python -m models.ann_index build 로 다시 생성)')
+
+    for name in store.users():
+        print(f'{name}님의 얼굴 벡터 데이터: {len(store.user_vectors(name))}개의 벡터')
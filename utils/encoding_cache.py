@@ -0,0 +1,210 @@
+import time
+from collections import OrderedDict
+import numpy as np
+import cv2 as cv
+from config import (ENCODING_CACHE_ENABLED, ENCODING_CACHE_SIZE, ENCODING_CACHE_TTL, ENCODING_CACHE_MAX_DISTANCE,
+                    ENCODING_CACHE_MIN_IOU, ENCODING_CACHE_ALIGN_SIZE, ENCODING_CACHE_VOTE_AGE)
+from utils.face_boxes import clip_box, box_iou
+
+"""
+    : 거의 같은 얼굴 영역이 연속으로 들어올 때 128차원 벡터 추출(face_encodings)을 다시 하지 않도록 하는 캐시
+    : 5점 특징점(눈, 코)으로 정렬한 얼굴 이미지의 지각 해시(dHash, 64bit)를 키로 사용하며,
+      해밍 거리가 기준 이하이고 저장된 얼굴 사각형과 충분히 겹칠 때만 같은 얼굴로 판단
+      (검출 사각형 그대로의 해시는 위치가 조금만 흔들려도 달라지고, 다른 위치의 비슷한 얼굴과도 같아질 수 있음)
+    : 크기 제한(LRU)과 유효 시간(TTL)이 있으며, 정확도 검증 시에는 enabled=False로 끌 수 있음
+    : 추출한 지 vote_age 이내인 벡터의 적중은 투표에 사용할 수 있는 결과로 표시(last_fresh)하고,
+      그보다 오래된 벡터의 반복 결과만 투표에서 제외 (모든 적중을 제외하면 TTL마다 한 표만 생겨 결정이 늦어짐)
+"""
+
+
+def face_landmarks(img, box):
+    """
+    얼굴 사각형의 5점 특징점 검출 (face_encodings가 정렬에 사용하는 것과 같은 모델)
+
+    :param img: Numpy 배열의 입력 이미지
+    :param box: (top, right, bottom, left) 얼굴 좌표
+    :return: {'left_eye', 'right_eye', 'nose_tip'} 좌표 dict (검출 실패 시 None)
+    """
+    import face_recognition
+
+    landmarks = face_recognition.face_landmarks(img, [box], model="small")
+    return landmarks[0] if landmarks else None
+
+
+def aligned_face(img, landmarks, size=ENCODING_CACHE_ALIGN_SIZE):
+    """
+    두 눈의 중심이 항상 같은 위치에 오도록 회전, 크기 조정한 흑백 얼굴 이미지
+
+    :param img: Numpy 배열의 입력 이미지
+    :param landmarks: {'left_eye', 'right_eye', ...} 특징점 dict
+    :param size: 출력 이미지 크기 (픽셀)
+    :return: (size, size) 흑백 이미지 (두 눈 위치가 같으면 None)
+    """
+    eyes = sorted((np.mean(landmarks['left_eye'], axis=0), np.mean(landmarks['right_eye'], axis=0)),
+                  key=lambda point: point[0])
+    (x1, y1), (x2, y2) = eyes
+    distance = float(np.hypot(x2 - x1, y2 - y1))
+    if distance < 1:
+        return None
+
+    # 눈 사이 거리가 출력 너비의 40%, 눈 높이가 출력 높이의 35%가 되도록 변환
+    center = ((x1 + x2) / 2, (y1 + y2) / 2)
+    matrix = cv.getRotationMatrix2D(center, float(np.degrees(np.arctan2(y2 - y1, x2 - x1))), 0.4 * size / distance)
+    matrix[0, 2] += size * 0.5 - center[0]
+    matrix[1, 2] += size * 0.35 - center[1]
+
+    gray = cv.cvtColor(img, cv.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    return cv.warpAffine(gray, matrix, (size, size), flags=cv.INTER_LINEAR, borderMode=cv.BORDER_REPLICATE)
+
+
+def face_hash(img, box, landmarks=None):
+    """
+    얼굴 영역의 지각 해시(dHash) 계산
+    얼굴 이미지를 9x8 흑백 이미지로 줄인 후 가로로 이웃한 픽셀의 밝기 대소 관계를 64bit로 표현
+    특징점이 주어지면 눈 위치로 정렬한 얼굴 이미지를, 없으면 얼굴 사각형 영역을 그대로 사용
+
+    :param img: Numpy 배열의 입력 이미지
+    :param box: (top, right, bottom, left) 얼굴 좌표
+    :param landmarks: 5점 특징점 dict (None이면 사각형 영역 사용)
+    :return: 64bit 해시 (int, 얼굴 영역이 비어 있으면 None)
+    """
+    face = aligned_face(img, landmarks) if landmarks else None
+    if face is None:
+        top, right, bottom, left = clip_box(box, img.shape[0], img.shape[1])
+        if bottom <= top or right <= left:
+            return None
+        face = img[top:bottom, left:right]
+        if face.ndim == 3:
+            face = cv.cvtColor(face, cv.COLOR_BGR2GRAY)
+    small = cv.resize(face, (9, 8), interpolation=cv.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+class EncodingCache:
+    def __init__(self, capacity=ENCODING_CACHE_SIZE, ttl=ENCODING_CACHE_TTL,
+                 max_distance=ENCODING_CACHE_MAX_DISTANCE, min_iou=ENCODING_CACHE_MIN_IOU,
+                 vote_age=ENCODING_CACHE_VOTE_AGE, enabled=ENCODING_CACHE_ENABLED):
+        """
+        EncodingCache 클래스 생성자
+
+        :param capacity: 보관할 최대 벡터 수 (int)
+        :param ttl: 벡터 유효 시간 (초)
+        :param max_distance: 같은 얼굴로 판단하는 최대 해밍 거리 (0 ~ 64)
+        :param min_iou: 같은 얼굴로 판단하는 저장된 얼굴 사각형과의 최소 IoU (0 ~ 1)
+        :param vote_age: 적중한 벡터를 투표에 사용할 수 있는 최대 나이 (초)
+        :param enabled: 캐시 사용 여부 (False면 항상 새로 추출)
+        """
+        self.capacity = capacity
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.min_iou = min_iou
+        self.vote_age = vote_age
+        self.enabled = enabled
+
+        # {해시: (저장 시각, 얼굴 사각형, 벡터)} : 가장 최근에 사용한 항목이 끝에 위치
+        self.entries = OrderedDict()
+
+        # 마지막 get_or_compute() 호출에서 저장된 벡터를 반환했는지 여부
+        self.last_hit = False
+        # 마지막 get_or_compute() 결과를 투표에 사용할 수 있는지 여부 (새로 추출했거나 vote_age 이내에 추출한 벡터)
+        self.last_fresh = True
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expire(self, now):
+        """
+        유효 시간이 지난 항목 제거
+        """
+        for key in [key for key, (stored, _, _) in self.entries.items() if now - stored > self.ttl]:
+            del self.entries[key]
+            self.expirations += 1
+
+    def _lookup(self, key, box):
+        """
+        얼굴 사각형이 min_iou 이상 겹치는 항목 중 해밍 거리가 max_distance 이하인 가장 가까운 항목 검색
+
+        :param key: 얼굴 해시 (int)
+        :param box: (top, right, bottom, left) 얼굴 좌표
+        :return: 찾은 항목의 해시 (없으면 None)
+        """
+        best_key, best_distance = None, self.max_distance + 1
+        for other, (_, other_box, _) in self.entries.items():
+            distance = bin(key ^ other).count('1')
+            if distance < best_distance and box_iou(box, other_box) >= self.min_iou:
+                best_key, best_distance = other, distance
+        return best_key
+
+    def get_or_compute(self, img, box, compute, landmarks=None):
+        """
+        캐시된 벡터를 반환하거나, 없으면 compute()로 추출해 저장
+        적중 여부는 last_hit에, 투표에 사용할 수 있는지는 last_fresh에 기록
+
+        :param img: Numpy 배열의 입력 이미지
+        :param box: (top, right, bottom, left) 얼굴 좌표
+        :param compute: 벡터를 추출하는 함수 (인자 없음)
+        :param landmarks: 5점 특징점 dict (None이면 face_recognition으로 검출)
+        :return: 128차원 벡터
+        """
+        self.last_hit = False
+        self.last_fresh = True
+        if not self.enabled:
+            return compute()
+
+        now = time.monotonic()
+        self._expire(now)
+
+        # 이미지 밖이거나 크기가 0인 얼굴 영역은 해시를 계산할 수 없으므로 저장하지 않음
+        top, right, bottom, left = clip_box(box, img.shape[0], img.shape[1])
+        if bottom <= top or right <= left:
+            self.misses += 1
+            return compute()
+
+        if landmarks is None:
+            landmarks = face_landmarks(img, box)
+        key = face_hash(img, box, landmarks)
+
+        found = self._lookup(key, box)
+        if found is not None:
+            self.hits += 1
+            self.last_hit = True
+            self.last_fresh = now - self.entries[found][0] <= self.vote_age
+            self.entries.move_to_end(found)
+            return self.entries[found][2]
+
+        self.misses += 1
+        encoding = compute()
+        self.entries[key] = (now, tuple(box), encoding)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+        return encoding
+
+    def clear(self):
+        """
+        저장된 벡터 모두 삭제
+        """
+        self.entries.clear()
+
+    def stats(self):
+        """
+        적중/실패/제거 통계
+
+        :return: dict
+        """
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
@@ -0,0 +1,167 @@
+import os
+import json
+import hashlib
+import numpy as np
+from config import ENCODER_SETTINGS, get_manifest_path
+from utils.embedding_store import EmbeddingStore, stored_source
+from utils.gallery_compaction import active_compaction
+
+"""
+    : 사용자 이미지 별 벡터 추출 결과를 기록하는 매니페스트(manifest_{user_name}.json)
+    : 이미지 경로를 키로 파일 크기, 수정 시각, 내용 해시, 추출한 벡터(또는 검출 실패)를 저장
+    : 다시 등록할 때는 새로 추가되거나 바뀐 이미지만 추출하고, 삭제된 이미지의 벡터는 저장소에서 제거
+
+    매니페스트 구조
+        {
+            "encoder": {...},                   # 추출 설정 (config.ENCODER_SETTINGS)
+            "images": {
+                "data/user_faces/wooseong/01.jpg": {
+                    "size": 12345, "mtime": 1700000000.0, "sha256": "...",
+                    "encoding": [0.1, ...]      # 검출 실패 시 null
+                }, ...
+            }
+        }
+"""
+
+
+def file_digest(file_path):
+    """
+    파일 내용의 sha256 해시
+
+    :param file_path: 파일 경로
+    :return: 16진수 해시 문자열 (str)
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class EnrollmentManifest:
+    def __init__(self, user_name, path=None):
+        """
+        EnrollmentManifest 클래스 생성자
+        저장된 매니페스트를 로드하며, 추출 설정이 바뀌었으면 기존 기록은 사용하지 않음
+
+        :param user_name: 사용자 이름
+        :param path: 매니페스트 파일 경로 (None이면 config.get_manifest_path)
+        """
+        self.user_name = user_name
+        self.path = path or get_manifest_path(user_name)
+        self.images = {}
+
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('encoder') == ENCODER_SETTINGS:
+                self.images = data.get('images', {})
+            else:
+                print(f'벡터 추출 설정이 바뀌어 {user_name}님의 모든 이미지를 다시 추출합니다.')
+
+        # 이번 실행에서 새로 추출하거나 삭제한 이미지 경로
+        self.changed = set()
+        self.removed = set()
+
+    def plan(self, file_paths):
+        """
+        새로 추가되었거나 내용이 바뀐 이미지 목록을 반환하고, 폴더에서 사라진 이미지는 기록에서 제거
+        크기와 수정 시각이 같으면 해시를 계산하지 않고, 다르면 내용 해시로 실제 변경 여부를 확인
+
+        :param file_paths: 현재 사용자 폴더의 이미지 경로 리스트
+        :return: 벡터를 추출해야 하는 이미지 경로 리스트
+        """
+        to_encode = []
+        for file_path in file_paths:
+            stat = os.stat(file_path)
+            entry = self.images.get(file_path)
+            if entry is not None and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+                continue
+
+            sha256 = file_digest(file_path)
+            if entry is not None and entry['sha256'] == sha256:
+                # 수정 시각만 바뀐 경우 기록만 갱신
+                entry['size'], entry['mtime'] = stat.st_size, stat.st_mtime
+                continue
+
+            self.images[file_path] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': sha256, 'encoding': None}
+            to_encode.append(file_path)
+
+        current = set(file_paths)
+        for file_path in [p for p in self.images if p not in current]:
+            del self.images[file_path]
+            self.removed.add(file_path)
+
+        return to_encode
+
+    def record(self, file_path, encoding):
+        """
+        이미지의 벡터 추출 결과 기록
+
+        :param file_path: 이미지 경로
+        :param encoding: 128차원 벡터 (검출 실패 시 None)
+        """
+        self.images[file_path]['encoding'] = None if encoding is None else [float(v) for v in encoding]
+        self.changed.add(file_path)
+
+    def forget(self, file_path):
+        """
+        추출 중 오류가 난 이미지를 기록에서 제거 (다음 실행에서 다시 추출)
+
+        :param file_path: 이미지 경로
+        """
+        self.images.pop(file_path, None)
+        self.changed.add(file_path)
+
+    def save(self):
+        """
+        매니페스트를 임시 파일에 쓴 후 교체 (중간에 중단되어도 이전 기록 유지)
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'encoder': ENCODER_SETTINGS, 'images': self.images}, f)
+        os.replace(temp_path, self.path)
+
+    def sync_store(self, store=None, timestamp=None):
+        """
+        매니페스트 기준으로 저장소의 사용자 벡터를 갱신
+            - 바뀌었거나 삭제된 이미지, 매니페스트에 없는 이미지의 레코드는 삭제 표시
+            - 새로 추출했거나 저장소에 없는 이미지의 벡터는 레코드로 추가
+
+        :param store: EmbeddingStore 객체 (None이면 기본 저장소)
+        :param timestamp: 저장 시각 (None이면 현재 시각)
+        :return: (추가한 레코드 수, 삭제 표시한 레코드 수) 튜플
+        """
+        store = store or EmbeddingStore()
+        records = store.records()
+        rows = np.flatnonzero(store.live_mask(records, self.user_name))
+        stale = self.changed | self.removed
+
+        # 긴 경로는 저장소에 줄여서 기록되므로 매니페스트의 이미지 경로로 되돌려서 비교
+        paths = {stored_source(p): p for p in set(self.images) | stale}
+        stored_sources = [paths.get(source, source) for source in
+                          (source.decode('utf-8') for source in records['source'][rows])]
+        del records
+
+        # 압축된 사용자 (utils/gallery_compaction.py) : 대표 벡터는 유지하고 합쳐진 이미지는 다시 추가하지 않음
+        ## 합쳐진 이미지가 바뀌거나 삭제되었으면 대표 벡터도 삭제하고 이미지 벡터를 다시 추가 (다음 압축에서 다시 계산)
+        representatives, absorbed = active_compaction(self.user_name, stored_sources)
+        absorbed = {paths.get(source, source) for source in absorbed}
+        if absorbed & stale or absorbed - set(self.images):
+            representatives, absorbed = set(), set()
+
+        delete_rows = [row for row, source in zip(rows, stored_sources)
+                       if source not in representatives and (source in stale or source not in self.images)]
+        kept = (set(stored_sources) | absorbed) - stale
+
+        sources = [p for p in sorted(self.images) if self.images[p]['encoding'] is not None and p not in kept]
+        vectors = [self.images[p]['encoding'] for p in sources]
+
+        deleted = store.mark_deleted(delete_rows)
+        added = store.append(self.user_name, vectors, sources, timestamp)
+
+        self.changed.clear()
+        self.removed.clear()
+
+        return added, deleted
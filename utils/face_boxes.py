@@ -0,0 +1,31 @@
+"""
+    : (top, right, bottom, left) 얼굴 사각형 계산 공통 함수 (벡터 캐시, 벤치마크에서 사용)
+"""
+
+
+def clip_box(box, height, width):
+    """
+    얼굴 사각형을 이미지 범위로 제한
+
+    :param box: (top, right, bottom, left) 좌표
+    :param height: 이미지 높이
+    :param width: 이미지 너비
+    :return: 이미지 안으로 제한한 (top, right, bottom, left) 좌표 (정수)
+    """
+    top, right, bottom, left = (int(v) for v in box)
+    return max(top, 0), min(right, width), min(bottom, height), max(left, 0)
+
+
+def box_iou(a, b):
+    """
+    두 (top, right, bottom, left) 사각형의 IoU
+
+    :return: 0 ~ 1 사이의 값 (float)
+    """
+    top, right = max(a[0], b[0]), min(a[1], b[1])
+    bottom, left = min(a[2], b[2]), max(a[3], b[3])
+    inter = max(bottom - top, 0) * max(right - left, 0)
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    union = area_a + area_b - inter
+    return inter / union if union > 0 else 0.0
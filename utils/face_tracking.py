@@ -0,0 +1,122 @@
+import time
+from config import DETECTION_SCALE, DETECTION_TARGET_WIDTH, TRACKING_REDETECT_EVERY, TRACKING_MARGIN
+from utils.preprocessing_of_captured import detect_faces
+
+"""
+    : 스트리밍 프레임에서 이전에 찾은 얼굴 주변만 검색하는 얼굴 검출기
+    : 얼굴을 한 번 찾은 후에는 이전 사각형을 넓힌 영역(ROI)에서만 검출하고,
+      N 프레임마다 또는 ROI에서 얼굴을 놓친 경우에만 전체 프레임을 다시 검출
+    : 초당 검출 호출 수와 ROI 적중/실패 횟수를 기록
+"""
+
+
+class TrackingDetector:
+    def __init__(self, redetect_every=TRACKING_REDETECT_EVERY, margin=TRACKING_MARGIN,
+                 scale=DETECTION_SCALE, target_width=DETECTION_TARGET_WIDTH, model="hog"):
+        """
+        TrackingDetector 클래스 생성자
+
+        :param redetect_every: 전체 프레임을 다시 검출하는 프레임 간격 (int, 0이면 ROI에서 얼굴을 놓친 경우에만)
+        :param margin: 이전 얼굴 사각형을 넓히는 비율 (0.5면 가로/세로 각각 50%씩 양쪽으로 확장)
+        :param scale: 전체 프레임 검출 시 축소 비율
+        :param target_width: 전체 프레임 검출 시 축소 후 이미지 너비
+        :param model: 얼굴 검출 모델 ("hog" 또는 "cnn")
+        """
+        self.redetect_every = max(int(redetect_every or 0), 0)
+        self.margin = margin
+        self.scale = scale
+        self.target_width = target_width
+        self.model = model
+
+        # 이전 프레임에서 찾은 얼굴 사각형 (top, right, bottom, left)
+        self.last_box = None
+        self.frames = 0
+
+        # 통계
+        self.started = time.perf_counter()
+        self.full_calls = 0
+        self.roi_calls = 0
+        self.roi_hits = 0
+        self.roi_misses = 0
+
+    def reset(self):
+        """
+        추적 중인 얼굴을 잊고 다음 프레임에서 전체 검출
+        """
+        self.last_box = None
+
+    def expand_box(self, box, height, width):
+        """
+        얼굴 사각형을 margin 비율만큼 넓힌 검색 영역 (이미지 범위로 제한)
+
+        :param box: (top, right, bottom, left) 좌표
+        :param height: 이미지 높이
+        :param width: 이미지 너비
+        :return: (top, right, bottom, left) 검색 영역
+        """
+        top, right, bottom, left = box
+        dy = int((bottom - top) * self.margin)
+        dx = int((right - left) * self.margin)
+        return max(top - dy, 0), min(right + dx, width), min(bottom + dy, height), max(left - dx, 0)
+
+    def detection_scale(self, width):
+        """
+        전체 프레임 검출 시 detect_faces()가 사용하는 축소 비율 (ROI 검출에도 같은 비율을 사용)
+
+        :param width: 전체 프레임 너비
+        :return: 0 < scale <= 1 (float)
+        """
+        if self.scale is not None:
+            return min(self.scale, 1.0)
+        return min(self.target_width / width, 1.0) if self.target_width else 1.0
+
+    def detect(self, img):
+        """
+        프레임에서 얼굴 위치 검출
+
+        :param img: Numpy 배열의 입력 이미지
+        :return: 원본 해상도 기준 (top, right, bottom, left) 좌표 튜플 리스트
+        """
+        self.frames += 1
+        height, width = img.shape[:2]
+
+        # 이전 얼굴 주변(ROI)만 검색
+        periodic = self.redetect_every and self.frames % self.redetect_every == 0
+        if self.last_box is not None and not periodic:
+            roi_top, roi_right, roi_bottom, roi_left = self.expand_box(self.last_box, height, width)
+            self.roi_calls += 1
+            # ROI도 전체 프레임과 같은 비율로 축소해 검출 (원본 해상도 ROI는 얼굴 크기에 따라 전체 검출보다 느릴 수 있음)
+            roi_locations = detect_faces(img[roi_top:roi_bottom, roi_left:roi_right],
+                                         scale=self.detection_scale(width), model=self.model)
+            if roi_locations:
+                self.roi_hits += 1
+                # ROI 좌표를 전체 프레임 좌표로 변환
+                face_locations = [(top + roi_top, right + roi_left, bottom + roi_top, left + roi_left)
+                                  for top, right, bottom, left in roi_locations]
+                self.last_box = face_locations[0]
+                return face_locations
+
+            # 얼굴을 놓친 경우 전체 프레임 재검출
+            self.roi_misses += 1
+
+        self.full_calls += 1
+        face_locations = detect_faces(img, scale=self.scale, target_width=self.target_width, model=self.model)
+        self.last_box = face_locations[0] if face_locations else None
+
+        return face_locations
+
+    def stats(self):
+        """
+        검출 호출 통계
+
+        :return: dict
+        """
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        calls = self.full_calls + self.roi_calls
+        return {
+            'calls_per_sec': calls / elapsed,
+            'full_calls': self.full_calls,
+            'roi_calls': self.roi_calls,
+            'roi_hit_rate': self.roi_hits / self.roi_calls if self.roi_calls else 0.0,
+            'roi_misses': self.roi_misses,
+        }
@@ -0,0 +1,114 @@
+import time
+import threading
+from utils import metrics
+
+"""
+    : 카메라 캡처를 Tkinter 이벤트 루프와 분리하기 위한 프레임 버퍼와 캡처 스레드
+    : 버퍼는 가장 최근 프레임 하나만 보관하며, 화면에 표시되기 전에 새 프레임이 들어오면 이전 프레임은 버림
+    : 캡처/표시/버린 프레임 수를 기록
+"""
+
+
+class LatestFrameBuffer:
+    def __init__(self):
+        """
+        LatestFrameBuffer 클래스 생성자 (단일 슬롯 버퍼)
+        """
+        self.lock = threading.Lock()
+        self.frame = None
+        self.sequence = 0           # 지금까지 들어온 프레임 번호
+        self.consumed = 0           # 마지막으로 읽어간 프레임 번호
+
+        # 통계
+        self.captured = 0
+        self.displayed = 0
+        self.dropped = 0
+
+    def put(self, frame):
+        """
+        새 프레임 저장 (아직 읽지 않은 이전 프레임은 버림)
+
+        :param frame: OpenCV BGR 프레임
+        """
+        with self.lock:
+            if self.frame is not None and self.consumed < self.sequence:
+                self.dropped += 1
+            self.frame = frame
+            self.sequence += 1
+            self.captured += 1
+
+    def get_latest(self):
+        """
+        마지막으로 읽은 이후 들어온 최신 프레임 반환
+
+        :return: OpenCV BGR 프레임 (새 프레임이 없으면 None)
+        """
+        with self.lock:
+            if self.consumed == self.sequence:
+                return None
+            self.consumed = self.sequence
+            self.displayed += 1
+            return self.frame
+
+    def peek(self):
+        """
+        새 프레임 여부와 관계없이 가장 최근 프레임 반환 (통계에 반영하지 않음)
+
+        :return: OpenCV BGR 프레임 또는 None
+        """
+        with self.lock:
+            return self.frame
+
+    def stats(self):
+        """
+        캡처/표시/버린 프레임 수
+
+        :return: dict
+        """
+        with self.lock:
+            return {'captured': self.captured, 'displayed': self.displayed, 'dropped': self.dropped}
+
+
+class CaptureThread(threading.Thread):
+    def __init__(self, cap, buffer):
+        """
+        CaptureThread 클래스 생성자
+        카메라에서 프레임을 계속 읽어 버퍼에 기록하는 전용 스레드
+        스레드가 끝날 때 카메라를 직접 해제 (읽는 중인 카메라를 다른 스레드가 해제하지 않도록 함)
+
+        :param cap: cv.VideoCapture 객체
+        :param buffer: LatestFrameBuffer 객체
+        """
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.buffer = buffer
+        self.stop_event = threading.Event()
+        self.failures = 0
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                # cap.read()는 다음 프레임이 준비될 때까지 대기하므로 별도 스레드에서만 호출
+                with metrics.stage("capture"):
+                    ret, frame = self.cap.read()
+                if ret:
+                    self.buffer.put(frame)
+                else:
+                    # 카메라가 잠시 멈춘 경우 잠깐 쉬었다가 다시 시도
+                    self.failures += 1
+                    time.sleep(0.01)
+        finally:
+            # read()가 멈춰 있다가 늦게 돌아와도 읽기가 끝난 후에 해제
+            self.cap.release()
+
+    def stop(self, timeout=1.0):
+        """
+        캡처 스레드 종료 요청 후 대기 (카메라는 스레드가 끝나면서 해제)
+
+        :param timeout: 최대 대기 시간 (초)
+        :return: 스레드가 종료되었는지 여부 (False면 read()가 멈춰 있어 나중에 해제됨)
+        """
+        self.stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+        return not self.is_alive()
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+from config import COMPACTION_MAX_VECTORS, COMPACTION_ITERATIONS, get_compaction_path
+from utils.embedding_store import EmbeddingStore
+
+"""
+    : 다시 등록하거나 동영상으로 등록해 거의 같은 벡터가 많이 쌓인 사용자의 벡터를 최대 k개의 대표 벡터로 압축
+        - 사용자 벡터를 k-means로 k개 묶음으로 나누고, 묶음 중심에 가장 가까운 실제 벡터(medoid)를 대표 벡터로 사용
+        - 대표 벡터 별로 대표하는 벡터 수와 거리 분포(평균, 최대)를 compaction_{user}.json 에 기록
+        - 저장소에는 대표 벡터를 새 레코드로 추가하고 기존 레코드는 삭제 표시 (rewrite 옵션으로 파일에서 제거)
+    : 증분 실행 : 압축 후 새 벡터가 추가되어 k개를 넘은 사용자만 다시 압축
+        - 이전 대표 벡터는 대표하는 벡터 수를 가중치로 사용하므로 처음부터 다시 계산하지 않아도 분포가 유지됨
+    : 합쳐진 원본 이미지 목록을 함께 기록해 등록 매니페스트 동기화 시 다시 추가되지 않도록 함
+
+    실행 방법 (프로젝트 루트에서)
+        python -m utils.gallery_compaction              # 모든 사용자 압축
+        python -m utils.gallery_compaction --user wooseong -k 8 --rewrite
+"""
+
+# 대표 벡터 레코드의 원본 표시 (저장소 source 값)
+SOURCE_PREFIX = "compacted#"
+
+
+def load_compaction(user_name):
+    """
+    {user_name} 사용자의 압축 기록
+
+    :param user_name: 사용자 이름
+    :return: {'representatives': {source: {count, mean_distance, max_distance}}, 'absorbed': [source, ...]} dict
+             (기록이 없으면 빈 기록)
+    """
+    path = get_compaction_path(user_name)
+    if not os.path.exists(path):
+        return {'representatives': {}, 'absorbed': []}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_compaction(user_name, compaction):
+    """
+    압축 기록 저장 (임시 파일에 쓴 후 교체)
+    """
+    path = get_compaction_path(user_name)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(compaction, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def active_compaction(user_name, live_sources):
+    """
+    저장소에 대표 벡터가 남아 있는 경우의 압축 기록 (다시 등록해 대표 벡터가 삭제되었으면 빈 기록)
+
+    :param user_name: 사용자 이름
+    :param live_sources: 사용자의 삭제되지 않은 레코드 source 값 리스트
+    :return: (대표 벡터 source 집합, 합쳐진 원본 이미지 집합) 튜플
+    """
+    compaction = load_compaction(user_name)
+    representatives = set(compaction['representatives']) & set(live_sources)
+    if not representatives:
+        return set(), set()
+    return representatives, set(compaction['absorbed'])
+
+
+def compact_vectors(vectors, k=COMPACTION_MAX_VECTORS, weights=None, mean_distances=None, max_distances=None,
+                    iterations=COMPACTION_ITERATIONS, seed=0):
+    """
+    벡터를 최대 k개의 대표 벡터와 분포 통계로 압축
+
+    :param vectors: (N, 128) 형태의 벡터
+    :param k: 최대 대표 벡터 수
+    :param weights: (N, ) 벡터 별로 대표하는 벡터 수 (None이면 모두 1)
+    :param mean_distances: (N, ) 이전 압축에서 기록한 대표 거리 평균 (None이면 0)
+    :param max_distances: (N, ) 이전 압축에서 기록한 대표 거리 최대 (None이면 0)
+    :return: (대표 벡터 위치 배열, 대표하는 벡터 수, 평균 거리, 최대 거리) 튜플
+             거리 통계는 이전 대표 벡터의 분포를 더한 근사값 (상한)
+    """
+    from models.ann_index import kmeans
+
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, 128)
+    weights = np.ones(len(vectors)) if weights is None else np.asarray(weights, dtype=np.float64)
+    mean_distances = np.zeros(len(vectors)) if mean_distances is None else np.asarray(mean_distances)
+    max_distances = np.zeros(len(vectors)) if max_distances is None else np.asarray(max_distances)
+
+    centroids, assign = kmeans(vectors, k, iterations, seed, weights=weights)
+
+    medoids, counts, means, maxes = [], [], [], []
+    for cluster in np.unique(assign):
+        members = np.flatnonzero(assign == cluster)
+        medoid = members[np.linalg.norm(vectors[members] - centroids[cluster], axis=1).argmin()]
+        distances = np.linalg.norm(vectors[members] - vectors[medoid], axis=1)
+        member_weights = weights[members]
+
+        medoids.append(medoid)
+        counts.append(float(member_weights.sum()))
+        means.append(float(np.sum(member_weights * (distances + mean_distances[members])) / member_weights.sum()))
+        maxes.append(float(np.max(distances + max_distances[members])))
+
+    return np.array(medoids, dtype=np.intp), np.array(counts), np.array(means), np.array(maxes)
+
+
+def compact_user(user_name, store=None, k=COMPACTION_MAX_VECTORS, timestamp=None):
+    """
+    {user_name} 사용자의 벡터가 k개를 넘으면 대표 벡터로 압축해 저장소에 반영
+
+    :param user_name: 사용자 이름
+    :param store: EmbeddingStore 객체 (None이면 기본 저장소)
+    :param k: 최대 대표 벡터 수
+    :param timestamp: 대표 벡터 레코드의 저장 시각 (None이면 현재 시각)
+    :return: (압축 전 벡터 수, 압축 후 벡터 수) 튜플
+    """
+    store = store or EmbeddingStore()
+    records = store.records()
+    rows = np.flatnonzero(store.live_mask(records, user_name))
+    if len(rows) <= k:
+        return len(rows), len(rows)
+
+    sources = [source.decode('utf-8') for source in records['source'][rows]]
+    vectors = np.array(records['vector'][rows], dtype=np.float32)
+    del records
+
+    # 이전 대표 벡터는 기록된 통계를 가중치로 사용
+    compaction = load_compaction(user_name)
+    representatives, absorbed = active_compaction(user_name, sources)
+    stats = [compaction['representatives'].get(source) if source in representatives else None
+             for source in sources]
+    weights = [s['count'] if s else 1 for s in stats]
+    mean_distances = [s['mean_distance'] if s else 0.0 for s in stats]
+    max_distances = [s['max_distance'] if s else 0.0 for s in stats]
+
+    medoids, counts, means, maxes = compact_vectors(vectors, k, weights, mean_distances, max_distances)
+
+    # 대표 벡터를 먼저 추가한 후 기존 레코드 삭제 표시 (중간에 종료되어도 벡터가 사라지지 않음)
+    timestamp = time.time() if timestamp is None else timestamp
+    new_sources = [f'{SOURCE_PREFIX}{timestamp:.6f}#{i}' for i in range(len(medoids))]
+    store.append(user_name, vectors[medoids], new_sources, timestamp)
+    store.mark_deleted(rows)
+
+    absorbed |= set(source for source in sources if source and source not in representatives)
+    save_compaction(user_name, {
+        'representatives': {source: {'count': count, 'mean_distance': mean, 'max_distance': maximum}
+                            for source, count, mean, maximum in zip(new_sources, counts, means, maxes)},
+        'absorbed': sorted(absorbed),
+    })
+
+    return len(rows), len(medoids)
+
+
+def compact_gallery(user_names=None, store=None, k=COMPACTION_MAX_VECTORS, rewrite=False):
+    """
+    여러 사용자의 벡터 압축 (k개 이하인 사용자는 건너뜀)
+
+    :param user_names: 압축할 사용자 이름 리스트 (None이면 저장소의 모든 사용자)
+    :param store: EmbeddingStore 객체 (None이면 기본 저장소)
+    :param k: 최대 대표 벡터 수
+    :param rewrite: 삭제 표시된 레코드를 파일에서 제거할지 여부 (bool)
+    :return: 사용자 별 (압축 전 벡터 수, 압축 후 벡터 수) dict
+    """
+    store = store or EmbeddingStore()
+    results = {}
+    for user_name in user_names or store.users():
+        results[user_name] = compact_user(user_name, store, k)
+        before, after = results[user_name]
+        if before != after:
+            print(f'{user_name}: {before}개 -> {after}개')
+
+    if rewrite and store.count():
+        print(f'삭제 표시된 레코드 {store.rewrite()}개를 파일에서 제거했습니다. '
+              f'(근사 최근접 이웃 색인을 사용 중이면 python -m models.ann_index build 로 다시 생성)')
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="사용자 얼굴 벡터 압축")
+    parser.add_argument("--user", nargs="*", help="압축할 사용자 이름 (생략하면 모든 사용자)")
+    parser.add_argument("-k", type=int, default=COMPACTION_MAX_VECTORS, help="사용자당 최대 대표 벡터 수")
+    parser.add_argument("--rewrite", action="store_true", help="삭제 표시된 레코드를 파일에서 제거")
+    args = parser.parse_args()
+
+    store = EmbeddingStore()
+    size_before = os.path.getsize(store.path) if os.path.exists(store.path) else 0
+    results = compact_gallery(args.user, store, args.k, args.rewrite)
+    size_after = os.path.getsize(store.path) if os.path.exists(store.path) else 0
+
+    before = sum(b for b, _ in results.values())
+    after = sum(a for _, a in results.values())
+    print(f'사용자 {len(results)}명, 벡터 {before}개 -> {after}개, 저장소 파일 {size_before / 1e6:.2f} MB -> {size_after / 1e6:.2f} MB')
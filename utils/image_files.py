@@ -0,0 +1,19 @@
+import os
+
+"""
+    : 이미지 폴더에서 이미지 파일 목록을 읽는 공통 함수 (파이프라인, 부하 측정, 벤치마크에서 사용)
+"""
+
+# 이미지로 읽는 파일 확장자
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def list_images(folder):
+    """
+    폴더 하위의 모든 이미지 파일 경로
+
+    :param folder: 이미지 폴더
+    :return: 이름 순으로 정렬된 이미지 경로 리스트
+    """
+    return sorted(os.path.join(root, name) for root, _, names in os.walk(folder) for name in names
+                  if name.lower().endswith(IMAGE_EXTENSIONS))
@@ -0,0 +1,108 @@
+import os
+import sys
+import argparse
+import subprocess
+
+"""
+    : python -X importtime 결과를 이용해 모듈별 import 시간을 측정
+    : 시작 시 불러오면 안 되는 무거운 모듈과 전체 시간 예산을 검사해 회귀 확인에 사용
+
+    실행 방법 (프로젝트 루트에서)
+        python -m utils.import_timing                  # app 모듈 import 시간 보고
+        python -m utils.import_timing --budget-ms 500  # 예산 초과 시 종료 코드 1
+"""
+
+# 시작 시간 예산 (ms)
+DEFAULT_BUDGET_MS = 1000
+
+# 시작 시 import 되면 안 되는 무거운 모듈
+HEAVY_MODULES = ("tensorflow", "keras", "matplotlib", "sklearn", "scipy", "face_recognition", "dlib")
+
+
+def measure_import_time(module_name="app", python=sys.executable):
+    """
+    새 파이썬 프로세스에서 모듈을 import 하고 모듈별 import 시간을 수집
+
+    :param module_name: 측정할 모듈 이름 (str)
+    :param python: 사용할 파이썬 실행 파일 경로
+    :return: [(모듈 이름, 자체 시간(us), 누적 시간(us)), ...] 리스트
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {module_name}"],
+                            cwd=project_root, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'{module_name} 모듈을 import 하지 못했습니다.\n{result.stderr}')
+
+    # 출력 형식: "import time:       self [us] |  cumulative | imported package"
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        # 구분자 뒤 공백 한 칸을 제외한 들여쓰기가 import 깊이를 나타냄
+        timings.append((fields[2][1:].rstrip(), int(fields[0]), int(fields[1])))
+
+    return timings
+
+
+def summarize(timings, top=15):
+    """
+    최상위 패키지별 누적 import 시간을 집계
+
+    :param timings: measure_import_time()의 반환 값
+    :param top: 출력할 상위 패키지 개수 (int)
+    :return: (전체 시간(ms), [(패키지 이름, 누적 시간(ms)), ...]) 튜플
+    """
+    packages = {}
+    for name, _, cumulative in timings:
+        # 들여쓰기가 없는 줄이 최상위 import
+        if name.startswith(" "):
+            continue
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + cumulative / 1000
+
+    total_ms = sum(packages.values())
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    return total_ms, ranked
+
+
+def check_startup(module_name="app", budget_ms=DEFAULT_BUDGET_MS, top=15):
+    """
+    import 시간 보고서를 출력하고 예산과 무거운 모듈 사용 여부를 검사
+
+    :param module_name: 측정할 모듈 이름 (str)
+    :param budget_ms: 전체 import 시간 예산 (ms)
+    :param top: 출력할 상위 패키지 개수 (int)
+    :return: 검사 통과 여부 (bool)
+    """
+    timings = measure_import_time(module_name)
+    total_ms, ranked = summarize(timings, top)
+
+    print(f'{module_name} import 시간: {total_ms:.1f} ms (예산 {budget_ms} ms)')
+    print(f'{"패키지":<30}{"누적(ms)":>12}')
+    for package, cumulative_ms in ranked:
+        print(f'{package:<30}{cumulative_ms:>12.1f}')
+
+    passed = True
+    loaded_heavy = sorted({name.strip().split(".")[0] for name, _, _ in timings} & set(HEAVY_MODULES))
+    if loaded_heavy:
+        print(f'시작 시 무거운 모듈이 import 되었습니다: {", ".join(loaded_heavy)}')
+        passed = False
+    if total_ms > budget_ms:
+        print(f'import 시간 예산을 초과했습니다: {total_ms:.1f} ms > {budget_ms} ms')
+        passed = False
+
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="모듈별 import 시간 측정")
+    parser.add_argument("module", nargs="?", default="app", help="측정할 모듈 이름")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="전체 import 시간 예산 (ms)")
+    parser.add_argument("--top", type=int, default=15, help="출력할 상위 패키지 개수")
+    args = parser.parse_args()
+
+    sys.exit(0 if check_startup(args.module, args.budget_ms, args.top) else 1)
@@ -0,0 +1,270 @@
+import time
+import threading
+from collections import deque, Counter
+import numpy as np
+from config import LIVE_PROCESS_INTERVAL, LIVE_VOTE_WINDOW, LIVE_MIN_VOTES, VERIFIER_BACKEND
+
+"""
+    : 카메라 스트리밍 중 일부 프레임만 골라 얼굴 인식을 수행하고,
+      최근 N개 프레임의 결과를 투표로 합쳐 도어락 열림 여부를 결정
+    : 인식은 백그라운드 스레드에서 실행되어 화면 갱신을 막지 않음
+"""
+
+
+class TemporalVoter:
+    def __init__(self, window=LIVE_VOTE_WINDOW, min_votes=LIVE_MIN_VOTES, threshold=0.9):
+        """
+        TemporalVoter 클래스 생성자
+
+        :param window: 투표에 사용하는 최근 프레임 수 (int)
+        :param min_votes: 같은 사용자로 인식되어야 하는 최소 프레임 수 (int)
+        :param threshold: 투표한 프레임들의 평균 점수 임계값 (float)
+        """
+        self.window = window
+        self.min_votes = min_votes
+        self.threshold = threshold
+        self.results = deque(maxlen=window)
+
+    def add(self, identity, score, fresh=True):
+        """
+        프레임 한 장의 인식 결과를 추가하고 현재 결정을 반환
+        오래전에 추출한 캐시 벡터로 계산한 결과(fresh=False)는 이전 프레임 결과의 반복이므로 투표에 추가하지 않음
+
+        :param identity: 인식된 사용자 이름 (인식 실패 시 None)
+        :param score: 0 ~ 1 사이의 점수 (float)
+        :param fresh: 새로 추출했거나 최근에 추출한 벡터의 결과인지 여부 (bool)
+        :return: 열림이 결정된 사용자 이름 (결정되지 않았으면 None)
+        """
+        if fresh:
+            self.results.append((identity, score))
+        return self.decision()
+
+    def decision(self):
+        """
+        최근 N개 결과 중 가장 많이 인식된 사용자가 최소 투표 수와 평균 점수를 넘으면 해당 사용자로 결정
+
+        :return: 사용자 이름 또는 None
+        """
+        votes = Counter(identity for identity, _ in self.results if identity is not None)
+        if not votes:
+            return None
+
+        identity, count = votes.most_common(1)[0]
+        if count < self.min_votes:
+            return None
+
+        mean_score = np.mean([score for name, score in self.results if name == identity])
+        return identity if mean_score > self.threshold else None
+
+
+def score_face(face_vector, user_name=None, gallery=None):
+    """
+    얼굴 벡터 하나의 인식 결과와 점수 계산
+        - user_name이 주어지면 해당 사용자 모델(또는 판별 통계)의 점수
+        - 없으면 Gallery로 가장 가까운 사용자를 찾은 후 그 사용자 모델의 예측 확률
+
+    :param face_vector: 128차원 얼굴 벡터
+    :param user_name: 확인할 사용자 이름 (None이면 식별)
+    :param gallery: Gallery 객체 (식별 시 필요)
+    :return: (사용자 이름 또는 None, 점수) 튜플
+    """
+    return score_faces(np.asarray(face_vector).reshape(1, -1), [user_name], gallery)[0]
+
+
+def score_faces(face_vectors, user_names, gallery=None):
+    """
+    여러 얼굴 벡터의 인식 결과와 점수를 한 번에 계산
+    식별이 필요한 벡터는 Gallery 거리 계산 한 번으로, 점수는 사용자 별로 모아 모델 예측 한 번으로 처리
+    (공유 모델(config.VERIFIER_BACKEND = "shared")은 모든 벡터, 모든 사용자의 점수를 순전파 한 번으로 계산)
+
+    :param face_vectors: (N, 128) 형태의 얼굴 벡터
+    :param user_names: 벡터 별 확인할 사용자 이름 리스트 (None이면 식별)
+    :param gallery: Gallery 객체 (식별 시 필요)
+    :return: 벡터 별 (사용자 이름 또는 None, 점수) 튜플 리스트
+    """
+    from models.gallery import TOLERANCE
+    from models.numpy_inference import predict_user
+
+    face_vectors = np.asarray(face_vectors, dtype=np.float32).reshape(-1, 128)
+    identities = list(user_names)
+
+    # 공유 모델은 순전파 한 번으로 모든 사용자 점수를 계산하므로 식별에도 Gallery 대신 가장 높은 점수의 사용자를 사용
+    if VERIFIER_BACKEND == "shared":
+        from models.shared_model import load_shared_model
+
+        model = load_shared_model()
+        scores = model.scores(face_vectors)
+        results = []
+        for row, name in zip(scores, identities):
+            column = int(row.argmax()) if name is None else model.columns.get(name)
+            if column is None:
+                results.append((name, 0.0))
+            else:
+                results.append((str(model.labels[column]), float(row[column])))
+        return results
+
+    unknown = [i for i, name in enumerate(identities) if name is None]
+    if unknown and gallery is not None:
+        for i, candidates in zip(unknown, gallery.identify_batch(face_vectors[unknown], k=1)):
+            if candidates and candidates[0][1] <= TOLERANCE:
+                identities[i] = candidates[0][0]
+
+    scores = np.zeros(len(identities))
+    for user_name in set(name for name in identities if name is not None):
+        rows = [i for i, name in enumerate(identities) if name == user_name]
+        try:
+            scores[rows] = predict_user(user_name, face_vectors[rows])[:, 0]
+        except FileNotFoundError:
+            # 등록되지 않은 사용자는 점수 0 (같이 처리하는 다른 벡터의 결과에는 영향 없음)
+            scores[rows] = 0.0
+
+    return [(name, float(score) if name is not None else 0.0) for name, score in zip(identities, scores)]
+
+
+class LiveRecognizer:
+    def __init__(self, user_name=None, interval=LIVE_PROCESS_INTERVAL,
+                 window=LIVE_VOTE_WINDOW, min_votes=LIVE_MIN_VOTES):
+        """
+        LiveRecognizer 클래스 생성자
+
+        :param user_name: 확인할 사용자 이름 (None이면 등록된 모든 사용자 중에서 식별)
+        :param interval: 인식을 수행하는 최소 간격 (초)
+        :param window: 투표에 사용하는 최근 프레임 수 (int)
+        :param min_votes: 같은 사용자로 인식되어야 하는 최소 프레임 수 (int)
+        """
+        from models.numpy_inference import THRESHOLD
+
+        self.user_name = user_name
+        self.interval = interval
+        self.voter = TemporalVoter(window, min_votes, THRESHOLD)
+        self.gallery = None
+        self.detector = None
+        self.encoding_cache = None
+        self.preprocessor = None
+
+        # 인식 상태
+        self.busy = False
+        self.last_submit = 0.0
+        self.last_result = (None, 0.0)
+        self.decision = None
+        self.lock = threading.Lock()
+
+        # 통계 : 화면 프레임 수, 인식한 프레임 수, 시작 시각, 결정까지 걸린 시간
+        self.frames_seen = 0
+        self.frames_processed = 0
+        self.started = time.perf_counter()
+        self.time_to_decision = None
+
+    def submit(self, frame):
+        """
+        스트리밍 프레임 전달
+        설정한 간격이 지났고 이전 인식이 끝난 경우에만 백그라운드 스레드에서 인식 수행
+
+        :param frame: OpenCV BGR 프레임
+        :return: 인식을 시작했는지 여부 (bool)
+        """
+        self.frames_seen += 1
+        now = time.perf_counter()
+        with self.lock:
+            if self.busy or self.decision is not None or now - self.last_submit < self.interval:
+                return False
+            self.busy = True
+            self.last_submit = now
+
+        # 화면 갱신 중에 프레임 버퍼가 바뀌지 않도록 복사본 사용
+        threading.Thread(target=self._process, args=(frame.copy(), ), daemon=True).start()
+        return True
+
+    def _process(self, frame):
+        """
+        프레임 한 장에서 얼굴 벡터를 추출하고 투표에 반영 (백그라운드 스레드)
+
+        :param frame: OpenCV BGR 프레임
+        """
+        from utils.preprocessing_of_captured import FramePreprocessor, preprocess_image_and_extract_vector
+
+        try:
+            if self.user_name is None and self.gallery is None:
+                from models.gallery import Gallery
+                self.gallery = Gallery.load()
+
+            # 문 앞에 서 있는 사람은 이전 위치 주변만 검색
+            if self.detector is None:
+                from utils.face_tracking import TrackingDetector
+                self.detector = TrackingDetector()
+
+            # 가만히 서 있는 사람의 거의 같은 얼굴 영역은 벡터 추출 생략
+            if self.encoding_cache is None:
+                from utils.encoding_cache import EncodingCache
+                self.encoding_cache = EncodingCache()
+
+            # 인식은 한 번에 한 프레임씩 수행되므로 전처리 버퍼를 프레임마다 재사용
+            if self.preprocessor is None:
+                self.preprocessor = FramePreprocessor()
+
+            cache_fresh = []
+            face_vectors = preprocess_image_and_extract_vector(frame, detector=self.detector,
+                                                               encoding_cache=self.encoding_cache,
+                                                               preprocessor=self.preprocessor, cache_fresh=cache_fresh)
+            if face_vectors:
+                result = score_face(face_vectors[0], self.user_name, self.gallery)
+            else:
+                result = (None, 0.0)
+            # 오래전에 추출한 벡터의 반복 결과는 투표에서 제외
+            fresh = not cache_fresh or cache_fresh[0]
+
+            with self.lock:
+                self.frames_processed += 1
+                self.last_result = result
+                decision = self.voter.add(*result, fresh=fresh)
+                if decision is not None and self.decision is None:
+                    # 다른 스레드는 decision이 정해지면 time_to_decision을 읽으므로 먼저 기록
+                    self.time_to_decision = time.perf_counter() - self.started
+                    self.decision = decision
+        finally:
+            with self.lock:
+                self.busy = False
+
+    def stats(self):
+        """
+        화면 FPS, 인식 FPS, 마지막 인식 결과, 결정된 사용자와 결정까지 걸린 시간
+        인식 스레드가 함께 갱신하는 값은 잠금 안에서 한 번에 읽음
+
+        :return: dict
+        """
+        with self.lock:
+            frames_processed = self.frames_processed
+            last_result = self.last_result
+            decision, time_to_decision = self.decision, self.time_to_decision
+
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        stats = {
+            'display_fps': self.frames_seen / elapsed,
+            'recognition_fps': frames_processed / elapsed,
+            'frames_processed': frames_processed,
+            'last_result': last_result,
+            'decision': decision,
+            'time_to_decision': time_to_decision,
+        }
+        if self.detector is not None:
+            stats['detector'] = self.detector.stats()
+        if self.encoding_cache is not None:
+            stats['encoding_cache'] = self.encoding_cache.stats()
+        return stats
+
+    def status_text(self):
+        """
+        Tkinter 화면에 표시할 현재 인식 상태 문자열
+
+        :return: str
+        """
+        stats = self.stats()
+        identity, score = stats['last_result']
+        text = f'인식: {identity or "-"} ({score:.2f}) | 화면 {stats["display_fps"]:.1f} FPS, 인식 {stats["recognition_fps"]:.1f} FPS'
+        if 'detector' in stats:
+            text += f' | 검출 {stats["detector"]["calls_per_sec"]:.1f}회/초, ROI 적중 {stats["detector"]["roi_hit_rate"]:.0%}'
+        if 'encoding_cache' in stats and stats['encoding_cache']['enabled']:
+            text += f' | 벡터 캐시 적중 {stats["encoding_cache"]["hit_rate"]:.0%}'
+        if stats['decision'] is not None:
+            text += f' | {stats["decision"]} 열림 ({stats["time_to_decision"]:.2f}초)'
+        return text
@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from config import METRICS_ENABLED
+
+"""
+    : 인식 파이프라인 단계별(capture, preprocessing, detection, encoding, classification, disk_io)
+      소요 시간과 횟수를 기록하는 가벼운 계측 모듈
+    : 비활성화 상태에서는 아무 일도 하지 않는 공용 객체를 반환해 오버헤드가 거의 없음
+    : node exporter의 textfile collector가 읽을 수 있는 Prometheus 텍스트 형식 또는 JSON lines로 내보내기
+
+    사용 예
+        from utils import metrics
+        with metrics.stage("detection"):
+            face_locations = ...
+        metrics.export_prometheus("/var/lib/node_exporter/textfile/facerec.prom")
+"""
+
+# 지연 시간 히스토그램 구간 (초)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 계측 사용 여부 (enable() / disable()로 실행 중 변경 가능)
+enabled = METRICS_ENABLED
+
+_lock = threading.Lock()
+# {단계 이름: [횟수, 합계(초), 구간별 누적 횟수 리스트]}
+_stages = {}
+# {카운터 이름: 값}
+_counters = {}
+
+
+class _NoopStage:
+    """
+    계측 비활성화 시 사용하는 빈 컨텍스트 매니저
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopStage()
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def observe(name, seconds):
+    """
+    단계 소요 시간 한 건 기록
+
+    :param name: 단계 이름 (str)
+    :param seconds: 소요 시간 (초)
+    """
+    with _lock:
+        entry = _stages.get(name)
+        if entry is None:
+            entry = _stages[name] = [0, 0.0, [0] * len(BUCKETS)]
+        entry[0] += 1
+        entry[1] += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                entry[2][i] += 1
+
+
+@contextmanager
+def _timed_stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def stage(name):
+    """
+    with 문으로 감싼 구간의 소요 시간을 단계 이름으로 기록
+
+    :param name: 단계 이름 (str)
+    :return: 컨텍스트 매니저
+    """
+    if not enabled:
+        return _NOOP
+    return _timed_stage(name)
+
+
+def timed(name):
+    """
+    함수 실행 시간을 단계 이름으로 기록하는 데코레이터
+
+    :param name: 단계 이름 (str)
+    """
+    def decorator(function):
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        wrapper.__name__ = function.__name__
+        wrapper.__doc__ = function.__doc__
+        return wrapper
+    return decorator
+
+
+def increment(name, value=1):
+    """
+    카운터 증가
+
+    :param name: 카운터 이름 (str)
+    :param value: 증가량
+    """
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def snapshot():
+    """
+    현재까지 기록된 값
+
+    :return: {'stages': {이름: {count, sum_seconds, buckets}}, 'counters': {...}}
+    """
+    with _lock:
+        return {
+            'stages': {name: {'count': count, 'sum_seconds': total, 'buckets': dict(zip(BUCKETS, buckets))}
+                       for name, (count, total, buckets) in _stages.items()},
+            'counters': dict(_counters),
+        }
+
+
+def reset():
+    """
+    기록된 값 모두 삭제
+    """
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def _write_atomic(path, text):
+    """
+    임시 파일에 쓴 후 교체해 수집기가 쓰는 중인 파일을 읽지 않도록 함
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+def render_prometheus():
+    """
+    현재 값을 Prometheus 텍스트 형식 문자열로 변환
+
+    :return: str
+    """
+    data = snapshot()
+    lines = ['# HELP facerec_stage_duration_seconds Face recognition pipeline stage duration.',
+             '# TYPE facerec_stage_duration_seconds histogram']
+    for name, entry in sorted(data['stages'].items()):
+        for bound, count in entry['buckets'].items():
+            lines.append(f'facerec_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+        lines.append(f'facerec_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {entry["count"]}')
+        lines.append(f'facerec_stage_duration_seconds_sum{{stage="{name}"}} {entry["sum_seconds"]:.6f}')
+        lines.append(f'facerec_stage_duration_seconds_count{{stage="{name}"}} {entry["count"]}')
+
+    lines += ['# HELP facerec_events_total Face recognition pipeline event counters.',
+              '# TYPE facerec_events_total counter']
+    for name, value in sorted(data['counters'].items()):
+        lines.append(f'facerec_events_total{{event="{name}"}} {value}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def export_prometheus(path):
+    """
+    Prometheus 텍스트 형식으로 내보내기 (node exporter textfile collector 용 .prom 파일)
+
+    :param path: 저장할 파일 경로
+    """
+    _write_atomic(path, render_prometheus())
+
+
+def export_jsonl(path):
+    """
+    현재 값을 JSON 한 줄로 파일 끝에 추가
+
+    :param path: JSON lines 파일 경로
+    """
+    data = snapshot()
+    record = {
+        'timestamp': time.time(),
+        'stages': {name: {'count': entry['count'], 'sum_seconds': entry['sum_seconds']}
+                   for name, entry in data['stages'].items()},
+        'counters': data['counters'],
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def export(prometheus_path=None, jsonl_path=None):
+    """
+    설정된 경로로 내보내기 (계측이 비활성화되어 있으면 아무것도 하지 않음)
+
+    :param prometheus_path: .prom 파일 경로 (None이면 생략)
+    :param jsonl_path: JSON lines 파일 경로 (None이면 생략)
+    """
+    if not enabled:
+        return
+    if prometheus_path:
+        export_prometheus(prometheus_path)
+    if jsonl_path:
+        export_jsonl(jsonl_path)
@@ -1,27 +1,182 @@
-import os
+import threading
+import numpy as np
 import cv2 as cv
-import face_recognition
+from config import (DETECTION_SCALE, DETECTION_TARGET_WIDTH, PREPROCESS_STEPS, BRIGHTNESS_ALPHA,
+                    BRIGHTNESS_BETA)
+from utils import metrics
 
+# face_recognition은 import 시 dlib 모델을 로드하므로 얼굴 검출 시점에 import
 
-def preprocess_image_and_extract_vector(path="../data/captured_images/"):
+# 스레드 별 기본 전처리기 (preprocess_and_detect에 전처리기를 주지 않은 경우 사용)
+_local = threading.local()
+
+
+class FramePreprocessor:
+    def __init__(self, steps=PREPROCESS_STEPS, alpha=BRIGHTNESS_ALPHA, beta=BRIGHTNESS_BETA, ring=1):
+        """
+        FramePreprocessor 클래스 생성자
+        설정한 전처리만 미리 할당한 버퍼에 dst= 로 기록해 프레임마다 새 배열을 만들지 않음
+        출력은 face_recognition이 사용하는 RGB 순서 (색 순서 변환은 마지막에 한 번만 수행)
+
+        반환된 이미지는 다음 프레임(ring개 이후)의 전처리에서 덮어쓰므로,
+        결과를 다른 단계에 넘겨 보관하는 경우 ring을 동시에 보관하는 프레임 수보다 크게 설정
+
+        :param steps: 순서대로 적용할 전처리 ("brightness", "equalize")
+        :param alpha: 밝기/대비 조정의 대비 계수 (float)
+        :param beta: 밝기/대비 조정의 밝기 추가 값 (int)
+        :param ring: 번갈아 사용하는 출력 버퍼 수 (int)
+        """
+        unknown = set(steps) - {"brightness", "equalize"}
+        if unknown:
+            raise ValueError(f'지원하지 않는 전처리입니다: {sorted(unknown)}')
+        self.steps = tuple(steps)
+        self.alpha = alpha
+        self.beta = beta
+        self.ring = max(ring, 1)
+        self.position = 0
+
+        # {(이름, 순번): 배열} 프레임 크기가 바뀐 경우에만 다시 할당
+        self.buffers = {}
+        self.allocations = 0
+
+    def buffer(self, name, shape, index=0):
+        """
+        이름과 크기에 맞는 재사용 버퍼
+
+        :param name: 버퍼 이름
+        :param shape: 배열 크기 튜플
+        :param index: ring 순번
+        :return: uint8 배열
+        """
+        key = (name, index)
+        buffer = self.buffers.get(key)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self.buffers[key] = buffer
+            self.allocations += 1
+        return buffer
+
+    def __call__(self, image):
+        """
+        BGR 프레임 전처리
+
+        :param image: OpenCV BGR 프레임 (3채널) 또는 흑백 이미지
+        :return: 전처리된 RGB 이미지 (재사용 버퍼)
+        """
+        index = self.position
+        self.position = (self.position + 1) % self.ring
+        height, width = image.shape[:2]
+        color = image.ndim == 3 and image.shape[2] == 3
+        output = self.buffer("output", (height, width, 3), index)
+
+        current = image
+        for step in self.steps:
+            if step == "brightness":
+                bright = self.buffer("bright", current.shape)
+                cv.convertScaleAbs(current, dst=bright, alpha=self.alpha, beta=self.beta)
+                current = bright
+            elif step == "equalize":
+                gray = self.buffer("gray", (height, width))
+                if current.ndim == 3:
+                    cv.cvtColor(current, cv.COLOR_BGR2GRAY, dst=gray)
+                else:
+                    gray[...] = current
+                cv.equalizeHist(gray, dst=gray)
+                current = gray
+                color = False
+
+        # 색 순서 변환 (흑백 결과는 세 채널에 복사하므로 BGR/RGB 구분 없음)
+        if current.ndim == 2:
+            cv.cvtColor(current, cv.COLOR_GRAY2RGB, dst=output)
+        elif color:
+            cv.cvtColor(current, cv.COLOR_BGR2RGB, dst=output)
+        else:
+            output[...] = current
+        return output
+
+
+def get_preprocessor():
+    """
+    현재 스레드의 기본 전처리기 (스레드마다 버퍼를 따로 사용)
+
+    :return: FramePreprocessor 객체
+    """
+    preprocessor = getattr(_local, 'preprocessor', None)
+    if preprocessor is None:
+        preprocessor = _local.preprocessor = FramePreprocessor()
+    return preprocessor
+
+
+def preprocess_image_and_extract_vector(image, scale=DETECTION_SCALE, target_width=DETECTION_TARGET_WIDTH, detector=None,
+                                        encoding_cache=None, preprocessor=None, cache_fresh=None):
     """
     원할한 벡터 추출을 위한 이미지 전처리 작업
-    밝기와 대비를 조정하고 벡터를 추출
+    설정한 전처리(config.PREPROCESS_STEPS)를 적용하고 벡터를 추출
+    얼굴 검출은 축소한 이미지에서 수행하고, 벡터는 원본 해상도에서 추출
 
-    :param img_path: 입력 이미지 경로
+    :param image: 카메라에서 받은 BGR 프레임(Numpy 배열) 또는 입력 이미지 경로
+    :param scale: 얼굴 검출용 축소 비율 (None이면 target_width 사용)
+    :param target_width: 얼굴 검출용 이미지 너비 (None이면 원본 크기로 검출)
+    :param detector: 스트리밍 프레임용 TrackingDetector 객체 (None이면 매번 전체 프레임 검출)
+    :param encoding_cache: 스트리밍 프레임용 EncodingCache 객체 (None이면 매번 벡터 추출)
+    :param preprocessor: FramePreprocessor 객체 (None이면 현재 스레드의 기본 전처리기)
+    :param cache_fresh: 얼굴 순서대로 벡터를 투표에 사용할 수 있는지(EncodingCache.last_fresh) 추가할 리스트
+                        (None이면 기록하지 않음)
     :return: 추출된 얼굴 벡터 리스트
     """
-    # 이미지 로드
-    image = cv.imread(path)
-    if image is None:
-        print(f'이미지를 로드할 수 없습니다: {path}')
+    import face_recognition
+
+    # step 1 ~ 3: 전처리 및 얼굴 위치 감지
+    equalized_image, face_locations = preprocess_and_detect(image, scale, target_width, detector, preprocessor)
+    if not face_locations:
         return []
 
-    # step 1: 밝기와 대비 조정
-    bright_image = adjust_brightness_and_contrast(image, alpha=1.5, beta=50)
+    # step 4: 얼굴 이미지에서 특징 벡터 추출
+    ## RGB형식의 equalized_image, 얼굴 위치 좌표 face_locations를 입력받아 128차원 벡터 추출
+    ## 캐시가 주어지면 직전 프레임과 거의 같은 얼굴 영역은 저장된 벡터를 재사용
+    with metrics.stage("encoding"):
+        if encoding_cache is not None:
+            face_encodings = []
+            for location in face_locations:
+                face_encodings.append(encoding_cache.get_or_compute(
+                    equalized_image, location,
+                    lambda location=location: face_recognition.face_encodings(equalized_image, [location])[0]))
+                if cache_fresh is not None:
+                    cache_fresh.append(encoding_cache.last_fresh)
+        else:
+            face_encodings = face_recognition.face_encodings(equalized_image, face_locations)
+    print(f'감지된 얼굴 개수 : {len(face_encodings)}')
+
+    return face_encodings
+
+
+def preprocess_and_detect(image, scale=DETECTION_SCALE, target_width=DETECTION_TARGET_WIDTH, detector=None,
+                          preprocessor=None):
+    """
+    벡터 추출 전 단계: 이미지 로드, 전처리, 얼굴 위치 감지
+    (인식 서비스는 이 단계까지 요청마다 수행하고 벡터 추출은 여러 요청을 모아 한 번에 수행)
+
+    :param image: 카메라에서 받은 BGR 프레임(Numpy 배열) 또는 입력 이미지 경로
+    :param scale: 얼굴 검출용 축소 비율 (None이면 target_width 사용)
+    :param target_width: 얼굴 검출용 이미지 너비 (None이면 원본 크기로 검출)
+    :param detector: 스트리밍 프레임용 TrackingDetector 객체 (None이면 매번 전체 프레임 검출)
+    :param preprocessor: FramePreprocessor 객체 (None이면 현재 스레드의 기본 전처리기)
+    :return: (전처리된 RGB 이미지, 얼굴 좌표 리스트) 튜플 (실패 시 얼굴 좌표는 빈 리스트)
+             이미지는 전처리기의 재사용 버퍼이므로 같은 전처리기로 다음 프레임을 처리하기 전에 사용
+    """
+    # 경로가 주어진 경우에만 이미지 로드 (프레임은 디스크를 거치지 않고 바로 사용)
+    if isinstance(image, str):
+        path = image
+        with metrics.stage("disk_io"):
+            image = cv.imread(path)
+        if image is None:
+            print(f'이미지를 로드할 수 없습니다: {path}')
+            return None, []
 
-    # step 2: 히스토그램 균등화 적용
-    equalized_image = apply_histogram_equalization(image)
+    # step 1 ~ 2: 설정한 전처리(밝기와 대비 조정, 히스토그램 균등화)를 재사용 버퍼에 적용하고 RGB로 변환
+    preprocessor = preprocessor or get_preprocessor()
+    with metrics.stage("preprocessing"):
+        equalized_image = preprocessor(image)
 
     # step 3: 얼굴 위치 감지
     ## face_recognition() : 얼굴 좌표 (top, right, bottom, left) 형식 튜플 리턴
@@ -29,23 +184,102 @@ def preprocess_image_and_extract_vector(path="../data/captured_images/"):
     ### right: 얼굴 우측 X좌표
     ### bottom: 얼굴 하단 Y좌표
     ### left: 얼굴 좌측 X좌표
-    face_locations = face_recognition.face_locations(equalized_image)
+    ## 축소한 이미지에서 찾은 좌표를 원본 해상도 좌표로 변환
+    ## 스트리밍 중에는 이전 얼굴 주변만 검색하는 detector 사용
+    with metrics.stage("detection"):
+        if detector is not None:
+            face_locations = detector.detect(equalized_image)
+        else:
+            face_locations = detect_faces(equalized_image, scale=scale, target_width=target_width,
+                                          dst=preprocessor.buffer("detection", _detection_shape(
+                                              equalized_image, scale, target_width)))
     if not face_locations:
+        metrics.increment("no_face")
         print('얼굴을 감지하지 못했습니다.')
-        return []
 
-    # step 4: 얼굴 이미지에서 특징 벡터 추출
-    ## RGB형식의 equalized_image, 얼굴 위치 좌표 face_locations를 입력받아 128차원 벡터 추출
-    face_encodings = face_recognition.face_encodings(equalized_image, face_locations)
-    print(f'감지된 얼굴 개수 : {len(face_encodings)}')
+    return equalized_image, face_locations
 
-    return face_encodings
 
+def encode_faces_batch(images, face_locations):
+    """
+    여러 이미지의 얼굴 벡터를 dlib 배치 호출 한 번으로 추출
+
+    :param images: 이미지 리스트
+    :param face_locations: 이미지 별 얼굴 좌표 리스트 (images와 같은 길이)
+    :return: 이미지 별 128차원 벡터 리스트의 리스트
+    """
+    import face_recognition
+
+    with metrics.stage("encoding"):
+        try:
+            # 배치 호출에는 dlib 랜드마크 객체가 필요하므로 face_recognition 내부 함수 사용
+            ## face_encodings()와 같은 5점 랜드마크 사용
+            from face_recognition.api import _raw_face_landmarks, face_encoder
+
+            landmarks = [_raw_face_landmarks(image, locations, model="small")
+                         for image, locations in zip(images, face_locations)]
+            descriptors = face_encoder.compute_face_descriptor(list(images), landmarks, 1)
+        except (ImportError, AttributeError, TypeError, RuntimeError):
+            # 내부 함수가 없는 face_recognition 버전이나 배치 호출을 지원하지 않는 dlib 버전은 이미지마다 추출
+            return [face_recognition.face_encodings(image, locations)
+                    for image, locations in zip(images, face_locations)]
+
+    return [[np.array(descriptor) for descriptor in image_descriptors] for image_descriptors in descriptors]
+
+
+def _detection_shape(img, scale=None, target_width=None):
+    """
+    detect_faces()가 사용하는 축소 이미지 크기 (축소하지 않으면 빈 크기)
+    """
+    height, width = img.shape[:2]
+    if scale is None:
+        scale = target_width / width if target_width else 1.0
+    if scale >= 1.0:
+        return (0, 0, img.shape[2])
+    return (max(int(height * scale), 1), max(int(width * scale), 1), img.shape[2])
+
+
+def detect_faces(img, scale=None, target_width=None, model="hog", dst=None):
+    """
+    축소한 이미지에서 얼굴을 검출하고 원본 해상도 좌표로 변환
+    HOG 검출 시간은 픽셀 수에 비례하므로 1080p 프레임은 축소 후 검출하는 편이 훨씬 빠름
+
+    :param img: Numpy 배열의 입력 이미지
+    :param scale: 축소 비율 (0 < scale <= 1, None이면 target_width 사용)
+    :param target_width: 축소 후 이미지 너비 (None이면 원본 크기로 검출)
+    :param model: 얼굴 검출 모델 ("hog" 또는 "cnn")
+    :param dst: 축소 이미지를 기록할 재사용 버퍼 (None이면 새로 할당)
+    :return: 원본 해상도 기준 (top, right, bottom, left) 좌표 튜플 리스트
+    """
+    import face_recognition
+
+    height, width = img.shape[:2]
+    if scale is None:
+        scale = target_width / width if target_width else 1.0
+    # 확대는 하지 않음
+    scale = min(scale, 1.0)
+
+    if scale >= 1.0:
+        return face_recognition.face_locations(img, model=model)
+
+    small_image = cv.resize(img, (max(int(width * scale), 1), max(int(height * scale), 1)),
+                            dst=dst, interpolation=cv.INTER_AREA)
+    small_locations = face_recognition.face_locations(small_image, model=model)
+
+    # 축소 좌표를 원본 좌표로 변환 (이미지 범위를 벗어나지 않도록 제한)
+    face_locations = []
+    for top, right, bottom, left in small_locations:
+        face_locations.append((max(int(round(top / scale)), 0),
+                               min(int(round(right / scale)), width),
+                               min(int(round(bottom / scale)), height),
+                               max(int(round(left / scale)), 0)))
+
+    return face_locations
 
 
 def adjust_brightness_and_contrast(img, alpha=1.5, beta=50):
     """
-    이미지 밝기와 대비를 조정
+    이미지 밝기와 대비를 조정 (프레임마다 새 배열 할당, 인식 단계는 FramePreprocessor 사용)
 
     :param img: Numpy 배열의 입력 이미지
     :param alpha: 대비 계수 (float)
@@ -59,7 +293,7 @@ def adjust_brightness_and_contrast(img, alpha=1.5, beta=50):
 
 def apply_histogram_equalization(img):
     """
-    히스토그램 균등화 적용을 통해 이미지의 밝기와 대비 개선
+    히스토그램 균등화 적용을 통해 이미지의 밝기와 대비 개선 (프레임마다 새 배열 3개 할당, 인식 단계는 FramePreprocessor 사용)
     :param img: Numpy 배열의 입력 이미지
     :return: 균등화된 이미지
     """
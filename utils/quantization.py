@@ -0,0 +1,192 @@
+import os
+import json
+import numpy as np
+
+"""
+    : 얼굴 벡터를 더 작은 형식으로 저장하고, 저장된 형식 그대로 거리를 계산
+        - float32 : 기본 형식 (벡터당 512 bytes)
+        - float16 : 반정밀도 (벡터당 256 bytes)
+        - int8    : 차원별 배율을 곱한 8bit 정수 (벡터당 128 bytes + 전체 배율 512 bytes)
+                    x ≈ scale[d] * code[d],  scale[d] = max|x[:, d]| / 127
+    : 거리 계산 ||q - x||^2 = ||q||^2 - 2 q·x + ||x||^2
+        - int8은 q·(scale * code) = (q * scale)·code 이므로 입력 벡터에 배율을 한 번만 곱함
+        - 저장된 벡터는 블록 단위로 미리 할당한 float32 버퍼에 옮겨 행렬 곱 (전체를 복원하지 않음)
+        - ||x||^2 은 복원한 벡터 기준으로 한 번만 계산해 보관
+"""
+
+FORMATS = ("float32", "float16", "int8")
+
+# 거리 계산 시 한 번에 float32로 옮기는 벡터 수
+BLOCK_ROWS = 65536
+
+
+def fit_int8_scale(vectors):
+    """
+    차원별 int8 배율 계산 (각 차원의 최대 절댓값이 127이 되도록)
+
+    :param vectors: (N, D) 형태의 벡터
+    :return: (D, ) float32 배율
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors) == 0:
+        return np.ones(vectors.shape[1], dtype=np.float32)
+    scale = np.abs(vectors).max(axis=0) / 127
+    # 모든 값이 0인 차원은 배율 1로 둠
+    scale[scale == 0] = 1
+    return scale.astype(np.float32)
+
+
+def quantize(vectors, vector_format, scale=None):
+    """
+    벡터를 저장 형식으로 변환
+
+    :param vectors: (N, D) 형태의 벡터
+    :param vector_format: "float32", "float16", "int8"
+    :param scale: int8 차원별 배율 (None이면 vectors로 계산)
+    :return: (변환된 배열, 배율 또는 None) 튜플
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vector_format == "float32":
+        return np.ascontiguousarray(vectors), None
+    if vector_format == "float16":
+        return vectors.astype(np.float16), None
+    if vector_format == "int8":
+        scale = fit_int8_scale(vectors) if scale is None else np.asarray(scale, dtype=np.float32)
+        codes = np.rint(vectors / scale)
+        # 배율을 정한 후 추가된 벡터는 범위를 벗어날 수 있으므로 제한
+        np.clip(codes, -127, 127, out=codes)
+        return codes.astype(np.int8), scale
+    raise ValueError(f'지원하지 않는 벡터 형식입니다: {vector_format}')
+
+
+def dequantize(codes, vector_format, scale=None):
+    """
+    저장 형식의 벡터를 float32로 복원
+
+    :return: (N, D) float32 배열
+    """
+    vectors = np.asarray(codes, dtype=np.float32)
+    if vector_format == "int8":
+        vectors = vectors * scale
+    return vectors
+
+
+class QuantizedMatrix:
+    def __init__(self, codes, vector_format="float32", scale=None, squared_norms=None):
+        """
+        QuantizedMatrix 클래스 생성자
+
+        :param codes: 저장 형식의 (N, D) 배열 (np.memmap도 가능)
+        :param vector_format: "float32", "float16", "int8"
+        :param scale: int8 차원별 배율
+        :param squared_norms: 복원한 벡터의 제곱 노름 (None이면 계산)
+        """
+        if vector_format not in FORMATS:
+            raise ValueError(f'지원하지 않는 벡터 형식입니다: {vector_format}')
+        self.codes = codes
+        self.vector_format = vector_format
+        self.scale = scale
+        if squared_norms is None:
+            squared_norms = np.zeros(len(codes), dtype=np.float32)
+            for start in range(0, len(codes), BLOCK_ROWS):
+                block = dequantize(codes[start:start + BLOCK_ROWS], vector_format, scale)
+                squared_norms[start:start + len(block)] = np.einsum('ij,ij->i', block, block)
+        self.squared_norms = squared_norms
+
+    @classmethod
+    def from_float(cls, vectors, vector_format="float32", scale=None):
+        """
+        float 벡터를 지정한 형식으로 변환해 생성
+
+        :param vectors: (N, D) 형태의 벡터
+        :param vector_format: "float32", "float16", "int8"
+        :param scale: int8 차원별 배율 (None이면 vectors로 계산)
+        :return: QuantizedMatrix 객체
+        """
+        codes, scale = quantize(vectors, vector_format, scale)
+        return cls(codes, vector_format, scale)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self):
+        """
+        벡터 저장에 사용하는 메모리 (bytes, 배율과 제곱 노름 포함)
+        """
+        return self.codes.nbytes + self.squared_norms.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def to_float(self, rows=slice(None)):
+        """
+        float32로 복원한 벡터
+
+        :param rows: 복원할 범위
+        :return: (N, D) float32 배열
+        """
+        return dequantize(self.codes[rows], self.vector_format, self.scale)
+
+    def distances(self, face_vectors, rows=slice(None)):
+        """
+        입력 벡터와 저장된 벡터 간 유클리드 거리 (저장 형식 그대로 계산)
+
+        :param face_vectors: (Q, D) 또는 (D, ) 형태의 입력 벡터
+        :param rows: 비교할 범위 (slice)
+        :return: (Q, N) 형태의 거리 행렬
+        """
+        codes = self.codes[rows]
+        queries = np.asarray(face_vectors, dtype=np.float32).reshape(-1, codes.shape[1])
+        query_norms = np.einsum('ij,ij->i', queries, queries)
+
+        if self.vector_format == "float32":
+            squared = queries @ codes.T
+        else:
+            # int8 배율은 입력 벡터 쪽에 곱함
+            weighted = queries * self.scale if self.vector_format == "int8" else queries
+            squared = np.empty((len(queries), len(codes)), dtype=np.float32)
+            buffer = np.empty((min(BLOCK_ROWS, len(codes)), codes.shape[1]), dtype=np.float32)
+            for start in range(0, len(codes), BLOCK_ROWS):
+                block = codes[start:start + BLOCK_ROWS]
+                view = buffer[:len(block)]
+                view[...] = block
+                np.matmul(weighted, view.T, out=squared[:, start:start + len(block)])
+
+        squared *= -2
+        squared += self.squared_norms[rows]
+        squared += query_norms[:, None]
+
+        # 부동소수점 오차로 생기는 음수 제거
+        np.maximum(squared, 0, out=squared)
+        return np.sqrt(squared, out=squared)
+
+    def save(self, folder, labels, source_version=None):
+        """
+        np.load(mmap_mode='r')로 바로 열 수 있는 .npy 파일로 저장
+
+        :param folder: 저장 폴더
+        :param labels: (N, ) 사용자 이름 배열
+        :param source_version: 변환에 사용한 저장소 버전 (EmbeddingStore.version(), 최신 여부 확인용)
+        """
+        os.makedirs(folder, exist_ok=True)
+        np.save(os.path.join(folder, 'codes.npy'), self.codes)
+        np.save(os.path.join(folder, 'squared_norms.npy'), self.squared_norms)
+        np.save(os.path.join(folder, 'labels.npy'), np.asarray(labels, dtype=str))
+        if self.scale is not None:
+            np.save(os.path.join(folder, 'scale.npy'), self.scale)
+        with open(os.path.join(folder, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'format': self.vector_format, 'count': len(self), 'source_version': source_version}, f)
+
+    @classmethod
+    def load(cls, folder):
+        """
+        save()로 저장한 파일을 메모리 매핑으로 열기
+
+        :param folder: 저장 폴더
+        :return: (QuantizedMatrix 객체, 레이블 배열, 메타 정보 dict) 튜플
+        """
+        with open(os.path.join(folder, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        scale_path = os.path.join(folder, 'scale.npy')
+        matrix = cls(np.load(os.path.join(folder, 'codes.npy'), mmap_mode='r'), meta['format'],
+                     np.load(scale_path) if os.path.exists(scale_path) else None,
+                     np.load(os.path.join(folder, 'squared_norms.npy')))
+        return matrix, np.load(os.path.join(folder, 'labels.npy')), meta
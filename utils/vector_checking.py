@@ -1,6 +1,8 @@
 import os
+import hashlib
 import numpy as np
 from config import get_vector_data_path
+from utils.embedding_store import EmbeddingStore, load_user_vectors
 
 """
     : 저장된 사용자 얼굴 이미지의 벡터 데이터를 출력하여 확인
@@ -10,16 +12,46 @@ from config import get_vector_data_path
 """
 
 def vector_checking(user_name):
-    # 사용자 얼굴 벡터 데이터가 저장된 파일 경로 생성
-    file_path = get_vector_data_path(user_name)
-
-    # 데이터 파일이 존재하는지 확인
-    if os.path.exists(file_path):
-        # Numpy를 사용해 지정된 데이터 로드
-        face_to_vectors = np.load(file_path)
+    # 얼굴 벡터 저장소(없으면 기존 .npy 파일)에서 사용자 벡터 로드
+    face_to_vectors = load_user_vectors(user_name)
 
+    # 데이터가 존재하는지 확인
+    if len(face_to_vectors):
         # 데이터 크기와 내용 출력
         print(f'{user_name}님의 얼굴 벡터 데이터: {len(face_to_vectors)}개의 벡터')
         print(face_to_vectors)
     else:
-        print(f'{user_name}님의 데이터가 존재하지 않습니다.')
\ No newline at end of file
+        print(f'{user_name}님의 데이터가 존재하지 않습니다.')
+
+
+# {(저장소 경로, 사용자 이름): (저장소 버전, 해시)} : 같은 프로세스에서 계산한 사용자 별 해시
+_digest_cache = {}
+
+
+def get_vector_digest(user_name, store=None):
+    """
+    사용자 얼굴 벡터의 내용 해시 계산
+    학습된 모델 파일의 버전으로 사용되어, 벡터가 바뀌면 재학습 여부를 판단
+    인식할 때마다 호출되므로 저장소 버전(레코드 추가, 삭제 표시, 다시 쓰기마다 바뀜)이 같으면
+    이전에 계산한 해시를 그대로 사용 (저장소 전체 검색과 sha256 계산 생략)
+
+    :param user_name: 사용자 이름
+    :param store: EmbeddingStore 객체 (None이면 기본 저장소)
+    :return: sha256 해시 앞 16자리 (str)
+    """
+    store = store or EmbeddingStore()
+
+    # 저장소에 없는 사용자는 기존 .npy 파일을 사용하므로 파일 수정 시각도 버전에 포함
+    legacy_path = get_vector_data_path(user_name)
+    version = (store.version(), os.stat(legacy_path).st_mtime_ns if os.path.exists(legacy_path) else None)
+    cached = _digest_cache.get((store.path, user_name))
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    vectors = np.ascontiguousarray(load_user_vectors(user_name, store), dtype=np.float32)
+    if len(vectors) == 0:
+        raise FileNotFoundError(f'{user_name}님의 얼굴 벡터 데이터가 존재하지 않습니다.')
+
+    digest = hashlib.sha256(vectors.tobytes()).hexdigest()[:16]
+    _digest_cache[(store.path, user_name)] = (version, digest)
+    return digest